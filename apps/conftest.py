@@ -1,7 +1,11 @@
+from django.core.files.storage import Storage, default_storage
+from django.db import connection
 from django.test import Client
 
 from rest_framework.test import APIClient
 
+import boto3
+import moto
 import pytest
 
 from .users.factories import UserFactory
@@ -26,3 +30,33 @@ def auth_client(client: Client, user: User):
     """Authenticated client."""
     client.force_login(user)
     return client
+
+
+@pytest.fixture
+def no_seqscan(db) -> None:
+    """Discourage planner from sequential scans in current test.
+
+    On small test tables sequential scan is the cheapest plan, so with this
+    fixture `EXPLAIN` shows whether query can use an index at all.
+
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+@pytest.fixture
+def s3_storage(settings, monkeypatch) -> Storage:
+    """Store media in S3 bucket mocked by moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_s3():
+        boto3.client("s3", region_name="us-east-1").create_bucket(
+            Bucket="test-media",
+        )
+        settings.DEFAULT_FILE_STORAGE = (
+            "apps.core.storages.MediaStorage"
+        )
+        settings.AWS_STORAGE_BUCKET_NAME = "test-media"
+        settings.AWS_S3_REGION_NAME = "us-east-1"
+        settings.AWS_S3_ENDPOINT_URL = None
+        yield default_storage
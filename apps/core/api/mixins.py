@@ -1,4 +1,18 @@
-from rest_framework import mixins
+import datetime
+import hashlib
+import typing
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import exceptions, mixins, status
+from rest_framework.response import Response
+
+from libs import uploads
+
+from . import serializers
 
 
 class ActionPermissionsMixin:
@@ -121,3 +135,212 @@ class UpdateModelWithoutPatchMixin:
 
     update = mixins.UpdateModelMixin.update
     perform_update = mixins.UpdateModelMixin.perform_update
+
+
+class ConditionalValidators(typing.NamedTuple):
+    """Validators of data shown by view.
+
+    `version` must change on every change of data, `last_modified` is time
+    of the last change (if data is not empty).
+
+    """
+    version: str
+    last_modified: datetime.datetime | None
+
+
+class ConditionalResponseMixin:
+    """Mixin which answers conditional requests with `304 Not Modified`.
+
+    Validators of requested data are taken from `get_conditional_validators`
+    after authentication and permissions checks, but before objects are
+    loaded and serialized, so if client has actual data, response costs only
+    queries of validators.
+
+    Responses of `list` and `retrieve` actions get strong `ETag` built from
+    data version and requested url and media type, and `Last-Modified`.
+    Only matching `ETag` gives `304 Not Modified`: `Last-Modified` has
+    precision of one second, so data changed within the same second would
+    look unchanged by `If-Modified-Since`.
+
+    By default validators are calculated by `modified` field and count of
+    requested objects with a single aggregate query, so serializer of view
+    must contain only fields, which change `modified`. Views showing
+    related objects or denormalized data should override
+    `get_conditional_validators`.
+
+    """
+
+    def list(self, request, *args, **kwargs):
+        """Return list of objects or `304 Not Modified`."""
+        return self.get_conditional_response(
+            super().list,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return object or `304 Not Modified`."""
+        return self.get_conditional_response(
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def get_conditional_validators(self) -> ConditionalValidators | None:
+        """Return validators of requested objects.
+
+        Return `None` to disable conditional responses.
+
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+            )
+        stats = queryset.aggregate(
+            last_modified=models.Max("modified"),
+            count=models.Count("pk"),
+        )
+        last_modified = stats["last_modified"]
+        return ConditionalValidators(
+            version=(
+                f"{stats['count']}:"
+                f"{last_modified.isoformat() if last_modified else ''}"
+            ),
+            last_modified=last_modified,
+        )
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        """Get response of `handler` if client has outdated data."""
+        validators = self.get_conditional_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag = quote_etag(
+            hashlib.md5(  # noqa: S324 (not used for security)
+                "\n".join((
+                    validators.version,
+                    request.build_absolute_uri(),
+                    request.accepted_media_type,
+                )).encode(),
+            ).hexdigest(),
+        )
+        last_modified = (
+            int(validators.last_modified.timestamp())
+            if validators.last_modified else None
+        )
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if (
+            response is not None
+            and response.status_code == 304
+            and "HTTP_IF_NONE_MATCH" not in request.META
+        ):
+            # Not modified by date only
+            response = None
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class DirectUploadUnavailable(exceptions.APIException):
+    """Storage doesn't support direct uploads."""
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "Direct uploads aren't supported."
+    default_code = "direct_upload_unavailable"
+
+
+class DirectUploadMixin:
+    """Mixin for viewsets accepting direct uploads of files to storage.
+
+    Upload has two steps, so files never pass through web workers:
+
+    1. `start_direct_upload` returns presigned form, which client uses to
+       upload file straight to storage.
+    2. `finish_direct_upload` checks the file and queues its processing
+       after commit of current transaction.
+
+    Token returned on the first step is bound to user, object and prefix
+    of upload, so file can be attached only to the object it was started
+    for.
+
+    """
+    upload_prefix: str
+
+    def start_direct_upload(self, instance: models.Model) -> Response:
+        """Create presigned form for upload of file for instance."""
+        serializer = serializers.DirectUploadSerializer(
+            data=self.request.data,
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = uploads.create_presigned_upload(
+                prefix=self.upload_prefix,
+                max_size=settings.DIRECT_UPLOAD_MAX_SIZE,
+                expires_in=settings.DIRECT_UPLOAD_EXPIRES_IN,
+                **serializer.validated_data,
+            )
+        except uploads.DirectUploadError as error:
+            raise DirectUploadUnavailable(detail=str(error)) from error
+        token = uploads.sign_upload(
+            upload.key,
+            **self._get_upload_scope(instance),
+        )
+        return Response(
+            serializers.PresignedUploadSerializer(
+                dict(url=upload.url, fields=upload.fields, token=token),
+            ).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    def finish_direct_upload(
+        self,
+        instance: models.Model,
+        process: typing.Callable[[str], None],
+    ) -> Response:
+        """Check uploaded file and queue its processing.
+
+        Args:
+            instance: Object the file is uploaded for.
+            process: Function queueing processing of file by its key.
+
+        """
+        serializer = serializers.FinishUploadSerializer(
+            data=self.request.data,
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            key = uploads.load_upload(
+                serializer.validated_data["token"],
+                # Upload may be finished when its form is about to expire
+                max_age=settings.DIRECT_UPLOAD_EXPIRES_IN * 2,
+                **self._get_upload_scope(instance),
+            )
+        except uploads.DirectUploadError as error:
+            raise exceptions.ValidationError({"token": [str(error)]})
+        if uploads.get_upload_size(key) is None:
+            raise exceptions.ValidationError(
+                {"token": ["File isn't uploaded."]},
+            )
+        transaction.on_commit(lambda: process(key))
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+    def _get_upload_scope(self, instance: models.Model) -> dict:
+        """Get values binding upload to user and object."""
+        return dict(
+            user=self.request.user.pk,
+            object=f"{instance._meta.label_lower}:{instance.pk}",
+            prefix=self.upload_prefix,
+        )
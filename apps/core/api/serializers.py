@@ -222,3 +222,28 @@ class ModelBaseSerializer(BaseSerializer, serializers.ModelSerializer):
                 relations.add(field.source)
 
         return relations
+
+
+class DirectUploadSerializer(BaseSerializer):
+    """Serializer to start direct upload of file to storage."""
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.ChoiceField(
+        choices=settings.DIRECT_UPLOAD_CONTENT_TYPES,
+    )
+
+
+class PresignedUploadSerializer(BaseSerializer):
+    """Serializer for presigned form of direct upload.
+
+    Client posts `fields` and file to `url`, then finishes upload with
+    `token`.
+
+    """
+    url = serializers.URLField()
+    fields = serializers.DictField(child=serializers.CharField())
+    token = serializers.CharField()
+
+
+class FinishUploadSerializer(BaseSerializer):
+    """Serializer to finish direct upload of file to storage."""
+    token = serializers.CharField()
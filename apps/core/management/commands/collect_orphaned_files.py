@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ... import models, services
+
+
+class Command(BaseCommand):
+    """CLI to delete stored files without references."""
+    help = """Script to delete files saved by content addressed storage,
+    which aren't referenced by any row"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.STORED_FILES_COLLECT_BATCH_SIZE,
+            help="Count of files checked in one transaction",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Recalculate references of all files before collection",
+        )
+
+    def handle(self, *args, **options):
+        """Refresh references if needed and delete orphaned files."""
+        batch_size = options["batch_size"]
+        if options["refresh"]:
+            self.refresh_references(batch_size)
+        deleted = services.collect_orphaned_files(
+            batch_size=batch_size,
+            min_age=settings.STORED_FILES_COLLECT_MIN_AGE,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} files"))
+
+    def refresh_references(self, batch_size: int):
+        """Recalculate references of all files batch by batch."""
+        stored_file_ids = models.StoredFile.objects.order_by(
+            "pk",
+        ).values_list("pk", flat=True)
+        last_id = 0
+        updated = 0
+        while batch := list(
+            stored_file_ids.filter(pk__gt=last_id)[:batch_size],
+        ):
+            with transaction.atomic():
+                updated += services.refresh_file_references(batch)
+            last_id = batch[-1]
+        self.stdout.write(f"Refreshed references of {updated} files")
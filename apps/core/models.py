@@ -1,6 +1,8 @@
 import typing
 
 from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.translation import gettext_lazy as _
 
 from django_extensions.db.models import TimeStampedModel
 
@@ -36,4 +38,62 @@ class BaseModel(TimeStampedModel):
             raise ValidationError(errors)
 
 
+class DenormalizedFieldsMixin:
+    """Protect denormalized fields from being overridden on save.
+
+    Denormalized fields (counters and alike) are updated by `UPDATE` queries
+    with `F()` expressions, so their values in loaded instances may be stale.
+    Saving of an existing instance skips fields listed in
+    `denormalized_fields`, unless `update_fields` is passed explicitly.
+
+    """
+    denormalized_fields: tuple[str, ...] = ()
+
+    def save(self, *args, **kwargs):
+        """Exclude denormalized fields from update of existing instance."""
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.denormalized_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class StoredFile(BaseModel):
+    """File saved by `ContentAddressedStorage`.
+
+    Files are named by hash of content, so one file may be referenced by
+    many rows. `references` is a denormalized count of such rows, files
+    without references are deleted by `collect_orphaned_files`.
+
+    """
+    name = models.CharField(
+        verbose_name=_("Name"),
+        max_length=512,
+        unique=True,
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name=_("Size"),
+    )
+    references = models.IntegerField(
+        verbose_name=_("References"),
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = _("Stored file")
+        verbose_name_plural = _("Stored files")
+        indexes = (
+            models.Index(
+                fields=("modified",),
+                condition=models.Q(references__lte=0),
+                name="storedfile_orphaned_idx",
+            ),
+        )
+
+    def __str__(self):
+        return self.name
+
+
 BaseModelAncestor = typing.TypeVar("BaseModelAncestor", bound=BaseModel)
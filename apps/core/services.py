@@ -0,0 +1,139 @@
+import collections
+import datetime
+import posixpath
+import typing
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import StoredFile
+from .storages import get_content_addressed_fields
+
+
+def change_file_references(names: typing.Iterable[str], delta: int) -> None:
+    """Change count of references to stored files by `delta`.
+
+    Counter is changed with `F()` expression, so concurrent changes don't
+    override each other. Names of files not saved by
+    `ContentAddressedStorage` (like empty ones) are ignored.
+
+    """
+    names = collections.Counter(name for name in names if name)
+    for count, names_group in _group_by_count(names).items():
+        StoredFile.objects.filter(name__in=names_group).update(
+            references=Greatest(
+                models.F("references") + delta * count,
+                models.Value(0),
+            ),
+        )
+
+
+def count_file_references(names: typing.Iterable[str]) -> dict[str, int]:
+    """Count rows of all models referencing stored files."""
+    names = list(names)
+    references = dict.fromkeys(names, 0)
+    for field in get_content_addressed_fields():
+        rows = field.model._base_manager.filter(
+            **{f"{field.attname}__in": names},
+        ).values_list(field.attname).annotate(count=models.Count("pk"))
+        for name, count in rows.order_by():
+            references[name] += count
+    return references
+
+
+def refresh_file_references(stored_file_ids: typing.Iterable[int]) -> int:
+    """Recalculate references of stored files from rows of models.
+
+    Used to repair counters after bulk operations, which skip signals.
+
+    Returns:
+        Count of updated files.
+
+    """
+    stored_files = StoredFile.objects.filter(pk__in=stored_file_ids)
+    references = count_file_references(
+        stored_files.values_list("name", flat=True),
+    )
+    updated = 0
+    for count, names in _group_by_count(references).items():
+        updated += stored_files.filter(name__in=names).exclude(
+            references=count,
+        ).update(references=count)
+    return updated
+
+
+def collect_orphaned_files(
+    batch_size: int,
+    min_age: int,
+) -> int:
+    """Delete stored files without references batch by batch.
+
+    Files not used for `min_age` seconds are collected, so files saved for
+    rows, which aren't committed yet, survive. References of candidates
+    are recounted before deletion, files with found references are kept.
+    Image spec files generated from deleted files are deleted too.
+
+    Returns:
+        Count of deleted files.
+
+    """
+    deleted = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            # Files locked by concurrent saves are skipped
+            candidates = StoredFile.objects.select_for_update(
+                skip_locked=True,
+            ).filter(
+                pk__gt=last_id,
+                references__lte=0,
+                modified__lt=(
+                    timezone.now() - datetime.timedelta(seconds=min_age)
+                ),
+            ).order_by("pk")
+            batch = dict(candidates.values_list("pk", "name")[:batch_size])
+            if not batch:
+                return deleted
+            last_id = max(batch)
+            references = count_file_references(batch.values())
+            orphaned = [
+                name for name, count in references.items() if not count
+            ]
+            for name in orphaned:
+                default_storage.delete(name)
+                _delete_cachefiles(name)
+            StoredFile.objects.filter(name__in=orphaned).delete()
+            refresh_file_references(
+                [pk for pk, name in batch.items() if references[name]],
+            )
+        deleted += len(orphaned)
+
+
+def _delete_cachefiles(source_name: str) -> None:
+    """Delete image spec files generated from source file.
+
+    Spec files are named by `source_name_as_path` namer, so all specs of
+    source are stored in one directory named after source.
+
+    """
+    directory = posixpath.join(
+        settings.IMAGEKIT_CACHEFILE_DIR,
+        posixpath.splitext(source_name)[0],
+    )
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for file in files:
+        default_storage.delete(posixpath.join(directory, file))
+
+
+def _group_by_count(counts: dict[str, int]) -> dict[int, list[str]]:
+    """Group names by their counts to update them with one query each."""
+    groups = collections.defaultdict(list)
+    for name, count in counts.items():
+        groups[count].append(name)
+    return groups
@@ -0,0 +1,147 @@
+import functools
+import hashlib
+import posixpath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage
+from django.db import models, transaction
+from django.utils.deconstruct import deconstructible
+
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from .models import StoredFile
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    """Storage naming files by SHA-256 hash of their content.
+
+    Files are saved to default storage as `<dir>/<hash[:2]>/<hash><ext>`,
+    where `dir` is directory of the name generated by field. Saving of a
+    file with already stored content skips upload and returns the existing
+    name, so equal files are stored once and their URLs never change.
+
+    Every stored file has `StoredFile` row, which counts references to it.
+    Row is locked and touched before upload, so file being saved isn't
+    deleted by concurrent `collect_orphaned_files`.
+
+    """
+
+    def save(self, name, content, max_length=None):
+        """Save content under name derived from its hash."""
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.get_hashed_name(name, content)
+        with transaction.atomic():
+            stored_files = StoredFile.objects.select_for_update()
+            stored_file, created = stored_files.get_or_create(
+                name=name,
+                defaults=dict(size=content.size),
+            )
+            if not created:
+                # Postpone collection of file, which is going to be used
+                stored_file.save(update_fields=("modified",))
+            elif not default_storage.exists(name):
+                content.seek(0)
+                default_storage.save(name, content, max_length=max_length)
+        return name
+
+    def get_hashed_name(self, name: str, content) -> str:
+        """Get name of file from hash of its content."""
+        content_hash = hashlib.sha256()
+        for chunk in content.chunks():
+            content_hash.update(chunk)
+        digest = content_hash.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name),
+            digest[:2],
+            f"{digest}{extension}",
+        )
+
+    def _open(self, name, mode="rb"):
+        return default_storage.open(name, mode)
+
+    def delete(self, name):
+        """Delete file from default storage."""
+        default_storage.delete(name)
+
+    def exists(self, name):
+        """Check whether file exists in default storage."""
+        return default_storage.exists(name)
+
+    def listdir(self, path):
+        """List directory of default storage."""
+        return default_storage.listdir(path)
+
+    def size(self, name):
+        """Get size of file in default storage."""
+        return default_storage.size(name)
+
+    def url(self, name):
+        """Get url of file in default storage."""
+        return default_storage.url(name)
+
+    def path(self, name):
+        """Get local path of file in default storage."""
+        return default_storage.path(name)
+
+    def get_modified_time(self, name):
+        """Get time of last modification of file in default storage."""
+        return default_storage.get_modified_time(name)
+
+
+@deconstructible
+class MediaStorage(S3Boto3Storage):
+    """S3 storage of media with cached urls and immutable files.
+
+    Without query string auth url of file depends only on its name, but
+    boto3 builds it on every call, which is noticeable on pages with many
+    posters. Urls are resolved once per name and kept in memory of process.
+
+    Files with names from `MEDIA_IMMUTABLE_PREFIXES` are never overwritten
+    (their names are derived from content), so they are uploaded with far
+    future `Cache-Control` header.
+
+    """
+
+    def __init__(self, **settings_overrides):
+        super().__init__(**settings_overrides)
+        self._get_url = functools.lru_cache(
+            maxsize=settings.MEDIA_URL_CACHE_SIZE,
+        )(super().url)
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        """Get url of file, cached when it doesn't expire."""
+        if self.querystring_auth or parameters or expire or http_method:
+            return super().url(name, parameters, expire, http_method)
+        return self._get_url(name)
+
+    def clear_url_cache(self):
+        """Forget resolved urls."""
+        self._get_url.cache_clear()
+
+    def get_object_parameters(self, name):
+        """Add far future `Cache-Control` header to immutable files."""
+        params = super().get_object_parameters(name)
+        if name.startswith(settings.MEDIA_IMMUTABLE_PREFIXES):
+            params.setdefault(
+                "CacheControl",
+                settings.MEDIA_IMMUTABLE_CACHE_CONTROL,
+            )
+        return params
+
+
+def get_content_addressed_fields() -> list[models.FileField]:
+    """Get file fields of all models stored in `ContentAddressedStorage`."""
+    return [
+        field
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+from celery import shared_task
+
+from . import services
+
+
+@shared_task
+def collect_orphaned_files() -> int:
+    """Delete stored files, which aren't referenced anymore."""
+    return services.collect_orphaned_files(
+        batch_size=settings.STORED_FILES_COLLECT_BATCH_SIZE,
+        min_age=settings.STORED_FILES_COLLECT_MIN_AGE,
+    )
@@ -0,0 +1,82 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from django_redis import get_redis_connection
+
+from libs import http
+
+
+class FailingServer(http.StubServer):
+    """Server, which is always unavailable except for `/ok`."""
+
+    def get_response(self, path: str) -> tuple[int, bytes, dict[str, str]]:
+        """Fail all requests except for `/ok`."""
+        if path == "/ok":
+            return 200, b"ok", {}
+        return 503, b"", {"Retry-After": "0"}
+
+
+@pytest.fixture
+def server():
+    """Run failing server with clean breakers and metrics."""
+    http.reset_circuit_breakers()
+    http.reset_host_metrics()
+    with FailingServer() as server:
+        yield server
+    http.reset_circuit_breakers()
+
+
+def test_retries_and_circuit_breaker(server: FailingServer):
+    """Check failures are retried and then rejected by circuit breaker."""
+    with http.HttpClient(max_retries=2, failure_threshold=3) as client:
+        response = client.get(f"{server.base_url}fail")
+        assert response.status_code == 503
+        assert client.stats.retries == 2
+        assert server.requests["/fail"] == 3
+
+        # Circuit of host is open, so other urls aren't requested
+        with pytest.raises(http.CircuitOpenError):
+            client.get(f"{server.base_url}ok")
+    assert server.requests["/ok"] == 0
+
+    metrics = http.get_host_metrics()[server.base_url[7:-1]]
+    assert metrics.requests == metrics.errors == 3
+    assert metrics.max_time >= metrics.avg_time > 0
+
+
+def test_cache_revalidation(server: FailingServer, tmp_path):
+    """Check cached responses are revalidated with ETag."""
+    cache = http.DiskCache(tmp_path, max_age=0)
+    with http.HttpClient(cache=cache) as client:
+        first = client.get(f"{server.base_url}ok")
+        second = client.get(f"{server.base_url}ok")
+    assert first.content == second.content == b"ok"
+    assert client.stats.revalidated == 1
+    assert server.requests["/ok"] == 2
+
+
+def test_redis_rate_limiter_is_shared():
+    """Check limiters with the same key share one bucket."""
+    key = f"test:rate_limit:{uuid.uuid4()}"
+    # Limiters of two processes
+    limiters = [
+        http.RedisRateLimiter(
+            get_redis_connection("default"),
+            key=key,
+            rate=10,
+            burst=1,
+        )
+        for _ in range(2)
+    ]
+
+    async def acquire():
+        await asyncio.gather(
+            *(limiter.acquire() for limiter in limiters * 2),
+        )
+
+    started = time.monotonic()
+    asyncio.run(acquire())
+    # First token is in bucket, others are refilled in 0.1 s each
+    assert time.monotonic() - started >= 0.25
@@ -0,0 +1,113 @@
+from django.core.files.base import ContentFile
+
+import pytest
+
+from apps.movies.factories import MovieFactory
+
+from .. import models, services
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Store files in temporary directory."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def get_stored_file(movie) -> models.StoredFile:
+    """Get stored file of movie's poster."""
+    return models.StoredFile.objects.get(name=movie.poster.name)
+
+
+def test_equal_posters_stored_once(media_root):
+    """Check posters with equal content share one file."""
+    movie, other_movie = MovieFactory.create_batch(2, poster__color="red")
+
+    assert movie.poster.name == other_movie.poster.name
+    assert movie.poster.name.startswith("posters/")
+    assert len(list(media_root.glob("posters/*/*"))) == 1
+    assert get_stored_file(movie).references == 2
+
+
+def test_references_moved_on_poster_change():
+    """Check references are counted on change and deletion of movies."""
+    movie, other_movie = MovieFactory.create_batch(2, poster__color="red")
+    stored_file = get_stored_file(movie)
+
+    movie.poster.save("new.png", ContentFile(b"new poster"))
+    stored_file.refresh_from_db()
+    assert stored_file.references == 1
+    assert get_stored_file(movie).references == 1
+
+    other_movie.delete()
+    stored_file.refresh_from_db()
+    assert stored_file.references == 0
+
+
+def test_references_kept_on_save_without_poster():
+    """Check saves of other fields don't count poster again."""
+    movie = MovieFactory()
+
+    movie.save(update_fields=("title",))
+    movie.save(update_fields=("title",))
+    assert get_stored_file(movie).references == 1
+
+
+def test_orphaned_files_collected(media_root):
+    """Check files without references are deleted, used ones are kept."""
+    movie, other_movie = MovieFactory.create_batch(2, poster__color="red")
+    orphaned_movie = MovieFactory(poster__color="blue")
+    orphaned_movie.poster_thumbnail.generate()
+    thumbnail_name = orphaned_movie.poster_thumbnail.name
+    orphaned_file = get_stored_file(orphaned_movie)
+    orphaned_movie.delete()
+    # Counter lost reference, but file is still used
+    used_file = get_stored_file(movie)
+    models.StoredFile.objects.filter(pk=used_file.pk).update(references=0)
+
+    assert services.collect_orphaned_files(batch_size=1, min_age=0) == 1
+    assert not models.StoredFile.objects.filter(pk=orphaned_file.pk).exists()
+    assert not (media_root / orphaned_file.name).exists()
+    assert not (media_root / thumbnail_name).exists()
+    used_file.refresh_from_db()
+    assert used_file.references == 2
+    assert (media_root / used_file.name).exists()
+
+
+def test_recently_used_files_not_collected():
+    """Check files, which may be used by uncommitted rows, are kept."""
+    movie = MovieFactory()
+    movie.delete()
+
+    assert services.collect_orphaned_files(batch_size=10, min_age=60) == 0
+    assert get_stored_file(movie).references == 0
+
+
+def test_media_urls_resolved_once(s3_storage, monkeypatch):
+    """Check urls of files are built by boto3 once per name."""
+    client = s3_storage.bucket.meta.client
+    built_urls = []
+    generate_url = client.generate_presigned_url
+
+    def build_url(*args, **kwargs):
+        built_urls.append(kwargs["Params"]["Key"])
+        return generate_url(*args, **kwargs)
+
+    monkeypatch.setattr(client, "generate_presigned_url", build_url)
+
+    url = s3_storage.url("posters/ab/poster.png")
+
+    assert s3_storage.url("posters/ab/poster.png") == url
+    s3_storage.url("avatars/avatar.png")
+    assert built_urls == ["posters/ab/poster.png", "avatars/avatar.png"]
+
+
+def test_immutable_media_cached_forever(s3_storage, settings):
+    """Check posters are uploaded with far future cache headers."""
+    s3_storage.save("posters/ab/poster.png", ContentFile(b"poster"))
+    s3_storage.save("avatars/avatar.png", ContentFile(b"avatar"))
+
+    poster = s3_storage.bucket.Object("posters/ab/poster.png")
+    avatar = s3_storage.bucket.Object("avatars/avatar.png")
+    assert poster.cache_control == settings.MEDIA_IMMUTABLE_CACHE_CONTROL
+    assert avatar.cache_control is None
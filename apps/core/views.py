@@ -3,9 +3,13 @@ from collections import namedtuple
 
 import django
 from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.http import Http404
 from django.urls import reverse_lazy
+from django.utils.translation import gettext_lazy as _
 from django.views.generic import TemplateView
 
+from libs.pagination import KeysetPaginator
 from libs.utils import get_changelog_html, get_latest_version
 
 Changelog = namedtuple("Changelog", ["name", "text", "version", "open_api_ui"])
@@ -44,6 +48,26 @@ class AppStatsMixin:
         return context
 
 
+class KeysetPaginationMixin:
+    """Paginate `ListView` with cursors instead of page numbers.
+
+    Queryset is paginated with `KeysetPaginator` in its own ordering. Cursor
+    of requested page is taken from `cursor_kwarg` GET parameter. Context
+    gets `page_obj` with `next_cursor` and `previous_cursor`.
+
+    """
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the queryset by cursor."""
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(_("Invalid cursor")) from error
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
 class ChangeLogView(AppStatsMixin, TemplateView):
     """Class-based view to display version of open_api file on changelog page.
 
@@ -0,0 +1,176 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions, serializers
+
+from libs import export
+
+from apps.core.api.serializers import (
+    BaseListSerializer,
+    BaseSerializer,
+    ModelBaseSerializer,
+)
+
+from .. import feed, models, services
+
+
+class MovieSerializer(ModelBaseSerializer):
+    """Serializer for representing `Movie`."""
+
+    class Meta:
+        model = models.Movie
+        fields = (
+            "id",
+            "title",
+            "description",
+            "poster",
+            "kinopoisk_id",
+            "duration",
+            "created",
+            "modified",
+        )
+        read_only_fields = fields
+
+
+class WatchlistEntrySerializer(ModelBaseSerializer):
+    """Serializer for representing `UserMovie` in watchlist."""
+    movie = MovieSerializer(read_only=True)
+
+    class Meta:
+        model = models.UserMovie
+        fields = (
+            "id",
+            "movie",
+            "is_watched",
+            "likes_count",
+            "created",
+        )
+        read_only_fields = fields
+
+
+class FriendSerializer(ModelBaseSerializer):
+    """Serializer for representing friend of user."""
+
+    class Meta:
+        model = get_user_model()
+        fields = (
+            "id",
+            "uid",
+            "first_name",
+            "last_name",
+            "avatar",
+        )
+        read_only_fields = fields
+
+
+class FeedItemSerializer(BaseSerializer):
+    """Serializer for representing event of friend in feed."""
+    id = serializers.IntegerField(read_only=True)
+    kind = serializers.ChoiceField(choices=feed.EVENT_KINDS, read_only=True)
+    actor = FriendSerializer(read_only=True)
+    owner = FriendSerializer(source="user_movie.user", read_only=True)
+    entry = WatchlistEntrySerializer(source="user_movie", read_only=True)
+    created = serializers.DateTimeField(read_only=True)
+
+
+class FeedSerializer(BaseSerializer):
+    """Serializer for representing page of feed."""
+    next = serializers.URLField(allow_null=True, read_only=True)
+    results = FeedItemSerializer(many=True, read_only=True)
+
+
+class FeedQuerySerializer(BaseSerializer):
+    """Serializer for query parameters of feed."""
+    before = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="Id of last received event to take older events",
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.FEED_MAX_PAGE_SIZE,
+        default=settings.FEED_PAGE_SIZE,
+    )
+
+
+class TasteMatchSerializer(ModelBaseSerializer):
+    """Serializer for representing friend with match of tastes."""
+    taste_match = serializers.IntegerField(
+        read_only=True,
+        help_text="Match of tastes in percents",
+    )
+
+    class Meta:
+        model = get_user_model()
+        fields = (
+            "id",
+            "uid",
+            "first_name",
+            "last_name",
+            "avatar",
+            "taste_match",
+        )
+        read_only_fields = fields
+
+
+class WatchlistChangeListSerializer(BaseListSerializer):
+    """Serializer for list of changes of watchlist.
+
+    Existence of all movies is checked with one query.
+
+    """
+
+    def validate(self, attrs: list[dict]) -> list[dict]:
+        """Check movies exist and each of them is changed once."""
+        existing_ids = set(
+            models.Movie.objects.filter(
+                pk__in={change["movie"] for change in attrs},
+            ).values_list("pk", flat=True),
+        )
+        errors = []
+        changed_ids = set()
+        for change in attrs:
+            movie_id = change["movie"]
+            if movie_id not in existing_ids:
+                errors.append(dict(movie=[_("Movie does not exist.")]))
+            elif movie_id in changed_ids:
+                errors.append(dict(movie=[_("Movie is changed twice.")]))
+            else:
+                errors.append({})
+            changed_ids.add(movie_id)
+        if any(errors):
+            raise exceptions.ValidationError(errors)
+        return attrs
+
+
+class WatchlistChangeSerializer(BaseSerializer):
+    """Serializer for change of movie in watchlist."""
+    movie = serializers.IntegerField(min_value=1)
+    action = serializers.ChoiceField(choices=services.WATCHLIST_ACTIONS)
+
+    class Meta:
+        list_serializer_class = WatchlistChangeListSerializer
+
+
+class WatchlistBatchSerializer(BaseSerializer):
+    """Serializer for batch of changes of current user's watchlist."""
+    changes = WatchlistChangeSerializer(
+        many=True,
+        min_length=1,
+        max_length=settings.WATCHLIST_BATCH_MAX_SIZE,
+    )
+
+
+class ExportQuerySerializer(BaseSerializer):
+    """Serializer for query parameters of export."""
+    file_format = serializers.ChoiceField(
+        choices=export.FORMATS,
+        default=export.FORMAT_NDJSON,
+    )
+    gzip = serializers.BooleanField(default=False)
+    after = serializers.IntegerField(
+        min_value=0,
+        default=0,
+        help_text="Id of last received row to resume broken export",
+    )
@@ -0,0 +1,28 @@
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+router = DefaultRouter()
+router.register(r"feed", views.FeedViewSet, basename="feed")
+router.register(r"movies", views.MoviesViewSet, basename="movie")
+router.register(
+    r"recommendations",
+    views.RecommendationsViewSet,
+    basename="recommendation",
+)
+router.register(
+    r"taste-matches",
+    views.TasteMatchesViewSet,
+    basename="taste-match",
+)
+router.register(
+    r"watchlist/batch",
+    views.WatchlistBatchViewSet,
+    basename="watchlist-batch",
+)
+router.register(
+    r"watchlists/(?P<uid>[0-9a-f-]+)",
+    views.WatchlistViewSet,
+    basename="watchlist",
+)
+urlpatterns = router.urls
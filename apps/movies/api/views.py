@@ -0,0 +1,353 @@
+import typing
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+
+from libs import export
+
+from apps.core.api import serializers as core_serializers
+from apps.core.api.mixins import (
+    ConditionalResponseMixin,
+    ConditionalValidators,
+    DirectUploadMixin,
+)
+from apps.core.api.views import BaseViewSet, ReadOnlyViewSet
+from apps.users.models import User
+
+from .. import (
+    feed,
+    filters,
+    models,
+    recommendations,
+    services,
+    tasks,
+    taste,
+)
+from . import serializers
+
+
+def get_export_response(
+    request: Request,
+    rows: typing.Callable[[int], typing.Iterable[dict]],
+    fields: typing.Sequence[str],
+    filename: str,
+) -> StreamingHttpResponse:
+    """Stream export file of rows.
+
+    Args:
+        request: Request with query parameters of `ExportQuerySerializer`.
+        rows: Function returning rows with id greater than passed one.
+        fields: Names of exported fields.
+        filename: Name of file without extension.
+
+    """
+    query_serializer = serializers.ExportQuerySerializer(
+        data=request.query_params,
+    )
+    query_serializer.is_valid(raise_exception=True)
+    file_format = query_serializer.validated_data["file_format"]
+    gzip = query_serializer.validated_data["gzip"]
+
+    response = StreamingHttpResponse(
+        export.iter_export(
+            rows(query_serializer.validated_data["after"]),
+            fields=fields,
+            file_format=file_format,
+            gzip=gzip,
+            # Resumed export is appended by client after header
+            header=not query_serializer.validated_data["after"],
+        ),
+        content_type=(
+            "application/gzip" if gzip
+            else export.CONTENT_TYPES[file_format]
+        ),
+    )
+    filename = f"{filename}.{file_format}{'.gz' if gzip else ''}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+class MoviesViewSet(
+    ConditionalResponseMixin,
+    DirectUploadMixin,
+    ReadOnlyViewSet,
+):
+    """ViewSet for viewing and searching movies.
+
+    Responses have `ETag` and `Last-Modified` headers, conditional requests
+    are answered with `304 Not Modified` when movies are not changed. One
+    version is kept for all movies, so validators don't query database.
+
+    Admins upload posters directly to storage, movie keeps its old poster
+    until uploaded one is processed.
+
+    """
+    queryset = models.Movie.objects.all()
+    serializer_class = serializers.MovieSerializer
+    ordering_fields = ("created",)
+    search_query_param = "q"
+    upload_prefix = "uploads/posters"
+
+    @property
+    def ordering(self) -> tuple[str, ...]:
+        """Get default ordering, search results are ordered by rank."""
+        if self.action == "search":
+            return ("-rank", "-id")
+        return ("-created", "-id")
+
+    def get_queryset(self) -> QuerySet:
+        """Find movies by query for search action."""
+        if self.action == "search":
+            return models.Movie.objects.search(
+                self.request.query_params.get(self.search_query_param, ""),
+            )
+        return super().get_queryset()
+
+    def get_conditional_validators(self) -> ConditionalValidators:
+        """Get validators from version of all movies."""
+        version = services.get_movies_version()
+        return ConditionalValidators(
+            version=version.key,
+            last_modified=version.created,
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                description="Text to find in title or description.",
+                required=True,
+            ),
+        ],
+    )
+    @action(detail=False, methods=["get"])
+    def search(self, request: Request, *args, **kwargs) -> Response:
+        """Find movies by beginnings of words of title or description."""
+        return self.list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[serializers.ExportQuerySerializer],
+        responses={(200, "application/x-ndjson"): bytes},
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def export(self, request: Request, *args, **kwargs):
+        """Stream all movies ordered by id as NDJSON or CSV file."""
+        return get_export_response(
+            request,
+            rows=services.iter_movies_export,
+            fields=services.MOVIE_EXPORT_FIELDS,
+            filename="movies",
+        )
+
+    @extend_schema(
+        request=core_serializers.DirectUploadSerializer,
+        responses={201: core_serializers.PresignedUploadSerializer},
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="poster/upload",
+        permission_classes=(IsAdminUser,),
+    )
+    def upload_poster(self, request: Request, *args, **kwargs) -> Response:
+        """Start direct upload of poster to storage."""
+        return self.start_direct_upload(self.get_object())
+
+    @extend_schema(
+        request=core_serializers.FinishUploadSerializer,
+        responses={202: None},
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="poster/finish",
+        permission_classes=(IsAdminUser,),
+    )
+    def finish_poster(self, request: Request, *args, **kwargs) -> Response:
+        """Finish direct upload of poster and queue its processing."""
+        movie = self.get_object()
+        return self.finish_direct_upload(
+            movie,
+            process=lambda key: tasks.process_poster_upload.delay(
+                movie.pk,
+                key,
+            ),
+        )
+
+
+class WatchlistViewSet(ConditionalResponseMixin, ReadOnlyViewSet):
+    """ViewSet for viewing user's watchlist by user uid.
+
+    Responses have `ETag` and `Last-Modified` headers taken from version of
+    the owner's watchlist, which is changed on any change of watchlist, its
+    movies or likes. Conditional requests are answered with
+    `304 Not Modified` without querying the watchlist.
+
+    """
+    queryset = models.UserMovie.objects.all()
+    serializer_class = serializers.WatchlistEntrySerializer
+    filterset_class = filters.WatchlistFilter
+    ordering_fields = ("created", "likes_count")
+    ordering = ("-created", "-id")
+
+    @cached_property
+    def owner(self) -> User:
+        """Get owner of watchlist."""
+        return get_object_or_404(User, uid=self.kwargs["uid"])
+
+    def get_queryset(self) -> QuerySet:
+        """Get entries of owner's watchlist."""
+        queryset = super().get_queryset()
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation has no owner
+            return queryset.none()
+        return queryset.filter(user=self.owner).for_watchlist()
+
+    @extend_schema(
+        parameters=[serializers.ExportQuerySerializer],
+        responses={(200, "application/x-ndjson"): bytes},
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def export(self, request: Request, *args, **kwargs):
+        """Stream whole watchlist ordered by id as NDJSON or CSV file."""
+        return get_export_response(
+            request,
+            rows=lambda after: services.iter_watchlist_export(
+                self.owner,
+                after=after,
+            ),
+            fields=services.WATCHLIST_EXPORT_FIELDS,
+            filename="watchlist",
+        )
+
+    def get_conditional_validators(self) -> ConditionalValidators:
+        """Get validators from version of owner's watchlist."""
+        version = services.get_watchlist_version(self.owner.pk)
+        return ConditionalValidators(
+            version=version.key,
+            last_modified=version.created,
+        )
+
+
+class WatchlistBatchViewSet(BaseViewSet):
+    """ViewSet for batch changes of current user's watchlist."""
+    serializer_class = serializers.WatchlistBatchSerializer
+    filter_backends = ()
+
+    @extend_schema(
+        responses=serializers.WatchlistEntrySerializer(many=True),
+    )
+    def create(self, request: Request, *args, **kwargs) -> Response:
+        """Add, remove and mark movies as watched in one transaction.
+
+        Returns added and updated entries of watchlist.
+
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_movies = services.apply_watchlist_changes(
+            user=request.user,
+            changes=serializer.validated_data["changes"],
+        )
+        return Response(
+            serializers.WatchlistEntrySerializer(user_movies, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class FeedViewSet(BaseViewSet):
+    """ViewSet for feed of current user's friends activity.
+
+    Events are pushed to feeds of friends on write, so page is read from
+    one sorted set of user and outboxes of celebrity friends, no matter how
+    many friends user has.
+
+    """
+    serializer_class = serializers.FeedSerializer
+    filter_backends = ()
+
+    @extend_schema(
+        parameters=[serializers.FeedQuerySerializer],
+        responses=serializers.FeedSerializer,
+    )
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """Get movies added, watched and liked by your friends."""
+        query_serializer = serializers.FeedQuerySerializer(
+            data=request.query_params,
+        )
+        query_serializer.is_valid(raise_exception=True)
+        page = feed.get_feed(
+            request.user.pk,
+            limit=query_serializer.validated_data["limit"],
+            before=query_serializer.validated_data.get("before"),
+        )
+        next_url = None
+        if page.next_cursor is not None:
+            next_url = replace_query_param(
+                request.build_absolute_uri(),
+                "before",
+                page.next_cursor,
+            )
+        serializer = self.get_serializer(
+            dict(next=next_url, results=page.items),
+        )
+        return Response(serializer.data)
+
+
+class RecommendationsViewSet(BaseViewSet):
+    """ViewSet for movies recommended to current user.
+
+    Recommendations are precomputed nightly by `build_recommendations`
+    task, so they are read by one lookup of primary key.
+
+    """
+    serializer_class = serializers.MovieSerializer
+    filter_backends = ()
+
+    @extend_schema(
+        responses=serializers.MovieSerializer(many=True),
+    )
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """Get movies recommended for you, best first."""
+        serializer = self.get_serializer(
+            recommendations.get_recommended_movies(request.user.pk),
+            many=True,
+        )
+        return Response(serializer.data)
+
+
+class TasteMatchesViewSet(BaseViewSet):
+    """ViewSet for matches of tastes of current user with friends.
+
+    Match is Jaccard similarity of sets of movies added or liked by users.
+    Sets are cached and all friends are matched in one vectorized pass, so
+    only movies of friends with changed sets are queried.
+
+    """
+    serializer_class = serializers.TasteMatchSerializer
+    filter_backends = ()
+
+    @extend_schema(
+        responses=serializers.TasteMatchSerializer(many=True),
+    )
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """Get your friends with matches of tastes, best matches first."""
+        matches = taste.get_friends_taste_matches(request.user.pk)
+        for user, taste_match in matches:
+            user.taste_match = taste_match
+        serializer = self.get_serializer(
+            [user for user, _ in matches],
+            many=True,
+        )
+        return Response(serializer.data)
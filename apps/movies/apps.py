@@ -6,3 +6,7 @@ class MoviesAppConfig(AppConfig):
     """Default configuration for Movies app."""
     name = "apps.movies"
     verbose_name = _("Movies")
+
+    def ready(self):
+        # pylint: disable=unused-import
+        from . import signals  # noqa
@@ -8,7 +8,7 @@ class MovieFactory(factory.django.DjangoModelFactory):
     title = factory.Faker("name")
     description = factory.Faker("text")
     poster = factory.django.ImageField(color=factory.Faker("color"))
-    kinopoisk_id = factory.Faker("pyint")
+    kinopoisk_id = factory.Faker("pyint", max_value=2_147_483_647)
     duration = factory.Faker("time")
 
     class Meta:
@@ -18,7 +18,7 @@ class MovieFactory(factory.django.DjangoModelFactory):
 class UserMovieFactory(factory.django.DjangoModelFactory):
     """Factory to generate test UserMovie instance."""
     user = factory.SubFactory("apps.users.factories.UserFactory")
-    movie = factory.SubFactory("apps.users.factories.UserFactory")
+    movie = factory.SubFactory(MovieFactory)
     is_watched = factory.Faker("pybool")
 
     class Meta:
@@ -0,0 +1,242 @@
+import collections
+import datetime
+import time
+import typing
+
+from django.conf import settings
+
+import numpy as np
+from django_redis import get_redis_connection
+
+from apps.users.graph import friendship_graph
+from apps.users.models import User
+
+from . import models, tasks
+
+# Events of friends fanned out to user on write, scored by ids of events,
+# so newer events have larger scores
+FEED_KEY = "feed:inbox:{user_id}"
+# Own events of user, friends of celebrities read them on request instead
+# of fan-out
+OUTBOX_KEY = "feed:outbox:{user_id}"
+EVENTS_COUNTER_KEY = "feed:events"
+
+EVENT_ADDED = "added"
+EVENT_WATCHED = "watched"
+EVENT_LIKED = "liked"
+EVENT_KINDS = (EVENT_ADDED, EVENT_WATCHED, EVENT_LIKED)
+
+
+class Activity(typing.NamedTuple):
+    """Action of user with entry of watchlist, which friends should see."""
+    kind: str
+    actor_id: int
+    user_movie_id: int
+
+
+class Event(typing.NamedTuple):
+    """Activity stored in feeds.
+
+    Events are stored as strings, so the same event is stored once in
+    every feed.
+
+    """
+    id: int
+    kind: str
+    actor_id: int
+    user_movie_id: int
+    timestamp: int
+
+    def encode(self) -> str:
+        """Encode event into member of feed."""
+        return ":".join(map(str, self))
+
+    @classmethod
+    def decode(cls, value: bytes | str) -> "Event":
+        """Decode event from member of feed."""
+        if isinstance(value, bytes):
+            value = value.decode()
+        event_id, kind, actor_id, user_movie_id, timestamp = value.split(":")
+        return cls(
+            id=int(event_id),
+            kind=kind,
+            actor_id=int(actor_id),
+            user_movie_id=int(user_movie_id),
+            timestamp=int(timestamp),
+        )
+
+
+class FeedItem(typing.NamedTuple):
+    """Event of feed with loaded actor and entry of watchlist."""
+    id: int
+    kind: str
+    actor: User
+    user_movie: models.UserMovie
+    created: datetime.datetime
+
+
+class FeedPage(typing.NamedTuple):
+    """Page of feed with id of its last event to take next page."""
+    items: list[FeedItem]
+    next_cursor: int | None
+
+
+def _push(pipeline, key: str, events: typing.Iterable[Event]) -> None:
+    """Add events to feed and drop its oldest events above max size."""
+    pipeline.zadd(key, {event.encode(): event.id for event in events})
+    pipeline.zremrangebyrank(key, 0, -settings.FEED_MAX_SIZE - 1)
+
+
+def is_celebrity(friends_count: int | np.ndarray) -> bool | np.ndarray:
+    """Check whether events of user are read by friends instead of fan-out.
+
+    Fan-out of every event of user with huge count of friends would write
+    to all their feeds, so friends read recent events of such users on
+    request.
+
+    """
+    return friends_count > settings.FEED_FANOUT_MAX_FRIENDS
+
+
+def publish_activities(activities: typing.Sequence[Activity]) -> list[Event]:
+    """Store activities in outboxes of actors and fan them out to friends.
+
+    Ids of events are taken from one counter, so they follow order of
+    publishing. Fan-out is done by celery task.
+
+    """
+    if not activities:
+        return []
+    connection = get_redis_connection("default")
+    last_id = connection.incrby(EVENTS_COUNTER_KEY, len(activities))
+    timestamp = int(time.time())
+    events = [
+        Event(last_id - len(activities) + number, *activity, timestamp)
+        for number, activity in enumerate(activities, start=1)
+    ]
+    pipeline = connection.pipeline(transaction=False)
+    for actor_id, actor_events in _group_by_actor(events).items():
+        _push(pipeline, OUTBOX_KEY.format(user_id=actor_id), actor_events)
+    pipeline.execute()
+    tasks.fan_out_feed_events.delay([event.encode() for event in events])
+    return events
+
+
+def _group_by_actor(
+    events: typing.Iterable[Event],
+) -> dict[int, list[Event]]:
+    grouped = collections.defaultdict(list)
+    for event in events:
+        grouped[event.actor_id].append(event)
+    return grouped
+
+
+def fan_out_events(events: typing.Iterable[Event]) -> int:
+    """Push events into feeds of friends of their actors.
+
+    Feeds are written by pipelines of `FEED_FANOUT_BATCH_SIZE` friends.
+    Events of celebrities are skipped.
+
+    Returns:
+        Count of written feeds.
+
+    """
+    graph = friendship_graph.get()
+    connection = get_redis_connection("default")
+    batch_size = settings.FEED_FANOUT_BATCH_SIZE
+    written = 0
+    for actor_id, actor_events in _group_by_actor(events).items():
+        friend_ids = graph.neighbours(actor_id).tolist()
+        if is_celebrity(len(friend_ids)):
+            continue
+        for start in range(0, len(friend_ids), batch_size):
+            pipeline = connection.pipeline(transaction=False)
+            for friend_id in friend_ids[start:start + batch_size]:
+                _push(
+                    pipeline,
+                    FEED_KEY.format(user_id=friend_id),
+                    actor_events,
+                )
+            pipeline.execute()
+        written += len(friend_ids)
+    return written
+
+
+def get_feed(
+    user_id: int,
+    limit: int,
+    before: int | None = None,
+) -> FeedPage:
+    """Get page of events of user's friends, newest first.
+
+    Page is read from user's feed and from outboxes of celebrity friends,
+    each read takes at most `limit` events older than `before` cursor.
+    Events of users, who aren't friends anymore, are skipped. Entries of
+    watchlists are loaded by one query and likers by one more query, if
+    page has likes.
+
+    """
+    graph = friendship_graph.get()
+    friend_ids = graph.neighbours(user_id)
+    celebrity_ids = friend_ids[is_celebrity(graph.degrees(friend_ids))]
+    keys = [FEED_KEY.format(user_id=user_id)] + [
+        OUTBOX_KEY.format(user_id=celebrity_id)
+        for celebrity_id in celebrity_ids.tolist()
+    ]
+    max_score = "+inf" if before is None else f"({before}"
+    pipeline = get_redis_connection("default").pipeline(transaction=False)
+    for key in keys:
+        pipeline.zrevrangebyscore(key, max_score, "-inf", start=0, num=limit)
+    friend_ids = set(friend_ids.tolist())
+    events = sorted(
+        {
+            event
+            for members in pipeline.execute()
+            for event in map(Event.decode, members)
+            if event.actor_id in friend_ids
+        },
+        key=lambda event: event.id,
+        reverse=True,
+    )[:limit]
+    next_cursor = events[-1].id if len(events) == limit else None
+    return FeedPage(items=_load_items(events), next_cursor=next_cursor)
+
+
+def _load_items(events: typing.Sequence[Event]) -> list[FeedItem]:
+    """Load actors and entries of events.
+
+    Events of removed entries of watchlists are skipped.
+
+    """
+    user_movies = models.UserMovie.objects.select_related(
+        "user",
+        "movie",
+    ).in_bulk({event.user_movie_id for event in events})
+    liker_ids = {
+        event.actor_id for event in events if event.kind == EVENT_LIKED
+    }
+    likers = User.objects.in_bulk(liker_ids) if liker_ids else {}
+    items = []
+    for event in events:
+        user_movie = user_movies.get(event.user_movie_id)
+        if user_movie is None:
+            continue
+        if event.kind == EVENT_LIKED:
+            actor = likers.get(event.actor_id)
+        else:
+            actor = user_movie.user
+        if actor is None:
+            continue
+        items.append(
+            FeedItem(
+                id=event.id,
+                kind=event.kind,
+                actor=actor,
+                user_movie=user_movie,
+                created=datetime.datetime.fromtimestamp(
+                    event.timestamp,
+                    tz=datetime.timezone.utc,
+                ),
+            ),
+        )
+    return items
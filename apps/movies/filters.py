@@ -0,0 +1,105 @@
+from django.db.models import QuerySet
+from django.http import QueryDict
+from django.utils.translation import gettext_lazy as _
+
+import django_filters
+
+from . import models
+
+
+class WatchlistFilter(django_filters.FilterSet):
+    """Filter entries of watchlist by title and status.
+
+    Missing parameters get default values, so unbound filter shows not
+    watched movies.
+
+    """
+    STATUS_UNWATCHED = "unwatched"
+    STATUS_WATCHED = "watched"
+    STATUS_ALL = "all"
+    STATUS_CHOICES = (
+        (STATUS_UNWATCHED, _("Going to watch")),
+        (STATUS_WATCHED, _("Watched")),
+        (STATUS_ALL, _("All")),
+    )
+
+    defaults = dict(status=STATUS_UNWATCHED)
+
+    q = django_filters.CharFilter(
+        label=_("Search"),
+        method="filter_title",
+        max_length=255,
+    )
+    status = django_filters.ChoiceFilter(
+        label=_("Status"),
+        choices=STATUS_CHOICES,
+        method="filter_status",
+        empty_label=None,
+    )
+
+    class Meta:
+        model = models.UserMovie
+        fields = ()
+
+    def __init__(self, data: QueryDict | None = None, *args, **kwargs):
+        data = data.copy() if data is not None else QueryDict(mutable=True)
+        for name, default in self.defaults.items():
+            if not data.get(name):
+                data[name] = default
+        super().__init__(data, *args, **kwargs)
+
+    def filter_title(self, queryset: QuerySet, name: str, value: str):
+        """Filter entries by part of movie title.
+
+        `ILIKE` is served by trigram index `movie_title_trgm_idx`.
+
+        """
+        return queryset.filter(movie__title__icontains=value.strip())
+
+    def filter_status(self, queryset: QuerySet, name: str, value: str):
+        """Filter entries by watched status."""
+        if value == self.STATUS_WATCHED:
+            return queryset.watched()
+        if value == self.STATUS_UNWATCHED:
+            return queryset.unwatched()
+        return queryset
+
+
+class SortedWatchlistFilter(WatchlistFilter):
+    """Filter entries of watchlist and sort them.
+
+    By default entries are sorted newest first, which matches
+    `usermovie_unwatched_idx` index. Watched entries are served by
+    `usermovie_watchlist_idx` and sorting by likes by `usermovie_likes_idx`.
+    Every ordering ends with primary key and contains no nulls, so filtered
+    watchlist can be paginated with `KeysetPaginator`.
+
+    """
+    SORT_ADDED = "added"
+    SORT_LIKES = "likes"
+    SORT_DURATION = "duration"
+    SORT_CHOICES = (
+        (SORT_ADDED, _("Recently added")),
+        (SORT_LIKES, _("Most liked")),
+        (SORT_DURATION, _("Shortest")),
+    )
+    ORDERINGS = {
+        SORT_ADDED: ("-created", "-id"),
+        SORT_LIKES: ("-likes_count", "-id"),
+        SORT_DURATION: ("sort_duration", "-id"),
+    }
+
+    defaults = dict(WatchlistFilter.defaults, sort=SORT_ADDED)
+
+    sort = django_filters.ChoiceFilter(
+        label=_("Sort"),
+        choices=SORT_CHOICES,
+        method="sort_watchlist",
+        empty_label=None,
+    )
+
+    def sort_watchlist(self, queryset: QuerySet, name: str, value: str):
+        """Order entries by chosen sort."""
+        if value == self.SORT_DURATION:
+            queryset = queryset.with_sort_duration()
+        return queryset.order_by(*self.ORDERINGS[value])
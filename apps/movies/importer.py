@@ -0,0 +1,259 @@
+import csv
+import functools
+import io
+import itertools
+import json
+import typing
+
+from django.db import connection, transaction
+from django.utils.dateparse import parse_duration
+from django.utils.duration import duration_iso_string
+
+from apps.core.services import change_file_references
+
+from . import models, services, tasks
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+STAGING_TABLE = "movies_movie_import"
+STAGING_COLUMNS = (
+    "position",
+    "kinopoisk_id",
+    "title",
+    "description",
+    "duration",
+    "poster",
+)
+# Max value of `Movie.kinopoisk_id` column (integer)
+MAX_KINOPOISK_ID = 2_147_483_647
+
+CREATE_STAGING_TABLE_SQL = f"""
+    CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+        position bigint NOT NULL,
+        kinopoisk_id integer NOT NULL,
+        title varchar(255),
+        description text,
+        duration interval,
+        poster varchar(100)
+    )
+"""
+# Posters of existing movies, which may be updated by merge, rows are
+# locked until end of transaction
+LOCK_MOVIES_SQL = f"""
+    SELECT movie.id, movie.poster
+    FROM {models.Movie._meta.db_table} AS movie
+    JOIN {STAGING_TABLE} USING (kinopoisk_id)
+    ORDER BY movie.id
+    FOR UPDATE OF movie
+"""
+# Last row wins if movie is repeated in batch. Conflicting movie is
+# updated only if its content was changed since last import, values
+# missing in dump don't overwrite existing ones. `xmax` is zero for
+# inserted rows.
+MERGE_SQL = f"""
+    INSERT INTO {models.Movie._meta.db_table} AS movie (
+        created, modified, kinopoisk_id, title, description, duration,
+        poster, wanted_by_count, content_hash
+    )
+    SELECT
+        now(), now(), kinopoisk_id, title, description, duration,
+        poster, 0, content_hash
+    FROM (
+        SELECT DISTINCT ON (kinopoisk_id)
+            *,
+            md5(
+                jsonb_build_array(title, description, duration, poster)::text
+            ) AS content_hash
+        FROM {STAGING_TABLE}
+        ORDER BY kinopoisk_id, position DESC
+    ) AS imported
+    ON CONFLICT (kinopoisk_id) DO UPDATE SET
+        modified = EXCLUDED.modified,
+        title = coalesce(EXCLUDED.title, movie.title),
+        description = coalesce(EXCLUDED.description, movie.description),
+        duration = coalesce(EXCLUDED.duration, movie.duration),
+        poster = coalesce(EXCLUDED.poster, movie.poster),
+        content_hash = EXCLUDED.content_hash
+    WHERE movie.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+    RETURNING id, xmax = 0 AS inserted, coalesce(poster, '') AS poster
+"""
+
+
+class ImportStats(typing.NamedTuple):
+    """Counts of rows processed by import."""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    # Rows of batch replaced by later rows of the same movie
+    duplicated: int = 0
+    rejected: int = 0
+
+    @property
+    def total(self) -> int:
+        """Get count of all processed rows."""
+        return sum(self)
+
+    def __add__(self, other: "ImportStats") -> "ImportStats":
+        """Sum stats."""
+        return ImportStats(*(a + b for a, b in zip(self, other)))
+
+
+def read_catalog(
+    file: typing.TextIO,
+    file_format: str,
+) -> typing.Iterator[dict]:
+    """Read rows of catalog dump one by one.
+
+    CSV dump must have header, JSONL dump contains one json object per
+    line. Fields are named like in `export_movies` output.
+
+    """
+    if file_format == FORMAT_CSV:
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def clean_row(row: dict) -> tuple | None:
+    """Convert row of dump to values of staging table columns.
+
+    Returns:
+        Values without position or `None` if row is invalid.
+
+    """
+    try:
+        kinopoisk_id = int(row["kinopoisk_id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not 0 <= kinopoisk_id <= MAX_KINOPOISK_ID:
+        return None
+
+    duration = row.get("duration") or None
+    if duration is not None:
+        # Durations without units are minutes
+        if isinstance(duration, int | float) or duration.isdigit():
+            duration = f"{int(duration) * 60}"
+        duration = parse_duration(str(duration))
+        if duration is None:
+            return None
+        duration = duration_iso_string(duration)
+
+    return (
+        kinopoisk_id,
+        _clean_text(row.get("title"), max_length=255),
+        _clean_text(row.get("description")),
+        duration,
+        _clean_text(row.get("poster"), max_length=100),
+    )
+
+
+def _clean_text(value: typing.Any, max_length: int | None = None):
+    """Convert empty values to `None` and cut too long values."""
+    if value is None or value == "":
+        return None
+    return str(value)[:max_length]
+
+
+def import_catalog(
+    rows: typing.Iterable[dict],
+    batch_size: int = 10000,
+) -> typing.Iterator[ImportStats]:
+    """Import movies from rows of catalog dump batch by batch.
+
+    Every batch is copied with `COPY` into temporary staging table and
+    merged into movies table with `INSERT ... ON CONFLICT (kinopoisk_id)
+    DO UPDATE` in its own transaction. Rows are read lazily, so memory usage
+    depends only on `batch_size`.
+
+    Changes made by import bypass signals, so stats of new movies are
+    zero and search vectors are maintained by database trigger. References
+    to posters are counted, thumbnails of posters are generated by a task,
+    version of movies and cached watchlists with updated movies are
+    invalidated explicitly. Similar movies of inserted movies are found by
+    a task after the last batch.
+
+    Yields:
+        Stats of each imported batch.
+
+    """
+    rows = enumerate(rows)
+    inserted_total = 0
+    while batch := list(itertools.islice(rows, batch_size)):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        rejected = 0
+        kinopoisk_ids = set()
+        for position, row in batch:
+            values = clean_row(row)
+            if values is None:
+                rejected += 1
+                continue
+            kinopoisk_ids.add(values[0])
+            writer.writerow((position, *values))
+        buffer.seek(0)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING_TABLE_SQL)
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+            cursor.execute(LOCK_MOVIES_SQL)
+            previous_posters = dict(cursor.fetchall())
+            cursor.execute(MERGE_SQL)
+            merged = cursor.fetchall()
+            updated_ids = [pk for pk, inserted, _ in merged if not inserted]
+            poster_ids = [pk for pk, _, poster in merged if poster]
+            # Merge skips signals, which count references to posters
+            changed_posters = [
+                (previous_posters.get(pk) or "", poster)
+                for pk, _, poster in merged
+                if poster != (previous_posters.get(pk) or "")
+            ]
+            change_file_references(
+                (previous for previous, _ in changed_posters),
+                -1,
+            )
+            change_file_references(
+                (poster for _, poster in changed_posters),
+                1,
+            )
+            if poster_ids:
+                transaction.on_commit(
+                    functools.partial(
+                        tasks.generate_poster_thumbnails.delay,
+                        poster_ids,
+                    ),
+                )
+            if merged:
+                transaction.on_commit(services.invalidate_movies_version)
+            if updated_ids:
+                owner_ids = list(
+                    models.UserMovie.objects.filter(
+                        movie_id__in=updated_ids,
+                    ).values_list("user_id", flat=True).distinct(),
+                )
+                transaction.on_commit(
+                    functools.partial(
+                        services.invalidate_watchlists,
+                        owner_ids,
+                    ),
+                )
+
+        inserted = len(merged) - len(updated_ids)
+        inserted_total += inserted
+        yield ImportStats(
+            inserted=inserted,
+            updated=len(updated_ids),
+            unchanged=len(kinopoisk_ids) - len(merged),
+            duplicated=len(batch) - rejected - len(kinopoisk_ids),
+            rejected=rejected,
+        )
+    if inserted_total:
+        tasks.update_similar_movies.delay()
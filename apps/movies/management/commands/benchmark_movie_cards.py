@@ -0,0 +1,67 @@
+import statistics
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from libs.image_specs import clear_cachefile_names
+
+from ...models import Movie
+
+
+class Command(BaseCommand):
+    """CLI to benchmark rendering of movie cards with cached poster urls."""
+    help = """Script to benchmark render of movie cards with cold and warm
+    caches of media urls"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--cards",
+            type=int,
+            default=20,
+            help="Count of cards on page",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="How many times to render every page",
+        )
+
+    def handle(self, *args, **options):
+        """Print median render time of one card before and after caching.
+
+        Cold run clears caches of urls before every page, so every card
+        resolves its urls the way it did before they were cached.
+
+        """
+        self.stdout.write(f"Storage: {default_storage.__class__.__name__}")
+        template = get_template("movies/movie_card.html")
+        queryset = Movie.objects.exclude(poster="").exclude(
+            poster__isnull=True,
+        )[:options["cards"]]
+        cold = self._measure(template, queryset, options["repeat"], True)
+        warm = self._measure(template, queryset, options["repeat"], False)
+        self.stdout.write(
+            f"Per card: cold {cold:.3f} ms, warm {warm:.3f} ms",
+        )
+
+    @staticmethod
+    def _measure(template, queryset, repeat: int, cold: bool) -> float:
+        """Return median time in ms to render one card."""
+        timings = []
+        for _ in range(repeat):
+            # Fresh instances, because spec files are cached by instances
+            movies = list(queryset.all())
+            if cold:
+                clear_cachefile_names()
+                if hasattr(default_storage, "clear_url_cache"):
+                    default_storage.clear_url_cache()
+            started = time.perf_counter()
+            for movie in movies:
+                template.render(dict(movie=movie))
+            elapsed = (time.perf_counter() - started) * 1000
+            timings.append(elapsed / max(len(movies), 1))
+        return statistics.median(timings)
@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ...models import Movie
+
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    """CLI to compare full-text movie search with `icontains` lookups."""
+    help = """Script to benchmark movie search against icontains lookups"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "queries",
+            nargs="*",
+            default=["love", "star war", "the"],
+            help="Search queries to benchmark",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="How many times to run every query",
+        )
+
+    def handle(self, *args, **options):
+        """Print median latency of the first search page for both paths.
+
+        Every run fetches the total count and the first page, the same way
+        `AddMovieView` does.
+
+        """
+        self.stdout.write(f"Movies in catalog: {Movie.objects.count()}")
+        for query in options["queries"]:
+            icontains = self._measure(
+                Movie.objects.filter(
+                    Q(title__icontains=query)
+                    | Q(description__icontains=query),
+                ).order_by("-id"),
+                options["repeat"],
+            )
+            full_text = self._measure(
+                Movie.objects.search(query),
+                options["repeat"],
+            )
+            self.stdout.write(
+                f"{query!r}: icontains {icontains:.2f} ms, "
+                f"full-text {full_text:.2f} ms",
+            )
+
+    @staticmethod
+    def _measure(queryset, repeat: int) -> float:
+        """Return median time in ms to count results and fetch first page."""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset.count()
+            list(queryset[:PAGE_SIZE])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
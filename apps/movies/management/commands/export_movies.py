@@ -0,0 +1,81 @@
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from libs import export
+
+from apps.users.models import User
+
+from ... import services
+
+
+class Command(BaseCommand):
+    """CLI to export movies catalog or user's watchlist to file."""
+    help = """Script to export movies or watchlist as NDJSON or CSV with
+    flat memory usage"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Path to output file, `-` for stdout",
+        )
+        parser.add_argument(
+            "--format",
+            choices=export.FORMATS,
+            default=export.FORMAT_NDJSON,
+            help="Format of output file",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress output with gzip",
+        )
+        parser.add_argument(
+            "--after",
+            type=int,
+            default=0,
+            help="Id of last exported row to resume broken export",
+        )
+        parser.add_argument(
+            "--watchlist",
+            metavar="USER_UID",
+            help="Export watchlist of user instead of movies",
+        )
+
+    def handle(self, *args, **options):
+        """Write export file chunk by chunk."""
+        if options["watchlist"]:
+            try:
+                user = User.objects.get(uid=options["watchlist"])
+            except (User.DoesNotExist, ValidationError) as error:
+                raise CommandError("User not found") from error
+            rows = services.iter_watchlist_export(
+                user,
+                after=options["after"],
+            )
+            fields = services.WATCHLIST_EXPORT_FIELDS
+        else:
+            rows = services.iter_movies_export(after=options["after"])
+            fields = services.MOVIE_EXPORT_FIELDS
+
+        chunks = export.iter_export(
+            rows,
+            fields=fields,
+            file_format=options["format"],
+            gzip=options["gzip"],
+            # Resumed export is appended after header of existing file
+            header=not options["after"],
+        )
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+        # Resumed export is appended to existing file
+        mode = "ab" if options["after"] else "wb"
+        with open(options["output"], mode) as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS("Done"))
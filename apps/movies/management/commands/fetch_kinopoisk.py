@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from libs.http import get_host_metrics
+
+from ... import models, services
+
+
+class Command(BaseCommand):
+    """CLI to fetch metadata of movies from Kinopoisk API."""
+    help = """Script to update movies with metadata fetched concurrently
+    from Kinopoisk API"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "kinopoisk_ids",
+            nargs="*",
+            type=int,
+            help="Kinopoisk ids of movies",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Fetch all movies",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.KINOPOISK_FETCH_BATCH_SIZE,
+            help="Count of movies updated at once",
+        )
+        parser.add_argument(
+            "--api-url",
+            help="Base url of API, like url of `kinopoisk_stub` server",
+        )
+
+    def handle(self, *args, **options):
+        """Fetch movies batch by batch and report throughput."""
+        kinopoisk_ids = options["kinopoisk_ids"]
+        if options["all"]:
+            kinopoisk_ids = list(
+                models.Movie.objects.order_by("pk").values_list(
+                    "kinopoisk_id",
+                    flat=True,
+                ),
+            )
+        if not kinopoisk_ids:
+            raise CommandError("Pass kinopoisk ids or --all")
+
+        started = time.monotonic()
+        total = 0
+        batch_size = options["batch_size"]
+        for start in range(0, len(kinopoisk_ids), batch_size):
+            updated, stats = services.fetch_kinopoisk_movies(
+                kinopoisk_ids[start:start + batch_size],
+                api_url=options["api_url"],
+            )
+            total += updated
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"Updated {total} movies "
+                f"({total / elapsed * 60:.0f} movies/min): "
+                f"{stats.requests} requests, {stats.retries} retries, "
+                f"{stats.cache_hits} cache hits, "
+                f"{stats.revalidated} revalidated",
+            )
+        for host, metrics in get_host_metrics().items():
+            self.stdout.write(
+                f"{host}: {metrics.requests} requests, "
+                f"{metrics.errors} errors, "
+                f"avg {metrics.avg_time * 1000:.0f} ms, "
+                f"max {metrics.max_time * 1000:.0f} ms",
+            )
+        self.stdout.write(self.style.SUCCESS("Done"))
@@ -0,0 +1,53 @@
+import argparse
+import time
+
+from django.core.management.base import BaseCommand
+
+from ... import importer
+
+
+class Command(BaseCommand):
+    """CLI to import movies catalog dump."""
+    help = """Script to import or update movies from CSV or JSONL dump by
+    kinopoisk id with PostgreSQL COPY"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "file",
+            type=argparse.FileType("r", encoding="utf-8"),
+            help="Path to dump, `-` for stdin",
+        )
+        parser.add_argument(
+            "--format",
+            choices=importer.FORMATS,
+            default=importer.FORMAT_CSV,
+            help="Format of dump",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Count of rows imported in one transaction",
+        )
+
+    def handle(self, *args, **options):
+        """Import dump batch by batch and report progress."""
+        started = time.monotonic()
+        stats = importer.ImportStats()
+        with options["file"] as file:
+            for batch_stats in importer.import_catalog(
+                importer.read_catalog(file, options["format"]),
+                batch_size=options["batch_size"],
+            ):
+                stats += batch_stats
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"Processed {stats.total} rows "
+                    f"({stats.total / elapsed:.0f} rows/s): "
+                    f"inserted {stats.inserted}, updated {stats.updated}, "
+                    f"unchanged {stats.unchanged}, "
+                    f"duplicated {stats.duplicated}, "
+                    f"rejected {stats.rejected}",
+                )
+        self.stdout.write(self.style.SUCCESS("Done"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from libs.kinopoisk import StubKinopoiskServer
+
+
+class Command(BaseCommand):
+    """CLI to run local stub of Kinopoisk API."""
+    help = """Script to run stub of Kinopoisk API to benchmark
+    `fetch_kinopoisk` without network"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8001,
+            help="Port to listen",
+        )
+
+    def handle(self, *args, **options):
+        """Serve requests until interrupted."""
+        server = StubKinopoiskServer(port=options["port"])
+        self.stdout.write(f"Serving stub of Kinopoisk API at {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
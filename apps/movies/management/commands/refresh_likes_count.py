@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ... import models, services
+
+
+class Command(BaseCommand):
+    """CLI to reconcile denormalized likes count of users movies."""
+    help = """Script to fix drift of `likes_count` of users movies"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Count of users movies checked in one transaction",
+        )
+
+    def handle(self, *args, **options):
+        """Recalculate likes count of all users movies batch by batch."""
+        batch_size = options["batch_size"]
+        user_movie_ids = models.UserMovie.objects.order_by(
+            "pk",
+        ).values_list("pk", flat=True)
+        last_id = 0
+        fixed = 0
+        while batch := list(
+            user_movie_ids.filter(pk__gt=last_id)[:batch_size],
+        ):
+            with transaction.atomic():
+                fixed += services.refresh_likes_count(batch)
+            last_id = batch[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f"Fixed likes count of {fixed} users movies"),
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ... import models, services
+
+
+class Command(BaseCommand):
+    """CLI to recalculate denormalized stats of movies."""
+    help = """Script to backfill or repair `last_added_at` and
+    `wanted_by_count` of movies from users' watchlists"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Count of movies updated in one transaction",
+        )
+
+    def handle(self, *args, **options):
+        """Recalculate stats of all movies batch by batch."""
+        batch_size = options["batch_size"]
+        movie_ids = models.Movie.objects.order_by("pk").values_list(
+            "pk",
+            flat=True,
+        )
+        last_id = 0
+        updated = 0
+        while batch := list(movie_ids.filter(pk__gt=last_id)[:batch_size]):
+            with transaction.atomic():
+                updated += services.refresh_movie_stats(batch)
+            last_id = batch[-1]
+            self.stdout.write(f"Updated {updated} movies")
+        self.stdout.write(self.style.SUCCESS("Done"))
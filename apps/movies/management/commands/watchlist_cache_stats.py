@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ... import services
+
+
+class Command(BaseCommand):
+    """CLI to show effectiveness of watchlist cache."""
+    help = """Script to show hits and misses of watchlist cache"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset counters after showing them",
+        )
+
+    def handle(self, *args, **options):
+        """Print counts of hits and misses and hit ratio."""
+        stats = services.get_watchlist_cache_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total if total else 0
+        self.stdout.write(
+            f"Hits: {stats['hits']}, misses: {stats['misses']}, "
+            f"hit ratio: {ratio:.1%}",
+        )
+        if options["reset"]:
+            services.reset_watchlist_cache_stats()
+            self.stdout.write("Counters are reset")
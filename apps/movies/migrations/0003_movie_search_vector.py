@@ -0,0 +1,53 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('simple', coalesce({table}title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({table}description, '')), 'B')
+"""
+
+CREATE_TRIGGER_SQL = f"""
+CREATE FUNCTION movies_movie_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(table="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER movies_movie_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON movies_movie
+    FOR EACH ROW EXECUTE FUNCTION movies_movie_search_vector_update();
+
+UPDATE movies_movie SET search_vector = {SEARCH_VECTOR_SQL.format(table="")};
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER movies_movie_search_vector_trigger ON movies_movie;
+DROP FUNCTION movies_movie_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_remove_movie_kinopoisk_url_movie_kinopoisk_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Search vector'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='movie_search_vector_idx'),
+        ),
+        migrations.RunSQL(
+            sql=CREATE_TRIGGER_SQL,
+            reverse_sql=DROP_TRIGGER_SQL,
+        ),
+    ]
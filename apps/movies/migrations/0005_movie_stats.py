@@ -0,0 +1,47 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+BACKFILL_STATS_SQL = """
+UPDATE movies_movie
+SET wanted_by_count = stats.wanted_by_count,
+    last_added_at = stats.last_added_at
+FROM (
+    SELECT movie_id, count(*) AS wanted_by_count, max(created) AS last_added_at
+    FROM movies_usermovie
+    GROUP BY movie_id
+) AS stats
+WHERE stats.movie_id = movies_movie.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_movie_title_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='last_added_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Last time movie was added by user'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='wanted_by_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Count of users who added movie'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-last_added_at', '-id'], name='movie_last_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-wanted_by_count', '-id'], name='movie_wanted_by_count_idx'),
+        ),
+        migrations.RunSQL(
+            sql=BACKFILL_STATS_SQL,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
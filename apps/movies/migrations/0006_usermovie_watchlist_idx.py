@@ -0,0 +1,17 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_movie_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usermovie',
+            index=models.Index(fields=['user', 'is_watched', '-created', '-id'], name='usermovie_watchlist_idx'),
+        ),
+    ]
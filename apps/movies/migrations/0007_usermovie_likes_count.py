@@ -0,0 +1,33 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+BACKFILL_LIKES_COUNT_SQL = """
+UPDATE movies_usermovie
+SET likes_count = likes.likes_count
+FROM (
+    SELECT usermovie_id, count(*) AS likes_count
+    FROM movies_usermovie_likes
+    GROUP BY usermovie_id
+) AS likes
+WHERE likes.usermovie_id = movies_usermovie.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_usermovie_watchlist_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usermovie',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Count of likes'),
+        ),
+        migrations.RunSQL(
+            sql=BACKFILL_LIKES_COUNT_SQL,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
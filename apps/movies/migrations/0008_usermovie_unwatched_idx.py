@@ -0,0 +1,21 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_usermovie_likes_count'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='usermovie',
+            name='usermovie_watchlist_idx',
+        ),
+        migrations.AddIndex(
+            model_name='usermovie',
+            index=models.Index(condition=models.Q(('is_watched', False)), fields=['user', '-created', '-id'], name='usermovie_unwatched_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_usermovie_unwatched_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=32, null=True, verbose_name='Hash of imported content'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.7 on 2026-10-18 12:10
+
+import apps.core.storages
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0009_movie_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='movie',
+            name='poster',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storages.ContentAddressedStorage(), upload_to='posters/', verbose_name='Link to get poster'),
+        ),
+    ]
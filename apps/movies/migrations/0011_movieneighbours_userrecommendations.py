@@ -0,0 +1,52 @@
+# Generated by Django 4.0.7 on 2026-10-18 12:20
+
+from django.conf import settings
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('movies', '0010_alter_movie_poster'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRecommendations',
+            fields=[
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='movie_recommendations', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('movie_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), size=None, verbose_name='Recommended movies')),
+                ('scores', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), size=None, verbose_name='Recommendation scores')),
+            ],
+            options={
+                'verbose_name': 'User recommendations',
+                'verbose_name_plural': 'Users recommendations',
+            },
+        ),
+        migrations.CreateModel(
+            name='MovieNeighbours',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('kind', models.CharField(choices=[('collaborative', 'Collaborative filtering')], max_length=16, verbose_name='Kind of similarity')),
+                ('movie_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), size=None, verbose_name='Similar movies')),
+                ('scores', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), size=None, verbose_name='Similarity scores')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='movies.movie', verbose_name='Movie')),
+            ],
+            options={
+                'verbose_name': 'Movie neighbours',
+                'verbose_name_plural': 'Movies neighbours',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='movieneighbours',
+            constraint=models.UniqueConstraint(fields=('movie', 'kind'), name='movies_movieneighbours_unique'),
+        ),
+    ]
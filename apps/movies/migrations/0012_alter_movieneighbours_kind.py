@@ -0,0 +1,18 @@
+# Generated by Django 4.0.7 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0011_movieneighbours_userrecommendations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='movieneighbours',
+            name='kind',
+            field=models.CharField(choices=[('collaborative', 'Collaborative filtering'), ('content', 'Similar titles and descriptions')], max_length=16, verbose_name='Kind of similarity'),
+        ),
+    ]
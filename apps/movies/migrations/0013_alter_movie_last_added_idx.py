@@ -0,0 +1,21 @@
+# Generated by Django 4.0.7 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0012_alter_movieneighbours_kind'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='movie',
+            name='movie_last_added_idx',
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(models.OrderBy(models.F('last_added_at'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), name='movie_last_added_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.7 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0013_alter_movie_last_added_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usermovie',
+            index=models.Index(fields=['user', 'is_watched', '-created', '-id'], name='usermovie_watchlist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usermovie',
+            index=models.Index(fields=['user', 'is_watched', '-likes_count', '-id'], name='usermovie_likes_idx'),
+        ),
+    ]
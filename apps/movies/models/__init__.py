@@ -1,2 +1,3 @@
 from .movie import Movie
+from .recommendations import MovieNeighbours, UserRecommendations
 from .user_movie import UserMovie
@@ -1,14 +1,21 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from imagekit import models as imagekitmodels
+from imagekit.processors import ResizeToFill, ResizeToFit
+
 from config.settings.common import KINOPOISK_BASE_URL
+from libs.image_specs import Pregenerated
 
-from apps.core.models import BaseModel
+from apps.core.models import BaseModel, DenormalizedFieldsMixin
+from apps.core.storages import ContentAddressedStorage
 
 from ..querysets import MovieQuerySet
 
 
-class Movie(BaseModel):
+class Movie(DenormalizedFieldsMixin, BaseModel):
     """Movie model.
 
     Save of main characteristics of movie.
@@ -26,11 +33,45 @@ class Movie(BaseModel):
     )
     poster = models.ImageField(
         verbose_name=_("Link to get poster"),
-        # images will be uploaded to MEDIA_ROOT / posters
+        # images will be uploaded to MEDIA_ROOT / posters / <hash[:2]> and
+        # named by hash of content, so equal posters are stored once
         upload_to="posters/",
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
     )
+    # Posters are rendered only through thumbnails: 64x64 in watchlist and
+    # 320px wide in movie card, both with 2x versions for HiDPI screens.
+    # They are generated by `generate_poster_thumbnails` task after upload,
+    # use `generateimages movies:movie` command to generate missing ones
+    poster_thumbnail = imagekitmodels.ImageSpecField(
+        source="poster",
+        processors=[ResizeToFill(64, 64)],
+        format="WEBP",
+        options={"quality": 80},
+        cachefile_strategy=Pregenerated,
+    )
+    poster_thumbnail_2x = imagekitmodels.ImageSpecField(
+        source="poster",
+        processors=[ResizeToFill(128, 128)],
+        format="WEBP",
+        options={"quality": 80},
+        cachefile_strategy=Pregenerated,
+    )
+    poster_card = imagekitmodels.ImageSpecField(
+        source="poster",
+        processors=[ResizeToFit(width=320, upscale=False)],
+        format="WEBP",
+        options={"quality": 80},
+        cachefile_strategy=Pregenerated,
+    )
+    poster_card_2x = imagekitmodels.ImageSpecField(
+        source="poster",
+        processors=[ResizeToFit(width=640, upscale=False)],
+        format="WEBP",
+        options={"quality": 80},
+        cachefile_strategy=Pregenerated,
+    )
     kinopoisk_id = models.PositiveIntegerField(
         verbose_name=_("Movie ID on kinopoisk"),
         unique=True,
@@ -40,12 +81,75 @@ class Movie(BaseModel):
         help_text=_("Input in minutes or use format DD:hh:mm"),
         null=True,
     )
+    # Denormalized stats of `UserMovie` maintained by signals in
+    # `apps.movies.signals`, use `refresh_movie_stats` command to repair them
+    last_added_at = models.DateTimeField(
+        verbose_name=_("Last time movie was added by user"),
+        null=True,
+        editable=False,
+    )
+    wanted_by_count = models.PositiveIntegerField(
+        verbose_name=_("Count of users who added movie"),
+        default=0,
+        editable=False,
+    )
+    # Maintained by the `movies_movie_search_vector_update` database trigger
+    # from title (weight A) and description (weight B), so rows written by
+    # raw SQL or bulk operations are indexed as well
+    search_vector = SearchVectorField(
+        verbose_name=_("Search vector"),
+        null=True,
+        editable=False,
+    )
+
+    # Hash of content of the last imported version of movie, used by
+    # `import_movies` command to skip unchanged movies
+    content_hash = models.CharField(
+        verbose_name=_("Hash of imported content"),
+        max_length=32,
+        null=True,
+        editable=False,
+    )
 
     objects = MovieQuerySet.as_manager()
 
+    poster_specs = (
+        "poster_thumbnail",
+        "poster_thumbnail_2x",
+        "poster_card",
+        "poster_card_2x",
+    )
+    denormalized_fields = (
+        "last_added_at",
+        "wanted_by_count",
+        "search_vector",
+        "content_hash",
+    )
+
     class Meta:
         verbose_name = _("Movie")
         verbose_name_plural = _("Movies")
+        indexes = [
+            # Movies nobody added go last in `recently_added`
+            models.Index(
+                models.F("last_added_at").desc(nulls_last=True),
+                models.F("id").desc(),
+                name="movie_last_added_idx",
+            ),
+            models.Index(
+                fields=("-wanted_by_count", "-id"),
+                name="movie_wanted_by_count_idx",
+            ),
+            GinIndex(
+                fields=("search_vector",),
+                name="movie_search_vector_idx",
+            ),
+            GinIndex(
+                fields=("title",),
+                name="movie_title_trgm_idx",
+                opclasses=("gin_trgm_ops",),
+            ),
+        ]
 
     def __str__(self):
         return self.title
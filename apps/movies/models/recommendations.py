@@ -0,0 +1,84 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.models import BaseModel
+
+
+class MovieNeighbours(BaseModel):
+    """Movies most similar to movie, computed by offline job.
+
+    Neighbours are stored in one row as arrays of ids of movies and their
+    similarity scores, most similar first, so they are read by one indexed
+    lookup. Rows are replaced as whole on every build.
+
+    """
+    KIND_COLLABORATIVE = "collaborative"
+    KIND_CONTENT = "content"
+    KINDS = (
+        (KIND_COLLABORATIVE, _("Collaborative filtering")),
+        (KIND_CONTENT, _("Similar titles and descriptions")),
+    )
+
+    movie = models.ForeignKey(
+        to="movies.Movie",
+        verbose_name=_("Movie"),
+        related_name="neighbours",
+        on_delete=models.CASCADE,
+    )
+    kind = models.CharField(
+        verbose_name=_("Kind of similarity"),
+        max_length=16,
+        choices=KINDS,
+    )
+    movie_ids = ArrayField(
+        models.IntegerField(),
+        verbose_name=_("Similar movies"),
+    )
+    scores = ArrayField(
+        models.FloatField(),
+        verbose_name=_("Similarity scores"),
+    )
+
+    class Meta:
+        verbose_name = _("Movie neighbours")
+        verbose_name_plural = _("Movies neighbours")
+        constraints = [
+            models.UniqueConstraint(
+                name="%(app_label)s_%(class)s_unique",
+                fields=("movie", "kind"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.movie_id} ({self.kind})"
+
+
+class UserRecommendations(BaseModel):
+    """Movies recommended to user, computed by offline job.
+
+    Stored the same way as `MovieNeighbours`, best recommendations first.
+
+    """
+    user = models.OneToOneField(
+        to="users.User",
+        verbose_name=_("User"),
+        related_name="movie_recommendations",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    movie_ids = ArrayField(
+        models.IntegerField(),
+        verbose_name=_("Recommended movies"),
+    )
+    scores = ArrayField(
+        models.FloatField(),
+        verbose_name=_("Recommendation scores"),
+    )
+
+    class Meta:
+        verbose_name = _("User recommendations")
+        verbose_name_plural = _("Users recommendations")
+
+    def __str__(self):
+        return str(self.user_id)
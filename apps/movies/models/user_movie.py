@@ -1,11 +1,11 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.models import BaseModel
+from apps.core.models import BaseModel, DenormalizedFieldsMixin
 from apps.movies.querysets import UserMovieQuerySet
 
 
-class UserMovie(BaseModel):
+class UserMovie(DenormalizedFieldsMixin, BaseModel):
     """User movie which user going to watch.
 
     Mark a movie as watched.
@@ -34,8 +34,17 @@ class UserMovie(BaseModel):
         related_name=_("likes"),
         blank=True,
     )
+    # Denormalized count of `likes` maintained by signals in
+    # `apps.movies.signals`, use `refresh_likes_count` command to repair it
+    likes_count = models.PositiveIntegerField(
+        verbose_name=_("Count of likes"),
+        default=0,
+        editable=False,
+    )
     objects = UserMovieQuerySet.as_manager()
 
+    denormalized_fields = ("likes_count",)
+
     class Meta:
         verbose_name = _("UserMovie")
         verbose_name_plural = _("UsersMovies")
@@ -45,6 +54,26 @@ class UserMovie(BaseModel):
                 fields=("user", "movie"),
             ),
         ]
+        indexes = [
+            # Watchlist shows not watched movies, newest first, so they
+            # have compact index in watchlist ordering
+            models.Index(
+                fields=("user", "-created", "-id"),
+                name="usermovie_unwatched_idx",
+                condition=models.Q(is_watched=False),
+            ),
+            # Watched movies and other sortings of watchlist. Entries with
+            # any status or sorted by duration of movie are found by user
+            # prefix of these indexes and sorted in memory
+            models.Index(
+                fields=("user", "is_watched", "-created", "-id"),
+                name="usermovie_watchlist_idx",
+            ),
+            models.Index(
+                fields=("user", "is_watched", "-likes_count", "-id"),
+                name="usermovie_likes_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.movie.title
@@ -1,19 +1,104 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
 from django.db import models
+from django.db.models.functions import Cast
+
+# Text search configuration used by the `search_vector` trigger. `simple`
+# doesn't stem words, so it works the same way for titles in any language
+SEARCH_CONFIG = "simple"
 
 
 class MovieQuerySet(models.query.QuerySet):
     """Custom QuerySet to add additional methods to movie's QuerySet."""
 
-    def recently_added(self, count: int = 10, *args):
+    def recently_added(self, count: int | None = 10, *args):
         """Returns movies recently added by users.
 
         By default, 10 pieces are returned if that many movies are contained
         in the database. If there are less than 'count' movies in the database,
         then as many as there are will be returned.
 
+        Movies are ordered by denormalized `last_added_at` with `id` as
+        tiebreaker, so it's served by `movie_last_added_idx` index and
+        result can be paginated by keyset. Movies nobody added go last.
+
+        Args:
+            count: The number of movies to return. Pass `None` to get
+                unsliced queryset.
+
+        """
+        args = (
+            (models.F("last_added_at").desc(nulls_last=True),)
+            + args
+            + ("-id",)
+        )
+        queryset = self.order_by(*args)
+        if count is None:
+            return queryset
+        return queryset[:count]
+
+    def popular(self, count: int | None = 10):
+        """Returns movies added by the biggest number of users.
+
+        Ordering is served by `movie_wanted_by_count_idx` index.
+
         Args:
-            count: The number of movies to return.
+            count: The number of movies to return. Pass `None` to get
+                unsliced queryset.
+
+        """
+        queryset = self.filter(
+            wanted_by_count__gt=0,
+        ).order_by("-wanted_by_count", "-id")
+        if count is None:
+            return queryset
+        return queryset[:count]
+
+    def search(self, query: str):
+        """Find movies matching query text in the title or description.
+
+        Every word of the query is matched as a prefix against the indexed
+        `search_vector`, so search is served by the GIN index instead of a
+        sequential scan. Results are ordered by relevance, where matches in
+        the title outweigh matches in the description.
+
+        """
+        words = re.findall(r"[^\W_]+", query)
+        if not words:
+            return self.none()
+
+        search_query = SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            config=SEARCH_CONFIG,
+            search_type="raw",
+        )
+        return self.filter(
+            search_vector=search_query,
+        ).annotate(
+            # `ts_rank` returns `real`, cast it to double precision to get
+            # exact value back from database and paginate by it
+            rank=Cast(
+                SearchRank(models.F("search_vector"), search_query),
+                output_field=models.FloatField(),
+            ),
+        ).order_by("-rank", "-id")
+
+    def similar(self, query: str):
+        """Find movies with titles similar to query text.
+
+        Tolerates typos in the query: titles are matched by trigram word
+        similarity using the `gin_trgm_ops` index on the title, and the
+        closest ones go first.
 
         """
-        args = ("-users__created",) + args
-        return self.order_by(*args)[:count]
+        query = query.strip()
+        return self.filter(
+            title__trigram_word_similar=query,
+        ).annotate(
+            similarity=TrigramWordSimilarity(query, "title"),
+        ).order_by("-similarity", "-id")
@@ -1,4 +1,7 @@
+import datetime
+
 from django.db import models
+from django.db.models.functions import Coalesce
 
 
 class UserMovieQuerySet(models.QuerySet):
@@ -11,8 +14,26 @@ class UserMovieQuerySet(models.QuerySet):
         """Return queryset of not watched users movies."""
         return self.filter(is_watched=False)
 
-    def with_likes_count(self):
-        """Return queryset with annotated likes count."""
+    def for_watchlist(self):
+        """Return queryset prepared for rendering of watchlist.
+
+        Movies are joined in the same query, likes are taken from
+        denormalized `likes_count`. Ordering matches `usermovie_unwatched_idx`
+        index.
+
+        """
+        return self.select_related("movie").order_by("-created", "-id")
+
+    def with_sort_duration(self):
+        """Annotate users movies with duration of movie for sorting.
+
+        Movies with unknown duration get the maximal one, so they go last
+        in ascending ordering and annotation never contains nulls.
+
+        """
         return self.annotate(
-            likes_count=models.Count("likes"),
+            sort_duration=Coalesce(
+                "movie__duration",
+                models.Value(datetime.timedelta.max),
+            ),
         )
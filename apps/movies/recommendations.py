@@ -0,0 +1,351 @@
+import itertools
+import logging
+import time
+import typing
+
+from django.conf import settings
+from django.db import transaction
+
+import numpy as np
+from scipy import sparse
+
+from . import models
+
+logger = logging.getLogger("django")
+
+
+class Interactions(typing.NamedTuple):
+    """Sparse matrix of interest of users in movies.
+
+    Rows are users from `user_ids`, columns are movies from `movie_ids`.
+
+    """
+    matrix: sparse.csr_matrix
+    user_ids: np.ndarray
+    movie_ids: np.ndarray
+
+
+def _iter_arrays(rows: typing.Iterable[tuple], chunk_size: int):
+    """Group rows of ints into 2D arrays of at most chunk size rows."""
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        yield np.array(chunk, dtype=np.int64)
+
+
+def load_interactions(chunk_size: int) -> Interactions:
+    """Load interactions of users with movies in chunks.
+
+    Movie in watchlist of user counts as interaction with weight 1, like of
+    movie in friend's watchlist counts as interaction with weight
+    `RECOMMENDATIONS_LIKE_WEIGHT`. Weights of one user and movie are summed
+    up to 1.
+
+    """
+    sources = (
+        (
+            models.UserMovie.objects.order_by().values_list(
+                "user_id",
+                "movie_id",
+            ),
+            1.0,
+        ),
+        (
+            models.UserMovie.likes.through.objects.order_by().values_list(
+                "user_id",
+                "usermovie__movie_id",
+            ),
+            settings.RECOMMENDATIONS_LIKE_WEIGHT,
+        ),
+    )
+    pairs, weights = [], []
+    for queryset, weight in sources:
+        for chunk in _iter_arrays(
+            queryset.iterator(chunk_size=chunk_size),
+            chunk_size,
+        ):
+            pairs.append(chunk)
+            weights.append(np.full(len(chunk), weight, dtype=np.float32))
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), np.int64)
+    user_ids, user_index = np.unique(pairs[:, 0], return_inverse=True)
+    movie_ids, movie_index = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (
+            np.concatenate(weights) if weights else np.empty(0, np.float32),
+            (user_index, movie_index),
+        ),
+        shape=(len(user_ids), len(movie_ids)),
+        dtype=np.float32,
+    )
+    # Duplicates are summed up on conversion to csr
+    np.minimum(matrix.data, 1, out=matrix.data)
+    return Interactions(matrix, user_ids, movie_ids)
+
+
+def limit_user_interactions(
+    matrix: sparse.csr_matrix,
+    max_interactions: int,
+    seed: int = 0,
+) -> sparse.csr_matrix:
+    """Keep random sample of interactions of users with too many of them.
+
+    Cost of item-item similarity is a sum of squares of interactions
+    counts of users, so limit keeps it linear in count of interactions.
+
+    """
+    counts = np.diff(matrix.indptr)
+    heavy_rows = np.flatnonzero(counts > max_interactions)
+    if not len(heavy_rows):
+        return matrix
+    rng = np.random.default_rng(seed)
+    keep = np.ones(matrix.nnz, dtype=bool)
+    for row in heavy_rows:
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        dropped = rng.choice(
+            end - start,
+            size=end - start - max_interactions,
+            replace=False,
+        )
+        keep[start + dropped] = False
+    rows = np.repeat(np.arange(matrix.shape[0]), counts)
+    return sparse.csr_matrix(
+        (matrix.data[keep], (rows[keep], matrix.indices[keep])),
+        shape=matrix.shape,
+    )
+
+
+def iter_top_k(
+    matrix: sparse.csr_matrix,
+    k: int,
+) -> typing.Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """Get columns and values of k largest positive values of rows.
+
+    Yields:
+        Index of row, indexes of columns and values, largest first. Rows
+        without positive values are skipped.
+
+    """
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        values = matrix.data[start:end]
+        columns = matrix.indices[start:end]
+        positive = values > 0
+        values, columns = values[positive], columns[positive]
+        if not len(values):
+            continue
+        if len(values) > k:
+            top = np.argpartition(-values, k - 1)[:k]
+            values, columns = values[top], columns[top]
+        order = np.lexsort((columns, -values))
+        yield row, columns[order], values[order]
+
+
+def compute_movie_neighbours(
+    matrix: sparse.csr_matrix,
+    k: int,
+    block_size: int,
+) -> sparse.csr_matrix:
+    """Compute k most similar movies of every movie.
+
+    Similarity is cosine of columns of interactions matrix. It's computed
+    for blocks of movies, so only similarities of one block are kept in
+    memory at once.
+
+    Returns:
+        Sparse movies by movies matrix with k largest similarities in rows.
+
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0))).ravel()
+    norms[norms == 0] = 1
+    normalized = matrix.multiply(1 / norms).tocsr()
+    transposed = normalized.T.tocsr()
+    movies_count = matrix.shape[1]
+    rows, columns, values = [], [], []
+    for start in range(0, movies_count, block_size):
+        block = transposed[start:start + block_size] @ normalized
+        # Movie isn't neighbour of itself
+        block = block - block.multiply(
+            sparse.eye(block.shape[0], movies_count, k=start),
+        )
+        block = sparse.csr_matrix(block)
+        for row, top_columns, top_values in iter_top_k(block, k):
+            rows.append(np.full(len(top_columns), start + row))
+            columns.append(top_columns)
+            values.append(top_values)
+    return _from_parts(rows, columns, values, (movies_count, movies_count))
+
+
+def compute_user_recommendations(
+    matrix: sparse.csr_matrix,
+    neighbours: sparse.csr_matrix,
+    k: int,
+    block_size: int,
+    seen: sparse.csr_matrix | None = None,
+) -> sparse.csr_matrix:
+    """Compute k best movies for every user.
+
+    Score of movie is a sum of its similarities to movies user interacted
+    with, weighted by interactions. Movies user already interacted with
+    aren't recommended.
+
+    Args:
+        matrix: Interactions used for scoring, may be a sample of them.
+        neighbours: Similarities of movies.
+        k: Count of recommended movies per user.
+        block_size: Count of users scored at once.
+        seen: All interactions excluded from recommendations, `matrix` by
+            default.
+
+    """
+    if seen is None:
+        seen = matrix
+    users_count = matrix.shape[0]
+    rows, columns, values = [], [], []
+    for start in range(0, users_count, block_size):
+        interactions = matrix[start:start + block_size]
+        scores = interactions @ neighbours
+        scores = sparse.csr_matrix(
+            scores - scores.multiply(
+                seen[start:start + block_size].astype(bool),
+            ),
+        )
+        for row, top_columns, top_values in iter_top_k(scores, k):
+            rows.append(np.full(len(top_columns), start + row))
+            columns.append(top_columns)
+            values.append(top_values)
+    return _from_parts(rows, columns, values, (users_count, matrix.shape[1]))
+
+
+def _from_parts(rows, columns, values, shape) -> sparse.csr_matrix:
+    """Build sparse matrix from lists of arrays of coordinates and data."""
+    if not rows:
+        return sparse.csr_matrix(shape, dtype=np.float32)
+    return sparse.csr_matrix(
+        (
+            np.concatenate(values),
+            (np.concatenate(rows), np.concatenate(columns)),
+        ),
+        shape=shape,
+    )
+
+
+def _iter_ranked_rows(
+    matrix: sparse.csr_matrix,
+    column_ids: np.ndarray,
+) -> typing.Iterator[tuple[int, list[int], list[float]]]:
+    """Get ids of columns of rows ranked by values, largest first."""
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        if start == end:
+            continue
+        values = matrix.data[start:end]
+        columns = matrix.indices[start:end]
+        order = np.lexsort((columns, -values))
+        yield (
+            row,
+            column_ids[columns[order]].tolist(),
+            np.round(values[order], 6).tolist(),
+        )
+
+
+def replace_rows(queryset, rows: typing.Iterable, batch_size: int) -> None:
+    """Replace rows of queryset in one transaction."""
+    rows = iter(rows)
+    with transaction.atomic():
+        queryset.delete()
+        while batch := list(itertools.islice(rows, batch_size)):
+            queryset.model.objects.bulk_create(batch)
+
+
+def build_recommendations() -> dict[str, int]:
+    """Build collaborative filtering recommendations.
+
+    Interactions of users with movies are loaded in chunks into sparse
+    matrix. Then k most similar movies are found for every movie and movies
+    similar to ones in watchlist of user are recommended to user. Time and
+    memory are linear in count of interactions, because interactions of
+    every user are limited by `RECOMMENDATIONS_MAX_USER_INTERACTIONS`.
+
+    Returns:
+        Counts of interactions, movies with neighbours and users with
+        recommendations.
+
+    """
+    started = time.perf_counter()
+    interactions = load_interactions(settings.RECOMMENDATIONS_CHUNK_SIZE)
+    matrix = limit_user_interactions(
+        interactions.matrix,
+        settings.RECOMMENDATIONS_MAX_USER_INTERACTIONS,
+    )
+    neighbours = compute_movie_neighbours(
+        matrix,
+        k=settings.RECOMMENDATIONS_NEIGHBOURS_COUNT,
+        block_size=settings.RECOMMENDATIONS_BLOCK_SIZE,
+    )
+    recommendations = compute_user_recommendations(
+        matrix,
+        neighbours,
+        k=settings.RECOMMENDATIONS_COUNT,
+        block_size=settings.RECOMMENDATIONS_BLOCK_SIZE,
+        # Sample is used only for scoring, movies dropped from it are still
+        # in watchlists
+        seen=interactions.matrix,
+    )
+    movie_ids, user_ids = interactions.movie_ids, interactions.user_ids
+    replace_rows(
+        models.MovieNeighbours.objects.filter(
+            kind=models.MovieNeighbours.KIND_COLLABORATIVE,
+        ),
+        (
+            models.MovieNeighbours(
+                movie_id=int(movie_ids[row]),
+                kind=models.MovieNeighbours.KIND_COLLABORATIVE,
+                movie_ids=neighbour_ids,
+                scores=scores,
+            )
+            for row, neighbour_ids, scores in _iter_ranked_rows(
+                neighbours,
+                movie_ids,
+            )
+        ),
+        batch_size=settings.RECOMMENDATIONS_CHUNK_SIZE,
+    )
+    replace_rows(
+        models.UserRecommendations.objects.all(),
+        (
+            models.UserRecommendations(
+                user_id=int(user_ids[row]),
+                movie_ids=recommended_ids,
+                scores=scores,
+            )
+            for row, recommended_ids, scores in _iter_ranked_rows(
+                recommendations,
+                movie_ids,
+            )
+        ),
+        batch_size=settings.RECOMMENDATIONS_CHUNK_SIZE,
+    )
+    stats = dict(
+        interactions=interactions.matrix.nnz,
+        movies=int(np.count_nonzero(np.diff(neighbours.indptr))),
+        users=int(np.count_nonzero(np.diff(recommendations.indptr))),
+    )
+    logger.info(
+        "Recommendations built in %.1f s: %s",
+        time.perf_counter() - started,
+        stats,
+    )
+    return stats
+
+
+def get_recommended_movies(user_id: int) -> list[models.Movie]:
+    """Get precomputed recommendations of user, best first."""
+    recommendations = models.UserRecommendations.objects.filter(
+        user_id=user_id,
+    ).first()
+    if recommendations is None:
+        return []
+    movies = models.Movie.objects.in_bulk(recommendations.movie_ids)
+    return [
+        movies[movie_id] for movie_id in recommendations.movie_ids
+        if movie_id in movies
+    ]
@@ -0,0 +1,629 @@
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import io
+import logging
+import posixpath
+import typing
+import urllib.parse
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from django_redis import get_redis_connection
+from PIL import Image
+
+from libs import http, kinopoisk, uploads
+
+from apps.core.services import change_file_references
+from apps.users.models import User
+
+from . import models as movies_models
+from . import feed, tasks, taste
+
+logger = logging.getLogger("django")
+
+WATCHLIST_VERSION_KEY = "watchlist:version:{user_id}"
+# Version of all movies, changed after any movie is saved or deleted
+MOVIES_VERSION_KEY = "movies:version"
+WATCHLIST_FRAGMENT_KEY = "watchlist:fragment:{uid}:{version}:{variant}"
+WATCHLIST_CACHE_HITS_KEY = "watchlist:cache:hits"
+WATCHLIST_CACHE_MISSES_KEY = "watchlist:cache:misses"
+# Token bucket of requests to Kinopoisk shared by all workers
+KINOPOISK_RATE_LIMIT_KEY = "kinopoisk:rate_limit"
+
+WATCHLIST_ADD = "add"
+WATCHLIST_REMOVE = "remove"
+WATCHLIST_WATCH = "watch"
+WATCHLIST_UNWATCH = "unwatch"
+WATCHLIST_ACTIONS = (
+    WATCHLIST_ADD,
+    WATCHLIST_REMOVE,
+    WATCHLIST_WATCH,
+    WATCHLIST_UNWATCH,
+)
+
+MOVIE_EXPORT_FIELDS = (
+    "id",
+    "kinopoisk_id",
+    "title",
+    "description",
+    "duration",
+    "poster",
+    "created",
+    "modified",
+)
+WATCHLIST_EXPORT_FIELDS = (
+    "id",
+    "movie_id",
+    "movie__kinopoisk_id",
+    "movie__title",
+    "is_watched",
+    "likes_count",
+    "created",
+)
+
+# Formats of posters accepted from direct uploads
+POSTER_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "WEBP": ".webp",
+}
+
+_stats_updates_suspended = contextvars.ContextVar(
+    "stats_updates_suspended",
+    default=False,
+)
+
+
+def stats_updates_suspended() -> bool:
+    """Return whether per row updates of stats are suspended."""
+    return _stats_updates_suspended.get()
+
+
+@contextlib.contextmanager
+def suspend_stats_updates():
+    """Suspend per row updates of stats and watchlists cache by signals.
+
+    Used for bulk changes, which update stats and invalidate cache once
+    for all changed rows.
+
+    """
+    token = _stats_updates_suspended.set(True)
+    try:
+        yield
+    finally:
+        _stats_updates_suspended.reset(token)
+
+
+def register_movie_added(user_movie: movies_models.UserMovie) -> None:
+    """Update stats of movie after user added it to watchlist.
+
+    Counter is changed with `F()` expression in a single `UPDATE`, so
+    concurrent additions don't override each other.
+
+    """
+    movies_models.Movie.objects.filter(pk=user_movie.movie_id).update(
+        wanted_by_count=models.F("wanted_by_count") + 1,
+        # GREATEST ignores nulls in PostgreSQL
+        last_added_at=Greatest(
+            models.F("last_added_at"),
+            models.Value(user_movie.created),
+        ),
+    )
+
+
+def register_movie_removed(user_movie: movies_models.UserMovie) -> None:
+    """Update stats of movie after user removed it from watchlist."""
+    movies_models.Movie.objects.filter(pk=user_movie.movie_id).update(
+        wanted_by_count=Greatest(
+            models.F("wanted_by_count") - 1,
+            models.Value(0),
+        ),
+        last_added_at=models.Subquery(
+            movies_models.UserMovie.objects.filter(
+                movie_id=models.OuterRef("pk"),
+            ).order_by("-created").values("created")[:1],
+        ),
+    )
+
+
+def refresh_movie_stats(movie_ids: typing.Iterable[int]) -> int:
+    """Recalculate denormalized stats of movies from `UserMovie` rows.
+
+    Used to repair stats after bulk operations, which skip signals.
+
+    Returns:
+        Count of updated movies.
+
+    """
+    user_movies = movies_models.UserMovie.objects.filter(
+        movie_id=models.OuterRef("pk"),
+    ).order_by().values("movie_id")
+    return movies_models.Movie.objects.filter(pk__in=movie_ids).update(
+        wanted_by_count=Coalesce(
+            models.Subquery(
+                user_movies.annotate(
+                    count=models.Count("pk"),
+                ).values("count"),
+            ),
+            models.Value(0),
+        ),
+        last_added_at=models.Subquery(
+            user_movies.annotate(
+                last_added_at=models.Max("created"),
+            ).values("last_added_at"),
+        ),
+    )
+
+
+def refresh_likes_count(user_movie_ids: typing.Iterable[int]) -> int:
+    """Recalculate denormalized likes count of users movies.
+
+    Used by signals on every change of likes, because concurrent requests
+    may add or remove the same like, and only one of them changes the
+    table. Only movies with drifted counter are updated.
+
+    Users movies are locked before recount, so concurrent changes of likes
+    of the same movie are counted one after another. Each statement of
+    READ COMMITTED transaction sees likes committed before it started, so
+    the later recount sees likes of the earlier one.
+
+    Returns:
+        Count of updated users movies.
+
+    """
+    user_movie_ids = list(user_movie_ids)
+    likes_count = Coalesce(
+        models.Subquery(
+            movies_models.UserMovie.likes.through.objects.filter(
+                usermovie_id=models.OuterRef("pk"),
+            ).order_by().values("usermovie_id").annotate(
+                count=models.Count("pk"),
+            ).values("count"),
+        ),
+        models.Value(0),
+    )
+    user_movies = movies_models.UserMovie.objects.filter(
+        pk__in=user_movie_ids,
+    )
+    with transaction.atomic():
+        # Rows are locked in order of ids to avoid deadlocks. Inserts of
+        # likes hold key share locks of rows, which conflict with `FOR
+        # UPDATE`, but not with `FOR NO KEY UPDATE`
+        list(
+            user_movies.select_for_update(
+                no_key=True,
+            ).order_by("pk").values_list("pk", flat=True),
+        )
+        return user_movies.alias(
+            actual_likes_count=likes_count,
+        ).exclude(
+            likes_count=models.F("actual_likes_count"),
+        ).update(likes_count=likes_count)
+
+
+class PosterError(Exception):
+    """Uploaded poster isn't a valid image."""
+
+
+class DataVersion(typing.NamedTuple):
+    """Version of cached data, like user's watchlist or list of movies.
+
+    `key` is a random string, so after invalidation (removal of version
+    from cache) data never gets one of its previous versions. `created` is
+    the time version was created, data wasn't changed after it.
+
+    """
+    key: str
+    created: datetime.datetime
+
+
+def apply_watchlist_changes(
+    user: User,
+    changes: typing.Sequence[dict],
+) -> models.QuerySet:
+    """Apply batch of changes to user's watchlist in one transaction.
+
+    Each change is a dict with `movie` id and `action`: `add` adds movie to
+    watchlist, `remove` removes it, `watch` and `unwatch` add movie if it's
+    missing and set its watched status. Each movie must appear only once.
+
+    Changes are applied with one query per kind of change instead of query
+    per movie, movie stats are refreshed with one query. Added and watched
+    movies are published to feeds of friends from returned entries, so
+    they take no extra query.
+
+    Returns:
+        Queryset of added and updated users movies.
+
+    """
+    movie_ids = {action: set() for action in WATCHLIST_ACTIONS}
+    for change in changes:
+        movie_ids[change["action"]].add(change["movie"])
+    upserted_ids = (
+        movie_ids[WATCHLIST_ADD]
+        | movie_ids[WATCHLIST_WATCH]
+        | movie_ids[WATCHLIST_UNWATCH]
+    )
+    user_movies = movies_models.UserMovie.objects.filter(user=user)
+    started = timezone.now()
+
+    taste_user_ids = {user.pk}
+    with transaction.atomic(), suspend_stats_updates():
+        if movie_ids[WATCHLIST_REMOVE]:
+            removed = user_movies.filter(
+                movie_id__in=movie_ids[WATCHLIST_REMOVE],
+            )
+            # Likes are deleted with entries, so likers lose liked movies
+            taste_user_ids.update(
+                movies_models.UserMovie.likes.through.objects.filter(
+                    usermovie__in=removed,
+                ).values_list("user_id", flat=True),
+            )
+            removed.delete()
+        # Conflicts on unique (user, movie) are movies already in watchlist
+        movies_models.UserMovie.objects.bulk_create(
+            [
+                movies_models.UserMovie(
+                    user=user,
+                    movie_id=movie_id,
+                    is_watched=movie_id in movie_ids[WATCHLIST_WATCH],
+                )
+                for movie_id in sorted(upserted_ids)
+            ],
+            ignore_conflicts=True,
+        )
+        for action, is_watched in (
+            (WATCHLIST_WATCH, True),
+            (WATCHLIST_UNWATCH, False),
+        ):
+            if not movie_ids[action]:
+                continue
+            user_movies.filter(
+                movie_id__in=movie_ids[action],
+            ).exclude(is_watched=is_watched).update(
+                is_watched=is_watched,
+                modified=timezone.now(),
+            )
+        refresh_movie_stats(upserted_ids | movie_ids[WATCHLIST_REMOVE])
+        transaction.on_commit(lambda: invalidate_watchlists([user.pk]))
+        transaction.on_commit(
+            lambda: taste.invalidate_movie_sets(taste_user_ids),
+        )
+    changed = user_movies.filter(movie_id__in=upserted_ids).for_watchlist()
+    # Entries, which are created or updated to watched by this batch
+    activities = [
+        feed.Activity(
+            feed.EVENT_WATCHED if user_movie.is_watched else feed.EVENT_ADDED,
+            user.pk,
+            user_movie.pk,
+        )
+        for user_movie in changed
+        if user_movie.created >= started
+        or (user_movie.is_watched and user_movie.modified >= started)
+    ]
+    if activities:
+        transaction.on_commit(lambda: feed.publish_activities(activities))
+    return changed
+
+
+def iter_movies_export(after: int = 0) -> typing.Iterator[dict]:
+    """Iterate over rows of movies export ordered by id.
+
+    Rows are fetched by chunks of `EXPORT_CHUNK_SIZE` with server-side
+    cursor, so memory usage doesn't depend on count of movies.
+
+    Args:
+        after: Id of last exported movie, used to resume broken export.
+
+    """
+    return movies_models.Movie.objects.filter(
+        pk__gt=after,
+    ).order_by("pk").values(*MOVIE_EXPORT_FIELDS).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
+
+
+def iter_watchlist_export(
+    user: User,
+    after: int = 0,
+) -> typing.Iterator[dict]:
+    """Iterate over rows of user's watchlist export ordered by id.
+
+    Works the same way as `iter_movies_export`.
+
+    """
+    return movies_models.UserMovie.objects.filter(
+        user=user,
+        pk__gt=after,
+    ).order_by("pk").values(*WATCHLIST_EXPORT_FIELDS).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
+
+
+def fetch_kinopoisk_movies(
+    kinopoisk_ids: typing.Iterable[int],
+    api_url: str | None = None,
+) -> tuple[int, http.RequestStats]:
+    """Fetch metadata of movies from Kinopoisk API and update movies.
+
+    Movies are fetched concurrently within `KINOPOISK_CONCURRENCY`.
+    `KINOPOISK_RATE_LIMIT` is shared by all workers through Redis, so
+    concurrent tasks don't multiply it. Responses are cached in
+    `KINOPOISK_CACHE_DIR`. Posters are downloaded from CDN without cache
+    and only for movies without poster.
+
+    Args:
+        kinopoisk_ids: Kinopoisk ids of movies.
+        api_url: Base url of API, `KINOPOISK_API_URL` by default.
+
+    Returns:
+        Count of updated movies and stats of requests.
+
+    """
+    client = kinopoisk.KinopoiskClient(
+        base_url=api_url or settings.KINOPOISK_API_URL,
+        api_key=settings.KINOPOISK_API_KEY,
+        rate_limit=settings.KINOPOISK_RATE_LIMIT,
+        concurrency=settings.KINOPOISK_CONCURRENCY,
+        cache=http.DiskCache(
+            settings.KINOPOISK_CACHE_DIR,
+            max_age=settings.KINOPOISK_CACHE_MAX_AGE,
+        ),
+        rate_limiter=http.RedisRateLimiter(
+            get_redis_connection("default"),
+            key=KINOPOISK_RATE_LIMIT_KEY,
+            rate=settings.KINOPOISK_RATE_LIMIT,
+            burst=settings.KINOPOISK_CONCURRENCY,
+        ),
+    )
+
+    kinopoisk_ids = list(kinopoisk_ids)
+    # Posters are downloaded only for movies, which would save them
+    poster_ids = set(
+        movies_models.Movie.objects.filter(
+            models.Q(poster__isnull=True) | models.Q(poster=""),
+            kinopoisk_id__in=kinopoisk_ids,
+        ).values_list("kinopoisk_id", flat=True),
+    )
+
+    async def fetch() -> list[kinopoisk.KinopoiskMovie]:
+        async with client:
+            return await client.fetch_movies(
+                kinopoisk_ids,
+                poster_ids=poster_ids,
+            )
+
+    fetched = asyncio.run(fetch())
+    return update_movies_from_kinopoisk(fetched), client.stats
+
+
+def update_movies_from_kinopoisk(
+    fetched: typing.Iterable[kinopoisk.KinopoiskMovie],
+) -> int:
+    """Update movies with metadata fetched from Kinopoisk.
+
+    Missing fields don't overwrite existing values, posters are saved only
+    for movies without poster and their thumbnails are generated by a task.
+    Movies are updated with one query, version of movies and watchlists
+    with them are invalidated.
+
+    Returns:
+        Count of updated movies.
+
+    """
+    fetched = {movie.kinopoisk_id: movie for movie in fetched}
+    movies = movies_models.Movie.objects.in_bulk(
+        fetched,
+        field_name="kinopoisk_id",
+    )
+    now = timezone.now()
+    poster_ids = []
+    for kinopoisk_id, movie in movies.items():
+        data = fetched[kinopoisk_id]
+        movie.title = data.title or movie.title
+        movie.description = data.description or movie.description
+        movie.duration = data.duration or movie.duration
+        movie.modified = now
+        if data.poster and not movie.poster:
+            extension = posixpath.splitext(
+                urllib.parse.urlsplit(data.poster_url).path,
+            )[1]
+            movie.poster.save(
+                f"{kinopoisk_id}{extension or '.jpg'}",
+                ContentFile(data.poster),
+                save=False,
+            )
+            poster_ids.append(movie.pk)
+
+    with transaction.atomic():
+        movies_models.Movie.objects.bulk_update(
+            movies.values(),
+            fields=("title", "description", "duration", "poster", "modified"),
+        )
+        # Bulk update skips signals, which count references to posters
+        change_file_references(
+            (movie.poster.name for movie in movies.values()
+             if movie.pk in poster_ids),
+            1,
+        )
+        owner_ids = list(
+            movies_models.UserMovie.objects.filter(
+                movie__in=movies.values(),
+            ).values_list("user_id", flat=True).distinct(),
+        )
+        transaction.on_commit(lambda: invalidate_watchlists(owner_ids))
+        transaction.on_commit(invalidate_movies_version)
+        if poster_ids:
+            transaction.on_commit(
+                lambda: tasks.generate_poster_thumbnails.delay(poster_ids),
+            )
+    return len(movies)
+
+
+def generate_poster_thumbnails(movie_ids: typing.Iterable[int]) -> int:
+    """Generate thumbnails of posters of movies.
+
+    Thumbnails, which already exist, are skipped. Missing posters (like
+    imported ones, which weren't uploaded yet) are logged and skipped.
+
+    Returns:
+        Count of movies with generated thumbnails.
+
+    """
+    movies = movies_models.Movie.objects.filter(
+        pk__in=movie_ids,
+    ).exclude(poster="").exclude(poster__isnull=True).only("pk", "poster")
+    count = 0
+    for movie in movies.iterator():
+        try:
+            for spec in movies_models.Movie.poster_specs:
+                getattr(movie, spec).generate()
+        except OSError as error:
+            logger.warning(
+                "Failed to generate thumbnails of movie %s: %s",
+                movie.pk,
+                error,
+            )
+            continue
+        count += 1
+    return count
+
+
+def set_poster_from_upload(movie: movies_models.Movie, key: str) -> None:
+    """Set poster of movie from file uploaded directly to storage.
+
+    Poster and its thumbnails are written before movie is saved, so movie
+    keeps showing the old poster (or placeholder) until processing is
+    finished. Uploaded file is deleted afterwards, even if it's invalid.
+
+    Raises:
+        PosterError: If uploaded file isn't a valid image.
+
+    """
+    try:
+        _set_poster_from_content(movie, uploads.read_upload(key))
+    finally:
+        uploads.delete_upload(key)
+
+
+def _set_poster_from_content(
+    movie: movies_models.Movie,
+    content: bytes,
+) -> None:
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image.verify()
+            image_format = image.format
+    except (OSError, Image.DecompressionBombError) as error:
+        raise PosterError(f"Invalid poster: {error}") from error
+    if image_format not in POSTER_EXTENSIONS:
+        raise PosterError(f"Unsupported format of poster: {image_format}")
+    movie.poster.save(
+        f"{movie.kinopoisk_id}{POSTER_EXTENSIONS[image_format]}",
+        ContentFile(content),
+        save=False,
+    )
+    for spec in movies_models.Movie.poster_specs:
+        getattr(movie, spec).generate()
+    movie.save(update_fields=("poster", "modified"))
+
+
+def _get_version(key: str) -> DataVersion:
+    """Get current version of data stored in cache under key."""
+    version = cache.get(key)
+    if version is not None:
+        return version
+    new_version = DataVersion(
+        key=uuid.uuid4().hex,
+        # HTTP dates have precision of seconds
+        created=timezone.now().replace(microsecond=0),
+    )
+    if cache.add(key, new_version, timeout=None):
+        return new_version
+    return cache.get(key, new_version)
+
+
+def get_watchlist_version(user_id: int) -> DataVersion:
+    """Get current version of user's watchlist."""
+    return _get_version(WATCHLIST_VERSION_KEY.format(user_id=user_id))
+
+
+def get_movies_version() -> DataVersion:
+    """Get current version of all movies."""
+    return _get_version(MOVIES_VERSION_KEY)
+
+
+def invalidate_movies_version() -> None:
+    """Change version of movies after some of them are changed."""
+    cache.delete(MOVIES_VERSION_KEY)
+
+
+def invalidate_watchlists(user_ids: typing.Iterable[int]) -> None:
+    """Invalidate cached watchlists of users."""
+    cache.delete_many([
+        WATCHLIST_VERSION_KEY.format(user_id=user_id) for user_id in user_ids
+    ])
+
+
+def get_cached_watchlist(
+    owner: User,
+    variant: str,
+    render: typing.Callable[[], str],
+) -> str:
+    """Get rendered watchlist from cache or render and cache it.
+
+    Args:
+        owner: Owner of watchlist.
+        variant: Part of cache key for different renderings of the same
+            watchlist (like for owner and for other users).
+        render: Function rendering watchlist on cache miss.
+
+    """
+    key = WATCHLIST_FRAGMENT_KEY.format(
+        uid=owner.uid,
+        version=get_watchlist_version(owner.pk).key,
+        variant=variant,
+    )
+    fragment = cache.get(key)
+    _increment_counter(
+        WATCHLIST_CACHE_HITS_KEY if fragment is not None
+        else WATCHLIST_CACHE_MISSES_KEY,
+    )
+    if fragment is None:
+        fragment = render()
+        cache.set(key, fragment, timeout=settings.WATCHLIST_CACHE_TIMEOUT)
+    return fragment
+
+
+def get_watchlist_cache_stats() -> dict[str, int]:
+    """Get counts of hits and misses of watchlist cache."""
+    stats = cache.get_many(
+        [WATCHLIST_CACHE_HITS_KEY, WATCHLIST_CACHE_MISSES_KEY],
+    )
+    return dict(
+        hits=stats.get(WATCHLIST_CACHE_HITS_KEY, 0),
+        misses=stats.get(WATCHLIST_CACHE_MISSES_KEY, 0),
+    )
+
+
+def reset_watchlist_cache_stats() -> None:
+    """Reset counters of hits and misses of watchlist cache."""
+    cache.delete_many([WATCHLIST_CACHE_HITS_KEY, WATCHLIST_CACHE_MISSES_KEY])
+
+
+def _increment_counter(key: str) -> None:
+    """Increment counter stored in cache."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter doesn't exist yet
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
@@ -0,0 +1,277 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from apps.core.services import change_file_references
+
+from . import feed, services, tasks, taste
+from .models import Movie, UserMovie
+
+
+def _invalidate_watchlists_on_commit(user_ids):
+    """Invalidate cached watchlists after transaction is committed.
+
+    Otherwise watchlist, rendered by a concurrent request before commit,
+    would be cached with stale data.
+
+    """
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(
+            lambda: services.invalidate_watchlists(user_ids),
+        )
+
+
+def _invalidate_movie_sets_on_commit(user_ids):
+    """Reset cached movie sets of users after transaction is committed."""
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: taste.invalidate_movie_sets(user_ids))
+
+
+def _publish_activities_on_commit(activities):
+    """Publish activities to feeds of friends after transaction is committed.
+
+    Otherwise friends could see entry, which is rolled back.
+
+    """
+    if activities:
+        transaction.on_commit(lambda: feed.publish_activities(activities))
+
+
+@receiver(post_save, sender=UserMovie)
+def update_stats_on_movie_added(sender, instance, created, **kwargs):
+    """Update movie stats when user added it to watchlist."""
+    if services.stats_updates_suspended():
+        return
+    if created:
+        services.register_movie_added(instance)
+        _invalidate_movie_sets_on_commit([instance.user_id])
+    _invalidate_watchlists_on_commit([instance.user_id])
+
+
+@receiver(pre_save, sender=UserMovie)
+def remember_watched_status(sender, instance, update_fields, **kwargs):
+    """Remember watched status before save to publish watching of movie."""
+    instance._was_watched = False
+    if instance._state.adding or not instance.is_watched:
+        return
+    if update_fields is not None and "is_watched" not in update_fields:
+        return
+    instance._was_watched = UserMovie.objects.filter(
+        pk=instance.pk,
+        is_watched=True,
+    ).exists()
+
+
+@receiver(post_save, sender=UserMovie)
+def publish_watchlist_activity(sender, instance, created, **kwargs):
+    """Publish adding or watching of movie to feeds of friends."""
+    if created:
+        kind = (
+            feed.EVENT_WATCHED if instance.is_watched else feed.EVENT_ADDED
+        )
+    elif instance.is_watched and not instance._was_watched:
+        kind = feed.EVENT_WATCHED
+    else:
+        return
+    _publish_activities_on_commit(
+        [feed.Activity(kind, instance.user_id, instance.pk)],
+    )
+
+
+@receiver(post_delete, sender=UserMovie)
+def update_stats_on_movie_removed(sender, instance, **kwargs):
+    """Update movie stats when user removed it from watchlist."""
+    if services.stats_updates_suspended():
+        return
+    services.register_movie_removed(instance)
+    _invalidate_movie_sets_on_commit([instance.user_id])
+    _invalidate_watchlists_on_commit([instance.user_id])
+
+
+@receiver(pre_delete, sender=UserMovie)
+def invalidate_likers_movie_sets(sender, instance, **kwargs):
+    """Reset cached movie sets of users, who liked removed movie.
+
+    Likes are deleted with entry of watchlist without `m2m_changed`
+    signal, so likers are collected before deletion. Bulk changes collect
+    likers of all removed entries themselves.
+
+    """
+    if services.stats_updates_suspended():
+        return
+    _invalidate_movie_sets_on_commit(
+        instance.likes.values_list("pk", flat=True),
+    )
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def invalidate_movies_version(sender, **kwargs):
+    """Change version of movies after transaction is committed."""
+    transaction.on_commit(services.invalidate_movies_version)
+
+
+@receiver(post_save, sender=Movie)
+def invalidate_watchlists_on_movie_change(sender, instance, created, **kwargs):
+    """Invalidate cached watchlists containing changed movie."""
+    if created:
+        return
+    _invalidate_watchlists_on_commit(
+        UserMovie.objects.filter(
+            movie_id=instance.pk,
+        ).values_list("user_id", flat=True),
+    )
+
+
+@receiver(post_save, sender=Movie)
+def generate_poster_thumbnails_on_save(sender, instance, **kwargs):
+    """Generate thumbnails of poster in background after poster is changed.
+
+    Task checks existence of every thumbnail in storage, so it's queued
+    only when saved poster differs from previous one.
+
+    """
+    previous_poster = instance._previous_poster
+    if not instance.poster or previous_poster is None:
+        return
+    if instance.poster.name == previous_poster:
+        return
+    transaction.on_commit(
+        lambda: tasks.generate_poster_thumbnails.delay([instance.pk]),
+    )
+
+
+@receiver(pre_save, sender=Movie)
+def remember_previous_poster(sender, instance, update_fields, **kwargs):
+    """Remember stored poster before save to move its reference.
+
+    Previous poster is `None`, if save doesn't write poster.
+
+    """
+    instance._previous_poster = ""
+    if instance._state.adding:
+        return
+    if update_fields is not None and "poster" not in update_fields:
+        instance._previous_poster = None
+        return
+    instance._previous_poster = Movie.objects.filter(
+        pk=instance.pk,
+    ).values_list("poster", flat=True).first() or ""
+
+
+@receiver(post_save, sender=Movie)
+def update_poster_references(sender, instance, **kwargs):
+    """Move reference from previous poster to the saved one."""
+    previous_poster = instance._previous_poster
+    if previous_poster is None:
+        return
+    poster = instance.poster.name or ""
+    if poster != previous_poster:
+        change_file_references([previous_poster], -1)
+        change_file_references([poster], 1)
+
+
+@receiver(post_delete, sender=Movie)
+def remove_poster_reference(sender, instance, **kwargs):
+    """Remove reference to poster of deleted movie."""
+    change_file_references([instance.poster.name], -1)
+
+
+@receiver(m2m_changed, sender=UserMovie.likes.through)
+def update_likes_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep `UserMovie.likes_count` in sync with likes.
+
+    Works for both sides of relation: `user_movie.likes.add(user)` and
+    `user.likes.add(user_movie)`. On `post_add` Django passes only ids of
+    really added likes, but on removal it passes requested ids, so likes
+    that exist are looked up before removal.
+
+    Counts are recalculated from likes instead of changed by count of
+    passed ids: when concurrent requests add the same like, `pk_set` of
+    both contains it, but only one of them inserts it.
+
+    Cached watchlists with changed likes are invalidated.
+
+    """
+    if action in ("pre_remove", "pre_clear"):
+        likes = sender.objects.filter(
+            **{"user_id" if reverse else "usermovie_id": instance.pk},
+        )
+        if action == "pre_remove":
+            likes = likes.filter(
+                **{"usermovie_id__in" if reverse else "user_id__in": pk_set},
+            )
+        instance._removed_likes = list(
+            likes.values_list("usermovie_id", flat=True),
+        )
+        return
+
+    if action == "post_add":
+        changed_ids = pk_set
+    elif action in ("post_remove", "post_clear"):
+        changed_ids = instance.__dict__.pop("_removed_likes", [])
+    else:
+        return
+    if not changed_ids:
+        return
+
+    if reverse:
+        # Instance is a user, who liked or unliked users movies
+        services.refresh_likes_count(changed_ids)
+        owner_ids = UserMovie.objects.filter(
+            pk__in=changed_ids,
+        ).values_list("user_id", flat=True)
+    else:
+        # Instance is a user movie, which got or lost likes
+        services.refresh_likes_count([instance.pk])
+        owner_ids = [instance.user_id]
+    _invalidate_watchlists_on_commit(owner_ids)
+
+
+@receiver(m2m_changed, sender=UserMovie.likes.through)
+def invalidate_movie_sets_on_likes_change(
+    sender,
+    instance,
+    action,
+    reverse,
+    pk_set,
+    **kwargs,
+):
+    """Reset cached movie sets of users, whose likes are changed."""
+    if reverse:
+        # Instance is a user, who liked or unliked users movies
+        if action in ("post_add", "post_remove", "post_clear"):
+            _invalidate_movie_sets_on_commit([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        _invalidate_movie_sets_on_commit(pk_set or ())
+    elif action == "pre_clear":
+        _invalidate_movie_sets_on_commit(
+            instance.likes.values_list("pk", flat=True),
+        )
+
+
+@receiver(m2m_changed, sender=UserMovie.likes.through)
+def publish_likes(sender, instance, action, reverse, pk_set, **kwargs):
+    """Publish added likes to feeds of friends of likers."""
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        # Instance is a user, who liked users movies
+        activities = [
+            feed.Activity(feed.EVENT_LIKED, instance.pk, user_movie_id)
+            for user_movie_id in sorted(pk_set)
+        ]
+    else:
+        activities = [
+            feed.Activity(feed.EVENT_LIKED, user_id, instance.pk)
+            for user_id in sorted(pk_set)
+        ]
+    _publish_activities_on_commit(activities)
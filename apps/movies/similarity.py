@@ -0,0 +1,413 @@
+import collections
+import io
+import re
+import typing
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+import numpy as np
+from scipy import sparse
+
+from . import models
+from .recommendations import iter_top_k, replace_rows
+
+KIND = models.MovieNeighbours.KIND_CONTENT
+# Words are hashed into fixed count of features, so vectors of movies
+# don't depend on vocabulary of catalog
+FEATURES_COUNT = 2 ** 20
+TOKEN_RE = re.compile(r"\w{2,}")
+# Corpus of the last full build, new movies are vectorized with its weights
+CORPUS_KEY = "similarity:corpus"
+
+
+class Corpus(typing.NamedTuple):
+    """TF-IDF vectors of all movies.
+
+    Rows are movies from `movie_ids`, they are normalized, so product of
+    rows is cosine similarity of movies. `idf` are weights of terms, which
+    are used to vectorize movies added later.
+
+    """
+    vectors: sparse.csr_matrix
+    movie_ids: np.ndarray
+    idf: np.ndarray
+
+    def encode(self) -> bytes:
+        """Encode corpus into compressed arrays."""
+        output = io.BytesIO()
+        np.savez_compressed(
+            output,
+            data=self.vectors.data,
+            indices=self.vectors.indices,
+            indptr=self.vectors.indptr,
+            movie_ids=self.movie_ids,
+            idf=self.idf,
+        )
+        return output.getvalue()
+
+    @classmethod
+    def decode(cls, value: bytes) -> "Corpus":
+        """Decode corpus from compressed arrays."""
+        arrays = np.load(io.BytesIO(value))
+        movie_ids = arrays["movie_ids"]
+        return cls(
+            vectors=sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=(len(movie_ids), FEATURES_COUNT),
+            ),
+            movie_ids=movie_ids,
+            idf=arrays["idf"],
+        )
+
+
+def _feature(token: str) -> int:
+    """Get feature of token, which is the same in every process."""
+    return zlib.crc32(token.encode()) % FEATURES_COUNT
+
+
+def count_terms(
+    texts: typing.Iterable[tuple[str | None, str | None]],
+) -> sparse.csr_matrix:
+    """Count hashed words of titles and descriptions.
+
+    Words of title count `SIMILAR_MOVIES_TITLE_WEIGHT` times.
+
+    """
+    indptr, indices, data = [0], [], []
+    for title, description in texts:
+        counts = collections.Counter()
+        for token in TOKEN_RE.findall((title or "").lower()):
+            counts[_feature(token)] += settings.SIMILAR_MOVIES_TITLE_WEIGHT
+        for token in TOKEN_RE.findall((description or "").lower()):
+            counts[_feature(token)] += 1
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (
+            np.array(data, dtype=np.float32),
+            np.array(indices, dtype=np.int32),
+            np.array(indptr, dtype=np.int64),
+        ),
+        shape=(len(indptr) - 1, FEATURES_COUNT),
+    )
+
+
+def get_idf(counts: sparse.csr_matrix) -> np.ndarray:
+    """Get inverse document frequencies of terms.
+
+    Terms found in more than `SIMILAR_MOVIES_MAX_DOCUMENT_FREQUENCY` of
+    movies are dropped as stop words.
+
+    """
+    counts = counts.copy()
+    counts.sum_duplicates()
+    documents_count = counts.shape[0]
+    frequencies = np.bincount(counts.indices, minlength=FEATURES_COUNT)
+    idf = np.log((1 + documents_count) / (1 + frequencies)) + 1
+    max_frequency = (
+        settings.SIMILAR_MOVIES_MAX_DOCUMENT_FREQUENCY * documents_count
+    )
+    if documents_count > 1:
+        idf[frequencies > max_frequency] = 0
+    return idf.astype(np.float32)
+
+
+def weigh_terms(
+    counts: sparse.csr_matrix,
+    idf: np.ndarray,
+) -> sparse.csr_matrix:
+    """Convert counts of terms to normalized TF-IDF vectors.
+
+    Only `SIMILAR_MOVIES_MAX_TERMS` heaviest terms of every movie are kept,
+    so similarities are approximate, but products of vectors stay sparse.
+
+    """
+    counts = counts.copy()
+    counts.sum_duplicates()
+    counts.data = (
+        (1 + np.log(counts.data)) * idf[counts.indices]
+    ).astype(np.float32)
+    max_terms = settings.SIMILAR_MOVIES_MAX_TERMS
+    rows, columns, values = [], [], []
+    for row, top_columns, top_values in iter_top_k(counts, max_terms):
+        rows.append(np.full(len(top_columns), row))
+        columns.append(top_columns)
+        values.append(top_values / np.linalg.norm(top_values))
+    if not rows:
+        return sparse.csr_matrix(counts.shape, dtype=np.float32)
+    return sparse.csr_matrix(
+        (
+            np.concatenate(values),
+            (np.concatenate(rows), np.concatenate(columns)),
+        ),
+        shape=counts.shape,
+    )
+
+
+def _count_movies_terms(movies) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """Count terms of movies given as rows of id, title and description."""
+    movie_ids = []
+
+    def iter_texts():
+        for movie_id, title, description in movies:
+            movie_ids.append(movie_id)
+            yield title, description
+
+    counts = count_terms(iter_texts())
+    return counts, np.array(movie_ids, dtype=np.int64)
+
+
+def load_corpus() -> Corpus:
+    """Load titles and descriptions of all movies and vectorize them."""
+    counts, movie_ids = _count_movies_terms(
+        models.Movie.objects.order_by("pk").values_list(
+            "pk",
+            "title",
+            "description",
+        ).iterator(chunk_size=settings.RECOMMENDATIONS_CHUNK_SIZE),
+    )
+    idf = get_idf(counts)
+    return Corpus(weigh_terms(counts, idf), movie_ids, idf)
+
+
+def save_corpus(corpus: Corpus) -> None:
+    """Keep corpus for incremental updates."""
+    cache.set(CORPUS_KEY, corpus.encode(), timeout=None)
+
+
+def get_updated_corpus() -> Corpus:
+    """Get corpus of the last full build extended with new movies.
+
+    Only movies missing in corpus are loaded and vectorized with weights
+    of terms of the last build, deleted movies are dropped. Whole catalog
+    is loaded, if corpus isn't cached.
+
+    """
+    value = cache.get(CORPUS_KEY)
+    if value is None:
+        corpus = load_corpus()
+        save_corpus(corpus)
+        return corpus
+    corpus = Corpus.decode(value)
+    movie_ids = np.fromiter(
+        models.Movie.objects.values_list("pk", flat=True).iterator(
+            chunk_size=settings.RECOMMENDATIONS_CHUNK_SIZE,
+        ),
+        dtype=np.int64,
+    )
+    kept = np.isin(corpus.movie_ids, movie_ids)
+    if not kept.all():
+        corpus = Corpus(
+            corpus.vectors[kept],
+            corpus.movie_ids[kept],
+            corpus.idf,
+        )
+    missing_ids = np.setdiff1d(movie_ids, corpus.movie_ids).tolist()
+    if not missing_ids:
+        return corpus
+    batch_size = settings.RECOMMENDATIONS_CHUNK_SIZE
+    counts, added_ids = _count_movies_terms(
+        movie
+        for start in range(0, len(missing_ids), batch_size)
+        for movie in models.Movie.objects.filter(
+            pk__in=missing_ids[start:start + batch_size],
+        ).order_by("pk").values_list("pk", "title", "description")
+    )
+    corpus = Corpus(
+        sparse.vstack(
+            (corpus.vectors, weigh_terms(counts, corpus.idf)),
+            format="csr",
+        ),
+        np.concatenate((corpus.movie_ids, added_ids)),
+        corpus.idf,
+    )
+    save_corpus(corpus)
+    return corpus
+
+
+def iter_neighbours(
+    corpus: Corpus,
+    rows: np.ndarray,
+) -> typing.Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """Find most similar movies of movies in rows of corpus.
+
+    Similarities are computed by products of blocks of rows with whole
+    corpus, so only one block of similarities is kept in memory.
+
+    Yields:
+        Row of movie, rows of similar movies and their similarities.
+
+    """
+    transposed = corpus.vectors.T.tocsr()
+    block_size = settings.RECOMMENDATIONS_BLOCK_SIZE
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        similarities = corpus.vectors[block_rows] @ transposed
+        # Movie isn't similar to itself
+        similarities = sparse.csr_matrix(
+            similarities - similarities.multiply(
+                sparse.csr_matrix(
+                    (
+                        np.ones(len(block_rows)),
+                        (np.arange(len(block_rows)), block_rows),
+                    ),
+                    shape=similarities.shape,
+                ),
+            ),
+        )
+        similarities.data[
+            similarities.data < settings.SIMILAR_MOVIES_MIN_SCORE
+        ] = 0
+        found = {
+            row: (columns, values)
+            for row, columns, values in iter_top_k(
+                similarities,
+                settings.SIMILAR_MOVIES_COUNT,
+            )
+        }
+        for row, movie_row in enumerate(block_rows):
+            columns, values = found.get(row, ((), ()))
+            yield int(movie_row), np.asarray(columns), np.asarray(values)
+
+
+def _make_row(corpus: Corpus, movie_row: int, rows, scores):
+    """Make row of similar movies of movie from rows of corpus."""
+    return models.MovieNeighbours(
+        movie_id=int(corpus.movie_ids[movie_row]),
+        kind=KIND,
+        movie_ids=corpus.movie_ids[rows.astype(np.int64)].tolist(),
+        scores=np.round(scores, 6).tolist(),
+    )
+
+
+def build_similar_movies() -> int:
+    """Find similar movies of all movies.
+
+    Returns:
+        Count of movies with similar movies.
+
+    """
+    corpus = load_corpus()
+    save_corpus(corpus)
+    found = 0
+
+    def iter_rows():
+        nonlocal found
+        for movie_row, rows, scores in iter_neighbours(
+            corpus,
+            np.arange(len(corpus.movie_ids)),
+        ):
+            found += bool(len(rows))
+            yield _make_row(corpus, movie_row, rows, scores)
+
+    replace_rows(
+        models.MovieNeighbours.objects.filter(kind=KIND),
+        iter_rows(),
+        batch_size=settings.RECOMMENDATIONS_CHUNK_SIZE,
+    )
+    return found
+
+
+def update_similar_movies() -> int:
+    """Find similar movies of new movies.
+
+    New movies are ones without stored similar movies. Only their
+    similarities to the rest of catalog are computed, and they are merged
+    into similar movies of existing movies, if they are closer than
+    existing ones. Vectors of catalog are taken from corpus of the last
+    full build, so only movies added after it are vectorized.
+
+    Returns:
+        Count of new movies.
+
+    """
+    corpus = get_updated_corpus()
+    existing_ids = np.array(
+        models.MovieNeighbours.objects.filter(kind=KIND).values_list(
+            "movie_id",
+            flat=True,
+        ),
+        dtype=np.int64,
+    )
+    is_new = ~np.isin(corpus.movie_ids, existing_ids)
+    new_rows = np.flatnonzero(is_new)
+    if not len(new_rows):
+        return 0
+    new_neighbours = []
+    closer_movies = collections.defaultdict(list)
+    for movie_row, rows, scores in iter_neighbours(corpus, new_rows):
+        new_neighbours.append(_make_row(corpus, movie_row, rows, scores))
+        movie_id = int(corpus.movie_ids[movie_row])
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            if not is_new[row]:
+                closer_movies[int(corpus.movie_ids[row])].append(
+                    (movie_id, score),
+                )
+    with transaction.atomic():
+        models.MovieNeighbours.objects.bulk_create(
+            new_neighbours,
+            batch_size=settings.RECOMMENDATIONS_CHUNK_SIZE,
+            # Movies processed by concurrent update
+            ignore_conflicts=True,
+        )
+        _merge_neighbours(closer_movies)
+    return len(new_rows)
+
+
+def _merge_neighbours(
+    closer_movies: dict[int, list[tuple[int, float]]],
+) -> None:
+    """Add new movies to similar movies of existing movies.
+
+    Similarity is symmetric, so movies, which are similar to new movie, are
+    updated only when they are found among its most similar movies.
+
+    """
+    movie_ids = list(closer_movies)
+    batch_size = settings.RECOMMENDATIONS_CHUNK_SIZE
+    for start in range(0, len(movie_ids), batch_size):
+        neighbours = models.MovieNeighbours.objects.select_for_update().filter(
+            kind=KIND,
+            movie_id__in=movie_ids[start:start + batch_size],
+        )
+        changed = []
+        now = timezone.now()
+        for row in neighbours:
+            merged = dict(zip(row.movie_ids, row.scores))
+            merged.update(closer_movies[row.movie_id])
+            ranked = sorted(
+                merged.items(),
+                key=lambda item: (-item[1], item[0]),
+            )[:settings.SIMILAR_MOVIES_COUNT]
+            if [movie_id for movie_id, _ in ranked] != row.movie_ids:
+                row.movie_ids = [movie_id for movie_id, _ in ranked]
+                row.scores = [score for _, score in ranked]
+                row.modified = now
+                changed.append(row)
+        models.MovieNeighbours.objects.bulk_update(
+            changed,
+            fields=("movie_ids", "scores", "modified"),
+        )
+
+
+def get_similar_movies(
+    movie: models.Movie,
+    limit: int,
+) -> list[models.Movie]:
+    """Get stored similar movies of movie, most similar first."""
+    neighbours = models.MovieNeighbours.objects.filter(
+        movie=movie,
+        kind=KIND,
+    ).values_list("movie_ids", flat=True).first()
+    if not neighbours:
+        return []
+    movies = models.Movie.objects.in_bulk(neighbours[:limit])
+    return [
+        movies[movie_id] for movie_id in neighbours[:limit]
+        if movie_id in movies
+    ]
@@ -0,0 +1,77 @@
+import logging
+
+from django.conf import settings
+
+from celery import shared_task
+
+from libs import uploads
+
+from . import feed, models, recommendations, services, similarity
+
+logger = logging.getLogger("django")
+
+
+@shared_task
+def fetch_kinopoisk_movies(kinopoisk_ids: list[int]) -> int:
+    """Fetch metadata of batch of movies from Kinopoisk."""
+    updated, _ = services.fetch_kinopoisk_movies(kinopoisk_ids)
+    return updated
+
+
+@shared_task
+def generate_poster_thumbnails(movie_ids: list[int]) -> int:
+    """Generate thumbnails of uploaded posters."""
+    return services.generate_poster_thumbnails(movie_ids)
+
+
+@shared_task(soft_time_limit=60)
+def process_poster_upload(movie_id: int, key: str) -> None:
+    """Set poster of movie from file uploaded directly to storage."""
+    movie = models.Movie.objects.filter(pk=movie_id).first()
+    if movie is None:
+        uploads.delete_upload(key)
+        return
+    try:
+        services.set_poster_from_upload(movie, key)
+    except services.PosterError as error:
+        logger.warning("Poster of movie %s isn't set: %s", movie_id, error)
+
+
+@shared_task
+def refresh_kinopoisk_metadata() -> None:
+    """Split all movies into batches fetched by separate tasks."""
+    kinopoisk_ids = list(
+        models.Movie.objects.order_by("pk").values_list(
+            "kinopoisk_id",
+            flat=True,
+        ),
+    )
+    batch_size = settings.KINOPOISK_FETCH_BATCH_SIZE
+    for start in range(0, len(kinopoisk_ids), batch_size):
+        fetch_kinopoisk_movies.delay(
+            kinopoisk_ids[start:start + batch_size],
+        )
+
+
+@shared_task(soft_time_limit=60 * 60)
+def build_recommendations() -> dict[str, int]:
+    """Build collaborative filtering recommendations of movies."""
+    return recommendations.build_recommendations()
+
+
+@shared_task(soft_time_limit=60 * 60)
+def build_similar_movies() -> int:
+    """Find similar movies of all movies by titles and descriptions."""
+    return similarity.build_similar_movies()
+
+
+@shared_task(soft_time_limit=10 * 60)
+def update_similar_movies() -> int:
+    """Find similar movies of movies added since last build."""
+    return similarity.update_similar_movies()
+
+
+@shared_task
+def fan_out_feed_events(events: list[str]) -> int:
+    """Push events of users into feeds of their friends."""
+    return feed.fan_out_events(map(feed.Event.decode, events))
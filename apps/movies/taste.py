@@ -0,0 +1,147 @@
+import collections
+import typing
+
+from django.conf import settings
+from django.core.cache import cache
+
+import numpy as np
+
+from apps.users.graph import friendship_graph
+from apps.users.models import User
+
+from . import models
+
+# Sorted ids of movies in watchlist of user or liked by user, stored as
+# bytes of int32 array
+TASTE_KEY = "taste:movies:{user_id}"
+
+
+def _load_movie_sets(
+    user_ids: typing.Collection[int],
+) -> dict[int, np.ndarray]:
+    """Load movies added or liked by users."""
+    movie_ids = collections.defaultdict(list)
+    for user_id, movie_id in models.UserMovie.objects.filter(
+        user_id__in=user_ids,
+    ).values_list("user_id", "movie_id"):
+        movie_ids[user_id].append(movie_id)
+    for user_id, movie_id in models.UserMovie.likes.through.objects.filter(
+        user_id__in=user_ids,
+    ).values_list("user_id", "usermovie__movie_id"):
+        movie_ids[user_id].append(movie_id)
+    return {
+        user_id: np.unique(np.array(movie_ids[user_id], dtype=np.int32))
+        for user_id in user_ids
+    }
+
+
+def get_movie_sets(
+    user_ids: typing.Collection[int],
+) -> dict[int, np.ndarray]:
+    """Get sorted ids of movies added or liked by users.
+
+    Sets are cached until user changes watchlist or likes, including
+    removal of liked movies from watchlists of their owners.
+
+    """
+    keys = {
+        TASTE_KEY.format(user_id=user_id): user_id for user_id in user_ids
+    }
+    movie_sets = {
+        keys[key]: np.frombuffer(value, dtype=np.int32)
+        for key, value in cache.get_many(keys).items()
+    }
+    missing_ids = [
+        user_id for user_id in user_ids if user_id not in movie_sets
+    ]
+    if missing_ids:
+        loaded = _load_movie_sets(missing_ids)
+        cache.set_many(
+            {
+                TASTE_KEY.format(user_id=user_id): movie_set.tobytes()
+                for user_id, movie_set in loaded.items()
+            },
+            timeout=settings.TASTE_CACHE_TIMEOUT,
+        )
+        movie_sets.update(loaded)
+    return movie_sets
+
+
+def invalidate_movie_sets(user_ids: typing.Iterable[int]) -> None:
+    """Reset cached movie sets of users."""
+    cache.delete_many([
+        TASTE_KEY.format(user_id=user_id) for user_id in user_ids
+    ])
+
+
+def match_movie_sets(
+    movie_set: np.ndarray,
+    other_sets: typing.Sequence[np.ndarray],
+) -> np.ndarray:
+    """Get Jaccard similarity of movie set with every of other sets.
+
+    Other sets are concatenated and checked against bitmap of movie set
+    in one pass. Intersections are counts of common positions within
+    bounds of sets, so there are no Python loops over movies.
+
+    """
+    sizes = np.fromiter(
+        map(len, other_sets),
+        dtype=np.int64,
+        count=len(other_sets),
+    )
+    if not len(other_sets) or not len(movie_set):
+        return np.zeros(len(other_sets))
+    # Last item is never set, larger ids are clipped to it by `take`, which
+    # is faster than fancy indexing of bounded ids
+    bitmap = np.zeros(int(movie_set[-1]) + 2, dtype=bool)
+    bitmap[movie_set] = True
+    common_positions = np.flatnonzero(
+        bitmap.take(np.concatenate(other_sets), mode="clip"),
+    )
+    ends = np.cumsum(sizes)
+    intersections = (
+        np.searchsorted(common_positions, ends)
+        - np.searchsorted(common_positions, ends - sizes)
+    )
+    unions = sizes + len(movie_set) - intersections
+    return np.divide(
+        intersections,
+        unions,
+        out=np.zeros(len(other_sets)),
+        where=unions > 0,
+    )
+
+
+def get_taste_match(user_id: int, other_id: int) -> int:
+    """Get match of tastes of two users in percents."""
+    movie_sets = get_movie_sets([user_id, other_id])
+    score = match_movie_sets(movie_sets[user_id], [movie_sets[other_id]])
+    return round(score[0] * 100)
+
+
+def get_friends_taste_matches(user_id: int) -> list[tuple[User, int]]:
+    """Get matches of tastes of user with all friends in one pass.
+
+    Returns:
+        Friends with matches in percents, best matches first.
+
+    """
+    friend_ids = friendship_graph.get().neighbours(user_id).tolist()
+    if not friend_ids:
+        return []
+    movie_sets = get_movie_sets([user_id, *friend_ids])
+    scores = match_movie_sets(
+        movie_sets[user_id],
+        [movie_sets[friend_id] for friend_id in friend_ids],
+    )
+    matches = sorted(
+        zip(friend_ids, np.rint(scores * 100).astype(int).tolist()),
+        key=lambda match: (-match[1], match[0]),
+    )
+    users = User.objects.in_bulk(friend_ids)
+    return [
+        (users[friend_id], match)
+        for friend_id, match in matches
+        if friend_id in users
+    ]
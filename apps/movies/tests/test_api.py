@@ -0,0 +1,239 @@
+import csv
+import gzip
+import io
+import itertools
+import json
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+import pytest
+
+from apps.users.factories import UserFactory
+from apps.users.models import User
+
+from .. import factories, models
+
+
+@pytest.fixture
+def user_api_client(api_client: APIClient, user: User) -> APIClient:
+    """Create api client authenticated as user."""
+    api_client.force_authenticate(user)
+    return api_client
+
+
+def test_movie_detail_not_modified(
+    user_api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check movie isn't loaded again until it's changed."""
+    movie = factories.MovieFactory()
+    url = reverse("v1:movie-detail", kwargs={"pk": movie.pk})
+
+    response = user_api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["title"] == movie.title
+    etag = response["ETag"]
+
+    response = user_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+    with django_capture_on_commit_callbacks(execute=True):
+        movie.title = "New title"
+        movie.save()
+    response = user_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+
+
+def test_movie_search(
+    user_api_client: APIClient,
+    django_assert_num_queries,
+):
+    """Check movies are found by title with conditional response."""
+    movie = factories.MovieFactory(title="Ghostbusters")
+    url = reverse("v1:movie-search")
+
+    response = user_api_client.get(url, {"q": "ghost"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.data["results"]] == [movie.pk]
+
+    etag = response["ETag"]
+
+    # Savepoint and its release of atomic request, movies aren't queried
+    with django_assert_num_queries(2):
+        response = user_api_client.get(
+            url,
+            {"q": "ghost"},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_movie_changed_within_second(
+    user_api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check If-Modified-Since alone doesn't hide change in same second."""
+    movie = factories.MovieFactory()
+    url = reverse("v1:movie-detail", kwargs={"pk": movie.pk})
+    response = user_api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        movie.title = "Changed in the same second"
+        movie.save()
+    response = user_api_client.get(
+        url,
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["title"] == movie.title
+
+
+def test_watchlist_not_modified(
+    user_api_client: APIClient,
+    user: User,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    """Check watchlist isn't queried until it's changed."""
+    owner = UserFactory()
+    user_movie = factories.UserMovieFactory(user=owner, is_watched=False)
+    factories.UserMovieFactory(user=owner, is_watched=True)
+    url = reverse("v1:watchlist-list", kwargs={"uid": owner.uid})
+
+    response = user_api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.data["results"]] == [
+        user_movie.pk,
+    ]
+    etag = response["ETag"]
+
+    # Savepoint and its release of atomic request and owner
+    with django_assert_num_queries(3):
+        response = user_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie.likes.add(user)
+    response = user_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"][0]["likes_count"] == 1
+
+
+@pytest.mark.parametrize(
+    argnames="batch_size",
+    argvalues=[2, 50],
+)
+def test_watchlist_batch(
+    user_api_client: APIClient,
+    user: User,
+    django_assert_num_queries,
+    batch_size: int,
+):
+    """Check batch of watchlist changes takes same count of queries.
+
+    Queries: savepoint and its release of atomic request and of
+    transaction of changes, movies check, likers of removed entries,
+    selection and deletion of removed entries and their likes, insertion
+    of entries, update of watched status, movie stats and changed entries.
+
+    """
+    movies = factories.MovieFactory.create_batch(batch_size * 2)
+    watched, removed = factories.UserMovieFactory.create_batch(
+        2,
+        user=user,
+        is_watched=False,
+    )
+    changes = [
+        dict(movie=movie.pk, action=action)
+        for movie, action in zip(movies, itertools.cycle(("add", "watch")))
+    ]
+    changes += [
+        dict(movie=watched.movie_id, action="watch"),
+        dict(movie=removed.movie_id, action="remove"),
+    ]
+    url = reverse("v1:watchlist-batch-list")
+
+    with django_assert_num_queries(13):
+        response = user_api_client.post(url, dict(changes=changes))
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == batch_size * 2 + 1
+
+    user_movies = models.UserMovie.objects.filter(user=user)
+    assert not user_movies.filter(pk=removed.pk).exists()
+    assert user_movies.watched().count() == batch_size + 1
+    assert user_movies.unwatched().count() == batch_size
+    movies[0].refresh_from_db()
+    assert movies[0].wanted_by_count == 1
+
+
+def test_watchlist_batch_errors(user_api_client: APIClient):
+    """Check errors of batch are returned per change."""
+    movie = factories.MovieFactory()
+    url = reverse("v1:watchlist-batch-list")
+
+    response = user_api_client.post(
+        url,
+        dict(
+            changes=[
+                dict(movie=movie.pk, action="add"),
+                dict(movie=movie.pk, action="like"),
+            ],
+        ),
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    errors = response.data["data"]["changes"]["data"]
+    assert errors[0] == {}
+    assert "action" in errors[1]
+
+    response = user_api_client.post(
+        url,
+        dict(
+            changes=[
+                dict(movie=movie.pk, action="add"),
+                dict(movie=movie.pk, action="watch"),
+                dict(movie=movie.pk + 1, action="add"),
+            ],
+        ),
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["data"]["changes"]["data"] == [
+        {},
+        {"movie": ["Movie is changed twice."]},
+        {"movie": ["Movie does not exist."]},
+    ]
+    assert not models.UserMovie.objects.filter(movie=movie).exists()
+
+
+def test_watchlist_export(user_api_client: APIClient):
+    """Check watchlist is exported as gzipped CSV and export is resumed."""
+    owner = UserFactory()
+    first, second = factories.UserMovieFactory.create_batch(2, user=owner)
+    url = reverse("v1:watchlist-export", kwargs={"uid": owner.uid})
+
+    response = user_api_client.get(url, {"file_format": "csv", "gzip": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/gzip"
+    content = gzip.decompress(b"".join(response.streaming_content))
+    rows = list(csv.DictReader(io.StringIO(content.decode())))
+    assert [int(row["id"]) for row in rows] == [first.pk, second.pk]
+    assert rows[0]["movie__title"] == first.movie.title
+    assert rows[0]["is_watched"] == json.dumps(first.is_watched)
+
+    response = user_api_client.get(
+        url,
+        {"file_format": "csv", "after": first.pk},
+    )
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    # Resumed export has no header
+    assert len(lines) == 1
+    assert lines[0].startswith(f"{second.pk},")
+
+    response = user_api_client.get(url, {"after": first.pk})
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [second.pk]
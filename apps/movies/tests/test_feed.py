@@ -0,0 +1,82 @@
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+import pytest
+from django_redis import get_redis_connection
+
+from apps.users import graph
+from apps.users.factories import FriendshipFactory, UserFactory
+
+from .. import factories, feed
+
+
+@pytest.fixture(autouse=True)
+def reset_graph():
+    """Load friendship graph of current test from database."""
+    graph.friendship_graph.reset()
+
+
+def get_events(response) -> list[tuple[str, int, int]]:
+    """Get kinds, actors and entries of events on page of feed."""
+    return [
+        (item["kind"], item["actor"]["id"], item["entry"]["id"])
+        for item in response.data["results"]
+    ]
+
+
+def test_feed_fan_out(
+    api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check events of friends are pushed to feed and read by pages."""
+    user, friend, other_friend, stranger = UserFactory.create_batch(4)
+    FriendshipFactory(user=user, friend=friend)
+    FriendshipFactory(user=other_friend, friend=user)
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie = factories.UserMovieFactory(user=friend, is_watched=False)
+        factories.UserMovieFactory(user=stranger)
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie.likes.add(other_friend)
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie.is_watched = True
+        user_movie.save()
+    api_client.force_authenticate(user)
+
+    response = api_client.get(reverse("v1:feed-list"), dict(limit=2))
+    assert get_events(response) == [
+        (feed.EVENT_WATCHED, friend.pk, user_movie.pk),
+        (feed.EVENT_LIKED, other_friend.pk, user_movie.pk),
+    ]
+    assert response.data["results"][1]["owner"]["id"] == friend.pk
+
+    response = api_client.get(response.data["next"])
+    assert get_events(response) == [
+        (feed.EVENT_ADDED, friend.pk, user_movie.pk),
+    ]
+    assert response.data["next"] is None
+
+
+def test_feed_of_celebrity_friend(
+    api_client: APIClient,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    """Check events of celebrities are read from their outboxes."""
+    settings.FEED_FANOUT_MAX_FRIENDS = 1
+    user, celebrity, fan = UserFactory.create_batch(3)
+    FriendshipFactory(user=user, friend=celebrity)
+    FriendshipFactory(user=fan, friend=celebrity)
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie = factories.UserMovieFactory(
+            user=celebrity,
+            is_watched=False,
+        )
+    connection = get_redis_connection("default")
+    assert not connection.zcard(feed.FEED_KEY.format(user_id=user.pk))
+    api_client.force_authenticate(user)
+
+    response = api_client.get(reverse("v1:feed-list"))
+    assert get_events(response) == [
+        (feed.EVENT_ADDED, celebrity.pk, user_movie.pk),
+    ]
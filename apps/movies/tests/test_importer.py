@@ -0,0 +1,62 @@
+import io
+
+from apps.core.models import StoredFile
+from apps.users.factories import UserFactory
+
+from .. import factories, importer, models, services
+
+
+def test_import_catalog(django_capture_on_commit_callbacks):
+    """Check movies are inserted, updated or skipped by kinopoisk id."""
+    movie = factories.MovieFactory(kinopoisk_id=1001)
+    poster = StoredFile.objects.get(name=movie.poster.name)
+    owner = UserFactory()
+    factories.UserMovieFactory(user=owner, movie=movie)
+    version = services.get_watchlist_version(owner.pk)
+    dump = io.StringIO(
+        "kinopoisk_id,title,description,duration,poster\n"
+        "1001,Updated title,,90,posters/updated.jpg\n"
+        "1002,New movie,Description,PT1H30M,posters/new.jpg\n"
+        "1002,New movie,Description,01:30:00,posters/new.jpg\n"
+        "broken,Broken,,,\n",
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        stats = list(
+            importer.import_catalog(
+                importer.read_catalog(dump, importer.FORMAT_CSV),
+                batch_size=3,
+            ),
+        )
+    assert sum(stats, importer.ImportStats()) == importer.ImportStats(
+        inserted=1,
+        updated=1,
+        duplicated=1,
+        rejected=1,
+    )
+    description = movie.description
+    movie.refresh_from_db()
+    assert movie.title == "Updated title"
+    # Values missing in dump are kept
+    assert movie.description == description
+    # Replaced poster lost its reference
+    poster.refresh_from_db()
+    assert poster.references == 0
+    assert movie.duration.total_seconds() == 90 * 60
+    assert services.get_watchlist_version(owner.pk) != version
+    new_movie = models.Movie.objects.get(kinopoisk_id=1002)
+    assert new_movie.poster.name == "posters/new.jpg"
+    assert new_movie in models.Movie.objects.search("new movie")
+
+    # Import of the same content changes nothing
+    dump = io.StringIO(
+        '{"kinopoisk_id": 1002, "title": "New movie", '
+        '"description": "Description", "duration": 90, '
+        '"poster": "posters/new.jpg"}\n',
+    )
+    stats = list(
+        importer.import_catalog(
+            importer.read_catalog(dump, importer.FORMAT_JSONL),
+        ),
+    )
+    assert stats == [importer.ImportStats(unchanged=1)]
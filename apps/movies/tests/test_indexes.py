@@ -0,0 +1,54 @@
+from django.db import connection
+
+import pytest
+
+from apps.users.factories import UserFactory
+from apps.users.models import User
+
+from .. import factories, models
+
+
+def create_watchlist() -> User:
+    """Create big watchlist with analyzed table.
+
+    Watchlist is big enough and table is analyzed, so plans don't depend
+    on statistics left by previous runs.
+
+    """
+    owner = UserFactory()
+    movies = models.Movie.objects.bulk_create(
+        factories.MovieFactory.build_batch(300, poster=None),
+    )
+    models.UserMovie.objects.bulk_create(
+        models.UserMovie(user=owner, movie=movie, is_watched=index % 3 == 0)
+        for index, movie in enumerate(movies)
+    )
+    factories.UserMovieFactory.create_batch(5, is_watched=False)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {models.UserMovie._meta.db_table}")
+    return owner
+
+
+@pytest.mark.usefixtures("no_seqscan")
+@pytest.mark.parametrize(
+    argnames=["is_watched", "ordering", "index"],
+    argvalues=[
+        [False, ("-created", "-id"), "usermovie_unwatched_idx"],
+        [True, ("-created", "-id"), "usermovie_watchlist_idx"],
+        [True, ("-likes_count", "-id"), "usermovie_likes_idx"],
+    ],
+)
+def test_watchlist_uses_index(
+    is_watched: bool,
+    ordering: tuple[str, ...],
+    index: str,
+):
+    """Check watchlist queries are served by indexes."""
+    owner = create_watchlist()
+
+    plan = models.UserMovie.objects.filter(
+        user=owner,
+        is_watched=is_watched,
+    ).order_by(*ordering)[:25].explain()
+    assert "Seq Scan" not in plan
+    assert index in plan
@@ -0,0 +1,63 @@
+import pytest
+
+from libs.kinopoisk import StubKinopoiskServer
+
+from .. import factories, services
+
+
+@pytest.fixture
+def kinopoisk_settings(settings, tmp_path):
+    """Use empty cache of Kinopoisk responses without rate limit."""
+    settings.KINOPOISK_CACHE_DIR = tmp_path
+    settings.KINOPOISK_RATE_LIMIT = 1000
+    return settings
+
+
+def test_fetch_kinopoisk_movies(
+    kinopoisk_settings,
+    django_capture_on_commit_callbacks,
+):
+    """Check movies are updated from API with retries and cache."""
+    movies = [
+        factories.MovieFactory(kinopoisk_id=kinopoisk_id, poster=None)
+        for kinopoisk_id in (101, 102, 103)
+    ]
+    with StubKinopoiskServer(
+        missing_ids=frozenset((103,)),
+        flaky_ids=frozenset((102,)),
+    ) as server:
+        with django_capture_on_commit_callbacks(execute=True):
+            updated, stats = services.fetch_kinopoisk_movies(
+                [101, 102, 103],
+                api_url=server.url,
+            )
+        assert updated == 2
+        # 3 movies and 1 retry, posters aren't requested by API client
+        assert stats.requests == 4
+        assert stats.retries == 1
+
+        movies[0].refresh_from_db()
+        expected = server.get_movie(101)
+        assert movies[0].title == expected["nameRu"]
+        assert movies[0].duration.total_seconds() == (
+            expected["filmLength"] * 60
+        )
+        assert movies[0].poster.name.endswith(".png")
+
+        # Fresh responses are taken from cache, posters aren't downloaded
+        # again for movies with posters
+        _, stats = services.fetch_kinopoisk_movies(
+            [101, 102],
+            api_url=server.url,
+        )
+        assert stats.requests == 0
+        assert stats.cache_hits == 2
+
+        # Stale responses are revalidated
+        kinopoisk_settings.KINOPOISK_CACHE_MAX_AGE = 0
+        _, stats = services.fetch_kinopoisk_movies(
+            [101],
+            api_url=server.url,
+        )
+        assert stats.requests == 1
+        assert stats.revalidated == 1
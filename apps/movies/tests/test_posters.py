@@ -0,0 +1,69 @@
+import uuid
+
+from django.urls import reverse
+
+import pytest
+
+from apps.users.factories import UserFactory
+
+from .. import factories, models, tasks
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Store uploaded posters and thumbnails in temporary directory."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def test_poster_thumbnails_generated_on_upload(
+    django_capture_on_commit_callbacks,
+):
+    """Check thumbnails are generated right after poster is saved."""
+    with django_capture_on_commit_callbacks(execute=True):
+        # Unique content, because state of thumbnails is cached by name,
+        # which is hash of content
+        movie = factories.MovieFactory(
+            poster__color=f"#{uuid.uuid4().hex[:6]}",
+        )
+
+    for spec in models.Movie.poster_specs:
+        thumbnail = getattr(movie, spec)
+        assert thumbnail.name.endswith(".webp")
+        assert thumbnail.storage.exists(thumbnail.name)
+    assert movie.poster_thumbnail.width == 64
+    assert movie.poster_card_2x.width <= 640
+
+
+def test_poster_thumbnails_not_queued_without_new_poster(
+    django_capture_on_commit_callbacks,
+    monkeypatch,
+):
+    """Check saves, which keep poster, don't queue thumbnails."""
+    movie = factories.MovieFactory()
+    queued = []
+    monkeypatch.setattr(
+        tasks.generate_poster_thumbnails,
+        "delay",
+        queued.append,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        movie.title = "New title"
+        movie.save()
+        movie.save(update_fields=("title",))
+    assert not queued
+
+
+def test_watchlist_renders_poster_thumbnails(auth_client):
+    """Check watchlist shows thumbnails instead of original posters."""
+    owner = UserFactory()
+    movie = factories.UserMovieFactory(user=owner, is_watched=False).movie
+
+    response = auth_client.get(
+        reverse("movies:watchlist", kwargs={"slug": owner.uid}),
+    )
+    content = response.content.decode()
+    assert movie.poster_thumbnail.url in content
+    assert f"{movie.poster_thumbnail_2x.url} 2x" in content
+    assert movie.poster.url not in content
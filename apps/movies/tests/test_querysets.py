@@ -0,0 +1,136 @@
+from django.db.models.signals import m2m_changed
+
+from apps.users.factories import UserFactory
+from apps.users.models import User
+
+from .. import factories, models, services
+
+
+def test_search_ranks_title_matches_first():
+    """Check movies matching query in title go before description matches."""
+    in_description = factories.MovieFactory(
+        title="Unrelated",
+        description="A story about nebulous adventures",
+    )
+    in_title = factories.MovieFactory(title="Nebulous Adventures")
+
+    result = list(models.Movie.objects.search("nebulous adventures"))
+    assert result == [in_title, in_description]
+
+
+def test_search_matches_word_prefixes():
+    """Check search finds movies by beginnings of title words."""
+    movie = factories.MovieFactory(title="Интерстеллар")
+
+    assert movie in models.Movie.objects.search("интерст")
+    assert not models.Movie.objects.search("  ?! ").exists()
+
+
+def test_similar_tolerates_typos():
+    """Check misspelled query finds movie by title similarity."""
+    movie = factories.MovieFactory(title="Schindler's List")
+
+    result = models.Movie.objects.similar("shindlers")
+    assert result.first() == movie
+
+
+def test_movie_stats_follow_user_movies():
+    """Check movie stats are updated when users add and remove it."""
+    movie = factories.MovieFactory()
+    first, second = factories.UserMovieFactory.create_batch(2, movie=movie)
+
+    movie.refresh_from_db()
+    assert movie.wanted_by_count == 2
+    assert movie.last_added_at == second.created
+    assert models.Movie.objects.recently_added(count=1).first() == movie
+
+    second.delete()
+    movie.refresh_from_db()
+    assert movie.wanted_by_count == 1
+    assert movie.last_added_at == first.created
+
+    first.delete()
+    movie.refresh_from_db()
+    assert movie.wanted_by_count == 0
+    assert movie.last_added_at is None
+    added = factories.UserMovieFactory().movie
+    # Movies nobody added go after added ones
+    assert list(
+        models.Movie.objects.filter(
+            pk__in=(movie.pk, added.pk),
+        ).recently_added(count=None),
+    ) == [added, movie]
+
+
+def test_refresh_movie_stats():
+    """Check stats of movies can be recalculated from user movies."""
+    movie = factories.MovieFactory()
+    user_movie = factories.UserMovieFactory(movie=movie)
+    models.Movie.objects.filter(pk=movie.pk).update(
+        wanted_by_count=5,
+        last_added_at=None,
+    )
+
+    assert services.refresh_movie_stats([movie.pk]) == 1
+    movie.refresh_from_db()
+    assert movie.wanted_by_count == 1
+    assert movie.last_added_at == user_movie.created
+    assert models.Movie.objects.popular().first() == movie
+
+
+def test_likes_count_follows_likes():
+    """Check likes count is updated from both sides of likes relation."""
+    user_movie = factories.UserMovieFactory()
+    first, second, third = UserFactory.create_batch(3)
+
+    user_movie.likes.add(first, second)
+    third.likes.add(user_movie)
+    # Repeated like isn't counted
+    user_movie.likes.add(first)
+    user_movie.refresh_from_db()
+    assert user_movie.likes_count == 3
+
+    # Removal of missing like isn't counted
+    user_movie.likes.remove(first, UserFactory())
+    second.likes.remove(user_movie)
+    user_movie.refresh_from_db()
+    assert user_movie.likes_count == 1
+
+    user_movie.likes.clear()
+    user_movie.refresh_from_db()
+    assert user_movie.likes_count == 0
+
+
+def test_likes_count_of_concurrent_like():
+    """Check like inserted by concurrent request isn't counted twice.
+
+    Concurrent request, which lost the race, gets the like in `pk_set`
+    of `post_add` too, though its insert is skipped.
+
+    """
+    user_movie = factories.UserMovieFactory()
+    liker = UserFactory()
+    user_movie.likes.add(liker)
+
+    m2m_changed.send(
+        sender=models.UserMovie.likes.through,
+        instance=user_movie,
+        action="post_add",
+        reverse=False,
+        model=User,
+        pk_set={liker.pk},
+        using="default",
+    )
+    user_movie.refresh_from_db()
+    assert user_movie.likes_count == 1
+
+
+def test_refresh_likes_count():
+    """Check drifted likes count can be recalculated."""
+    user_movie = factories.UserMovieFactory(likes=UserFactory.create_batch(2))
+    models.UserMovie.objects.filter(pk=user_movie.pk).update(likes_count=7)
+
+    assert services.refresh_likes_count([user_movie.pk]) == 1
+    assert services.refresh_likes_count([user_movie.pk]) == 0
+    user_movie.refresh_from_db()
+    assert user_movie.likes_count == 2
@@ -0,0 +1,49 @@
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+import numpy as np
+from scipy import sparse
+
+from apps.users.factories import UserFactory
+
+from .. import factories, models, recommendations
+
+
+def test_recommendations_built_from_watchlists(api_client: APIClient):
+    """Check movies, added with user's movies, are recommended to user."""
+    user, other_user, another_user, stranger = UserFactory.create_batch(4)
+    movie, similar, related, unrelated = factories.MovieFactory.create_batch(4)
+    for owner, movies in (
+        (user, (movie,)),
+        (other_user, (movie, similar)),
+        (another_user, (movie, similar, related)),
+        (stranger, (related, unrelated)),
+    ):
+        for owner_movie in movies:
+            factories.UserMovieFactory(user=owner, movie=owner_movie)
+
+    stats = recommendations.build_recommendations()
+
+    assert stats == dict(interactions=8, movies=4, users=4)
+    neighbours = models.MovieNeighbours.objects.get(movie=movie)
+    assert neighbours.movie_ids == [similar.pk, related.pk]
+    api_client.force_authenticate(user)
+    response = api_client.get(reverse("v1:recommendation-list"))
+    assert [item["id"] for item in response.data] == [similar.pk, related.pk]
+
+
+def test_sampled_interactions_not_recommended():
+    """Check movies dropped from sample of interactions aren't recommended."""
+    seen = sparse.csr_matrix(np.array([[1, 1, 1, 0]], dtype=np.float32))
+    matrix = recommendations.limit_user_interactions(seen, 1)
+    neighbours = sparse.csr_matrix(np.ones((4, 4), dtype=np.float32))
+
+    scores = recommendations.compute_user_recommendations(
+        matrix,
+        neighbours,
+        k=4,
+        block_size=1,
+        seen=seen,
+    )
+    assert scores.indices.tolist() == [3]
@@ -0,0 +1,50 @@
+from django.test import Client
+from django.urls import reverse
+
+from .. import factories, models, similarity
+
+
+def test_similar_movies_found_by_text(
+    auth_client: Client,
+    settings,
+    monkeypatch,
+):
+    """Check similar movies are shown and updated for new movies.
+
+    Update vectorizes only new movies with corpus of the full build.
+
+    """
+    settings.SIMILAR_MOVIES_MAX_DOCUMENT_FREQUENCY = 1
+    movie = factories.MovieFactory(
+        title="Zorblax odyssey",
+        description="Glimmerfax quorvian starship",
+    )
+    similar = factories.MovieFactory(
+        title="Zorblax returns",
+        description="Quorvian starship battle",
+    )
+    deleted = factories.MovieFactory(
+        title="Plimbus romance",
+        description="Velloran heartache",
+    )
+
+    similarity.build_similar_movies()
+
+    response = auth_client.get(
+        reverse("movies:movie", kwargs={"pk": movie.pk}),
+    )
+    assert response.context["similar_movies"] == [similar]
+
+    deleted.delete()
+    closer = factories.MovieFactory(
+        title="Zorblax odyssey origins",
+        description="Glimmerfax quorvian starship",
+    )
+    monkeypatch.setattr(similarity, "load_corpus", None)
+    assert similarity.update_similar_movies() == 1
+
+    neighbours = models.MovieNeighbours.objects.filter(
+        kind=models.MovieNeighbours.KIND_CONTENT,
+    )
+    assert neighbours.get(movie=movie).movie_ids == [closer.pk, similar.pk]
+    assert neighbours.get(movie=closer).movie_ids == [movie.pk, similar.pk]
@@ -0,0 +1,101 @@
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+import numpy as np
+import pytest
+
+from apps.users import graph
+from apps.users.factories import FriendshipFactory, UserFactory
+
+from .. import factories, services, taste
+
+
+@pytest.fixture(autouse=True)
+def reset_graph():
+    """Load friendship graph of current test from database."""
+    graph.friendship_graph.reset()
+
+
+def test_match_movie_sets():
+    """Check Jaccard similarity is computed for every of other sets."""
+    scores = taste.match_movie_sets(
+        np.array([1, 3, 5, 7], dtype=np.int32),
+        [
+            np.array([1, 3, 5, 7], dtype=np.int32),
+            np.array([2, 3, 7, 9, 100], dtype=np.int32),
+            np.array([], dtype=np.int32),
+            np.array([4, 6], dtype=np.int32),
+        ],
+    )
+    assert scores.tolist() == [1.0, 2 / 7, 0.0, 0.0]
+
+
+def test_friends_taste_matches(
+    api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check friends are ranked by match, which follows watchlist changes."""
+    user, friend, other_friend, stranger = UserFactory.create_batch(4)
+    FriendshipFactory(user=user, friend=friend)
+    FriendshipFactory(user=other_friend, friend=user)
+    movie, other_movie, another_movie = factories.MovieFactory.create_batch(3)
+    for owner, movies in (
+        (user, (movie, other_movie)),
+        (friend, (movie,)),
+        (other_friend, (movie, other_movie)),
+        (stranger, (movie, other_movie)),
+    ):
+        for owner_movie in movies:
+            factories.UserMovieFactory(user=owner, movie=owner_movie)
+    api_client.force_authenticate(user)
+    url = reverse("v1:taste-match-list")
+
+    response = api_client.get(url)
+    assert [
+        (item["id"], item["taste_match"]) for item in response.data
+    ] == [(other_friend.pk, 100), (friend.pk, 50)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.UserMovieFactory(user=friend, movie=another_movie)
+    response = api_client.get(url)
+    assert response.data[1]["taste_match"] == 33
+    assert taste.get_taste_match(user.pk, stranger.pk) == 100
+
+
+def test_movie_set_reset_on_removal_of_liked_movie(
+    django_capture_on_commit_callbacks,
+):
+    """Check likers lose movie, which is removed from watchlist."""
+    user, liker = UserFactory.create_batch(2)
+    user_movie = factories.UserMovieFactory(user=user)
+    user_movie.likes.add(liker)
+    assert taste.get_movie_sets([liker.pk])[liker.pk].tolist() == [
+        user_movie.movie_id,
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie.delete()
+    assert not len(taste.get_movie_sets([liker.pk])[liker.pk])
+
+
+def test_movie_set_reset_on_batch_removal_of_liked_movie(
+    django_capture_on_commit_callbacks,
+):
+    """Check likers lose movie removed by batch of watchlist changes."""
+    user, liker = UserFactory.create_batch(2)
+    user_movie = factories.UserMovieFactory(user=user)
+    user_movie.likes.add(liker)
+    assert len(taste.get_movie_sets([liker.pk])[liker.pk]) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        services.apply_watchlist_changes(
+            user,
+            [
+                dict(
+                    movie=user_movie.movie_id,
+                    action=services.WATCHLIST_REMOVE,
+                ),
+            ],
+        )
+    assert not len(taste.get_movie_sets([liker.pk])[liker.pk])
@@ -0,0 +1,180 @@
+import io
+import uuid
+
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+import pytest
+import requests
+from PIL import Image
+
+from libs import uploads
+
+from apps.users.factories import AdminUserFactory, UserFactory
+
+from .. import factories
+
+pytestmark = pytest.mark.usefixtures("s3_storage")
+
+
+def get_image() -> bytes:
+    """Get content of small image.
+
+    Color is random, because state of thumbnails is cached by name of
+    poster, which is hash of its content.
+
+    """
+    output = io.BytesIO()
+    color = tuple(uuid.uuid4().bytes[:3])
+    Image.new("RGB", (100, 150), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+def upload(
+    client: APIClient,
+    url: str,
+    content: bytes,
+) -> str:
+    """Upload file directly to storage, return token to finish upload."""
+    response = client.post(
+        url,
+        data={"filename": "poster.png", "content_type": "image/png"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.data
+    storage_response = requests.post(
+        response.data["url"],
+        data=response.data["fields"],
+        files={"file": ("poster.png", content)},
+    )
+    assert storage_response.ok, storage_response.content
+    return response.data["token"]
+
+
+def test_poster_direct_upload(
+    api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check poster is set only after uploaded file is processed."""
+    api_client.force_authenticate(AdminUserFactory())
+    movie = factories.MovieFactory(poster=None)
+    kwargs = {"pk": movie.pk}
+    token = upload(
+        api_client,
+        reverse("v1:movie-upload-poster", kwargs=kwargs),
+        get_image(),
+    )
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = api_client.post(
+            reverse("v1:movie-finish-poster", kwargs=kwargs),
+            data={"token": token},
+        )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    movie.refresh_from_db()
+    # Placeholder is shown until poster is processed
+    assert not movie.poster
+
+    for callback in callbacks:
+        callback()
+    movie.refresh_from_db()
+    assert movie.poster.name.endswith(".png")
+    assert movie.poster_thumbnail.storage.exists(movie.poster_thumbnail.name)
+    assert not default_storage.listdir("uploads/posters")[0]
+
+
+def test_poster_direct_upload_invalid_file(
+    api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check uploaded file is deleted even if it isn't valid poster."""
+    api_client.force_authenticate(AdminUserFactory())
+    movie = factories.MovieFactory(poster=None)
+    kwargs = {"pk": movie.pk}
+    token = upload(
+        api_client,
+        reverse("v1:movie-upload-poster", kwargs=kwargs),
+        b"not an image",
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(
+            reverse("v1:movie-finish-poster", kwargs=kwargs),
+            data={"token": token},
+        )
+    movie.refresh_from_db()
+    assert not movie.poster
+    assert not default_storage.listdir("uploads/posters")[0]
+
+
+def test_poster_direct_upload_unavailable(
+    api_client: APIClient,
+    monkeypatch,
+):
+    """Check upload isn't started if storage doesn't support it."""
+
+    def create_presigned_upload(**kwargs):
+        raise uploads.DirectUploadError("No direct uploads")
+
+    monkeypatch.setattr(
+        uploads,
+        "create_presigned_upload",
+        create_presigned_upload,
+    )
+    api_client.force_authenticate(AdminUserFactory())
+    response = api_client.post(
+        reverse(
+            "v1:movie-upload-poster",
+            kwargs={"pk": factories.MovieFactory().pk},
+        ),
+        data={"filename": "poster.png", "content_type": "image/png"},
+    )
+    assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
+
+
+def test_poster_upload_token_bound_to_movie(api_client: APIClient):
+    """Check uploaded file can't be attached to other movie."""
+    api_client.force_authenticate(AdminUserFactory())
+    movie, other_movie = factories.MovieFactory.create_batch(2)
+    token = upload(
+        api_client,
+        reverse("v1:movie-upload-poster", kwargs={"pk": movie.pk}),
+        get_image(),
+    )
+
+    response = api_client.post(
+        reverse("v1:movie-finish-poster", kwargs={"pk": other_movie.pk}),
+        data={"token": token},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_poster_upload_allowed_only_for_admins(api_client: APIClient):
+    """Check users can't upload posters."""
+    api_client.force_authenticate(UserFactory())
+    response = api_client.post(
+        reverse(
+            "v1:movie-upload-poster",
+            kwargs={"pk": factories.MovieFactory().pk},
+        ),
+        data={"filename": "poster.png", "content_type": "image/png"},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_poster_upload_not_finished_without_file(api_client: APIClient):
+    """Check upload can't be finished until file is uploaded to storage."""
+    api_client.force_authenticate(AdminUserFactory())
+    kwargs = {"pk": factories.MovieFactory().pk}
+    response = api_client.post(
+        reverse("v1:movie-upload-poster", kwargs=kwargs),
+        data={"filename": "poster.png", "content_type": "image/png"},
+    )
+
+    response = api_client.post(
+        reverse("v1:movie-finish-poster", kwargs=kwargs),
+        data={"token": response.data["token"]},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,9 +1,16 @@
+import datetime
+
 from django.test import Client
 from django.urls import reverse
 
 import pytest
 
-from .. import factories, models, views
+from libs.pagination import Cursor
+
+from apps.users.factories import UserFactory
+from apps.users.models import User
+
+from .. import factories, models, services, views
 
 
 @pytest.fixture(scope="module")
@@ -50,3 +57,231 @@ def test_add_movie_view_search():
 
     query_set = views.AddMovieView.search(query)
     assert query_set.filter(pk__in=ids).count()
+
+
+def test_add_movie_view_search_suggestions(auth_client: Client):
+    """Check AddMovieView suggests similar titles if search found nothing."""
+    movie = factories.MovieFactory(title="Pulp Fiction")
+
+    url = reverse("movies:addmovie")
+    response = auth_client.get(url, {"search_field": "pulpp fictoin"})
+    assert response.status_code == 200
+    assert not response.context["object_list"]
+    assert list(response.context["suggestions"]) == [movie]
+
+
+def test_add_movie_view_cursor_pagination(auth_client: Client):
+    """Check AddMovieView pages through search results by cursors."""
+    query = "paginated_movie_title"
+    movies = factories.MovieFactory.create_batch(15, title=query)
+
+    url = reverse("movies:addmovie")
+    first_page = auth_client.get(url, {"search_field": query}).context
+    next_cursor = first_page["page_obj"].next_cursor
+    second_page = auth_client.get(
+        url, {"search_field": query, "cursor": next_cursor},
+    ).context
+    assert second_page["page_obj"].next_cursor is None
+    assert {
+        *first_page["object_list"], *second_page["object_list"],
+    } == set(movies)
+
+    previous_cursor = second_page["page_obj"].previous_cursor
+    previous_page = auth_client.get(
+        url, {"search_field": query, "cursor": previous_cursor},
+    ).context
+    assert previous_page["object_list"] == first_page["object_list"]
+    assert previous_page["page_obj"].previous_cursor is None
+
+
+def test_add_movie_view_pages_through_not_added_movies(
+    auth_client: Client,
+    monkeypatch,
+):
+    """Check recently added movies are followed by movies nobody added."""
+    monkeypatch.setattr(views.AddMovieView, "paginate_by", 2)
+    factories.MovieFactory.create_batch(3)
+    added = [
+        user_movie.movie
+        for user_movie in factories.UserMovieFactory.create_batch(3)
+    ]
+    url = reverse("movies:addmovie")
+
+    pages, cursor = [], None
+    while not pages or cursor:
+        context = auth_client.get(url, {"cursor": cursor or ""}).context
+        pages.append(context["page_obj"])
+        cursor = context["page_obj"].next_cursor
+    movies = [movie for page in pages for movie in page]
+    assert movies == list(models.Movie.objects.recently_added(count=None))
+    assert movies[:3] == added[::-1]
+
+    for previous, page in zip(pages, pages[1:]):
+        context = auth_client.get(
+            url,
+            {"cursor": page.previous_cursor},
+        ).context
+        assert list(context["page_obj"]) == list(previous)
+
+
+def test_add_movie_view_invalid_cursor(auth_client: Client):
+    """Check AddMovieView returns 404 for broken cursor."""
+    url = reverse("movies:addmovie")
+    response = auth_client.get(url, {"cursor": "broken"})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["not a date", 1],
+        ["2022-01-01T00:00:00+00:00", "not an id"],
+        [{"key": "value"}, 1],
+        ["2022-01-01T00:00:00+00:00", 2 ** 70],
+    ],
+)
+def test_add_movie_view_tampered_cursor(auth_client: Client, values: list):
+    """Check AddMovieView returns 404 for cursor with invalid values."""
+    url = reverse("movies:addmovie")
+    cursor = Cursor(values=tuple(values)).encode()
+    response = auth_client.get(url, {"cursor": cursor})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    argnames="watchlist_size",
+    argvalues=[1, 20],
+)
+def test_watchlist_view_queries_count(
+    auth_client: Client,
+    django_assert_num_queries,
+    watchlist_size: int,
+):
+    """Check WatchlistView makes same count of queries for any watchlist.
+
+    Queries: savepoint and its release of atomic request, session, current
+    user, watchlist owner and watchlist.
+
+    """
+    owner = UserFactory()
+    user_movies = factories.UserMovieFactory.create_batch(
+        watchlist_size,
+        user=owner,
+        is_watched=False,
+        likes=UserFactory.create_batch(2),
+    )
+
+    url = reverse("movies:watchlist", kwargs={"slug": owner.uid})
+    with django_assert_num_queries(6):
+        response = auth_client.get(url)
+    assert response.status_code == 200
+    watchlist = list(response.context["watchlist"])
+    assert watchlist == user_movies[::-1]
+    assert all(user_movie.likes_count == 2 for user_movie in watchlist)
+
+
+def test_watchlist_view_cache(
+    auth_client: Client,
+    user: User,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    """Check WatchlistView caches watchlist until it's changed."""
+    owner = UserFactory()
+    user_movie = factories.UserMovieFactory(user=owner, is_watched=False)
+    url = reverse("movies:watchlist", kwargs={"slug": owner.uid})
+    stats = services.get_watchlist_cache_stats()
+
+    auth_client.get(url)
+    # Watchlist isn't queried on cache hit
+    with django_assert_num_queries(5):
+        response = auth_client.get(url)
+    assert user_movie.movie.title in response.content.decode()
+    assert services.get_watchlist_cache_stats() == dict(
+        hits=stats["hits"] + 1,
+        misses=stats["misses"] + 1,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie.movie.title = "Changed title of cached movie"
+        user_movie.movie.save()
+    response = auth_client.get(url)
+    assert "Changed title of cached movie" in response.content.decode()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_movie.likes.add(user)
+    response = auth_client.get(url)
+    assert response.context["watchlist"][0].likes_count == 1
+    assert services.get_watchlist_cache_stats()["misses"] == (
+        stats["misses"] + 3
+    )
+
+
+def test_watchlist_view_cache_variants(auth_client: Client, monkeypatch):
+    """Check first pages are cached by normalized query only."""
+    monkeypatch.setattr(views.WatchlistView, "paginate_by", 1)
+    owner = UserFactory()
+    factories.UserMovieFactory.create_batch(
+        2,
+        user=owner,
+        is_watched=False,
+        movie__title="Matrix",
+    )
+    url = reverse("movies:watchlist", kwargs={"slug": owner.uid})
+    stats = services.get_watchlist_cache_stats()
+
+    response = auth_client.get(url, {"q": "matrix"})
+    auth_client.get(url, {"q": " MATRIX "})
+    assert services.get_watchlist_cache_stats() == dict(
+        hits=stats["hits"] + 1,
+        misses=stats["misses"] + 1,
+    )
+
+    auth_client.get(
+        url,
+        {"q": "matrix", "cursor": response.context["page_obj"].next_cursor},
+    )
+    assert services.get_watchlist_cache_stats() == dict(
+        hits=stats["hits"] + 1,
+        misses=stats["misses"] + 1,
+    )
+
+
+def test_watchlist_view_filters(auth_client: Client, monkeypatch):
+    """Check watchlist is filtered, sorted and paginated by cursor."""
+    monkeypatch.setattr(views.WatchlistView, "paginate_by", 2)
+    owner = UserFactory()
+    short, long, unknown = (
+        factories.UserMovieFactory(
+            user=owner,
+            is_watched=False,
+            movie__title=f"Matrix {number}",
+            movie__duration=duration,
+        )
+        for number, duration in (
+            (1, datetime.timedelta(minutes=90)),
+            (2, datetime.timedelta(minutes=150)),
+            (3, None),
+        )
+    )
+    watched = factories.UserMovieFactory(
+        user=owner,
+        is_watched=True,
+        movie__title="Matrix 4",
+    )
+    factories.UserMovieFactory(user=owner, movie__title="Other")
+    url = reverse("movies:watchlist", kwargs={"slug": owner.uid})
+
+    response = auth_client.get(url, {"q": " matrix", "status": "watched"})
+    assert list(response.context["watchlist"]) == [watched]
+
+    params = {"q": "matrix", "sort": "duration"}
+    response = auth_client.get(url, params)
+    assert list(response.context["watchlist"]) == [short, long]
+    page = response.context["page_obj"]
+    response = auth_client.get(url, {**params, "cursor": page.next_cursor})
+    assert list(response.context["watchlist"]) == [unknown]
+
+    response = auth_client.get(url, {"status": "unknown"})
+    assert response.status_code == 200
+    assert not response.context["watchlist"]
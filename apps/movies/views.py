@@ -1,34 +1,141 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import models
-from django.db.models import Q
+from django.core.paginator import InvalidPage
+from django.db.models import Exists, OuterRef, Q
 from django.db.models.query import QuerySet
+from django.http import Http404
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy as _
 from django.views.generic import DetailView, ListView, TemplateView
 
+from libs.pagination import KeysetPaginator
+
+from apps.core.views import KeysetPaginationMixin
 from apps.movies.models import Movie, UserMovie
-from apps.users.models import User
+from apps.users.models import Friendship, User
+
+from . import filters, services, similarity, taste
 
 
 class WatchlistView(LoginRequiredMixin, DetailView):
-    """Display user watchlist page by user uid."""
+    """Display user watchlist page by user uid.
+
+    Watchlist is filtered and sorted with `SortedWatchlistFilter` and paginated
+    by cursor. Page is rendered with one query for watchlist owner and one
+    query for page of watchlist with movies and likes count. Rendered page
+    is cached until owner's watchlist is changed, so on cache hit only
+    owner is queried.
+
+    Friends of owner see match of their tastes, which is computed from
+    cached sets of movies. Friendship is checked in the query of owner.
+
+    """
     template_name = "movies/watchlist.html"
+    component_template_name = "movies/watchlist_component.html"
     model = User
     context_object_name = "watchlist_owner"
     slug_field = "uid"
-
-    def get_queryset(self):
-        """Add prefetch movies with likes."""
-        movie_queryset = UserMovie.objects.with_likes_count()
-        return super().get_queryset().prefetch_related(
-            models.Prefetch("movies", queryset=movie_queryset),
+    paginate_by = 25
+    cursor_kwarg = "cursor"
+
+    def get_queryset(self) -> QuerySet:
+        """Annotate whether owner is a friend of current user."""
+        user_id = self.request.user.pk
+        return super().get_queryset().annotate(
+            is_friend=Exists(
+                Friendship.objects.filter(
+                    Q(user_id=user_id, friend_id=OuterRef("pk"))
+                    | Q(user_id=OuterRef("pk"), friend_id=user_id),
+                    is_accepted=True,
+                ),
+            ),
         )
 
     def get_context_data(self, **kwargs):
-        """Add watchlict to context."""
+        """Add rendered watchlist to context."""
         context = super().get_context_data(**kwargs)
-        context["watchlist"] = self.get_object().movies.unwatched()
+        if self.object.is_friend:
+            context["taste_match"] = taste.get_taste_match(
+                self.request.user.pk,
+                self.object.pk,
+            )
+        watchlist_filter = filters.SortedWatchlistFilter(
+            data=self.request.GET,
+            queryset=UserMovie.objects.filter(
+                user=self.object,
+            ).for_watchlist(),
+        )
+        context["watchlist_filter"] = watchlist_filter
+        if watchlist_filter.is_valid():
+            params = {
+                name: value
+                for name, value in watchlist_filter.form.cleaned_data.items()
+                if value
+            }
+            context["watchlist"] = watchlist_filter.qs
+        else:
+            params = {}
+            context["watchlist"] = watchlist_filter.queryset.none()
+        context["pagination_query"] = urlencode(sorted(params.items()))
+        cursor = self.request.GET.get(self.cursor_kwarg, "")
+
+        context["watchlist_html"] = mark_safe(  # noqa: S308
+            self.get_watchlist_html(context, params, cursor),
+        )
         return context
 
+    def get_watchlist_html(
+        self,
+        context: dict,
+        params: dict,
+        cursor: str,
+    ) -> str:
+        """Get rendered page of watchlist, cached for first pages only.
+
+        Next pages aren't cached and query is normalized like filter does,
+        so arbitrary query strings can't fill cache.
+
+        """
+        if cursor:
+            return self.render_watchlist(context, cursor)
+        if "q" in params:
+            params = dict(params, q=params["q"].strip().lower())
+        is_owner = self.request.user.pk == self.object.pk
+        variant = hashlib.md5(  # noqa: S324 (not used for security)
+            urlencode(sorted(params.items())).encode(),
+        ).hexdigest()
+        return services.get_cached_watchlist(
+            owner=self.object,
+            variant=(
+                f"{translation.get_language()}:{int(is_owner)}:{variant}"
+            ),
+            render=lambda: self.render_watchlist(context, cursor),
+        )
+
+    def render_watchlist(self, context: dict, cursor: str) -> str:
+        """Fetch page of watchlist and render it."""
+        paginator = KeysetPaginator(context["watchlist"], self.paginate_by)
+        try:
+            page = paginator.page(cursor)
+        except InvalidPage as error:
+            raise Http404(_("Invalid cursor")) from error
+        context.update(
+            page_obj=page,
+            is_paginated=page.has_other_pages(),
+            watchlist=page.object_list,
+        )
+        return render_to_string(
+            self.component_template_name,
+            context=context,
+            request=self.request,
+        )
+
 
 class HomeView(TemplateView):
     """Display main page.
@@ -44,13 +151,19 @@ class HomeView(TemplateView):
         return super().get(request, *args, **kwargs)
 
 
-class AddMovieView(LoginRequiredMixin, ListView):
-    """Class-based ListView to display add movie page."""
+class AddMovieView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    """Class-based ListView to display add movie page.
+
+    Movies are paginated by cursor: search results by rank, other movies by
+    time they were added last.
+
+    """
     model = Movie
     template_name = "movies/add_movie.html"
     context_object_name = "movies"
     extra_context = {"query": ""}
     paginate_by = 10
+    suggestions_count = 5
 
     def get_queryset(self):
         """Load movies for add movie page."""
@@ -60,16 +173,25 @@ class AddMovieView(LoginRequiredMixin, ListView):
         if query:
             return self.search(query)
 
-        return Movie.objects.recently_added()
+        return Movie.objects.recently_added(count=None)
+
+    def get_context_data(self, **kwargs):
+        """Add "did you mean" suggestions when search found nothing."""
+        context = super().get_context_data(**kwargs)
+        query = self.extra_context["query"]
+        if query and not context["movies"]:
+            context["suggestions"] = Movie.objects.similar(
+                query,
+            )[:self.suggestions_count]
+        context["pagination_query"] = urlencode(
+            dict(search_field=query or ""),
+        )
+        return context
 
     @staticmethod
     def search(query: str) -> QuerySet:
-        """Find movies containing query text in the title or description."""
-        query = query.strip()
-        search_results = Movie.objects.filter(
-            Q(title__icontains=query) | Q(description__icontains=query),
-        )
-        return search_results
+        """Find movies matching query text in the title or description."""
+        return Movie.objects.search(query.strip())
 
 
 class MovieDetailView(LoginRequiredMixin, DetailView):
@@ -77,3 +199,12 @@ class MovieDetailView(LoginRequiredMixin, DetailView):
     model = Movie
     context_object_name = "movie"
     template_name = "movies/movie.html"
+
+    def get_context_data(self, **kwargs):
+        """Add similar movies, which are precomputed by offline job."""
+        context = super().get_context_data(**kwargs)
+        context["similar_movies"] = similarity.get_similar_movies(
+            self.object,
+            limit=settings.SIMILAR_MOVIES_SHOWN,
+        )
+        return context
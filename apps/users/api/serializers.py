@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
 
+from rest_framework import serializers
+
 from apps.core.api.serializers import ModelBaseSerializer
 
 
@@ -24,3 +26,20 @@ class UserSerializer(ModelBaseSerializer):
             "created",
             "modified",
         )
+
+
+class FriendSuggestionSerializer(ModelBaseSerializer):
+    """Serializer for representing user suggested as friend."""
+    mutual_friends = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = (
+            "id",
+            "uid",
+            "first_name",
+            "last_name",
+            "avatar",
+            "mutual_friends",
+        )
+        read_only_fields = fields
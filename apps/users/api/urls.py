@@ -5,5 +5,11 @@ from . import views
 # register URL like
 # router.register(r"users", UsersAPIView)
 router = DefaultRouter()
+router.register(r"avatar", views.AvatarViewSet, basename="avatar")
+router.register(
+    r"friend-suggestions",
+    views.FriendSuggestionsViewSet,
+    basename="friend-suggestion",
+)
 router.register(r"", views.UsersViewSet, basename="user")
 urlpatterns = router.urls
@@ -1,8 +1,17 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
 
-from ...core.api.views import ReadOnlyViewSet
+from drf_spectacular.utils import extend_schema
+
+from ...core.api import serializers as core_serializers
+from ...core.api.mixins import DirectUploadMixin
+from ...core.api.views import BaseViewSet, ReadOnlyViewSet
+from .. import graph, tasks
 from . import serializers
 
 User = get_user_model()
@@ -13,11 +22,79 @@ class UsersViewSet(ReadOnlyViewSet):
     queryset = User.objects.all()
     serializer_class = serializers.UserSerializer
     permission_classes = (IsAdminUser,)
+    # Names are matched by substring or, to tolerate typos, by trigram
+    # word similarity
     search_fields = (
         "first_name",
         "last_name",
+        "%first_name",
+        "%last_name",
     )
     ordering_fields = (
         "first_name",
         "last_name",
     )
+
+
+class AvatarViewSet(DirectUploadMixin, BaseViewSet):
+    """ViewSet for direct upload of current user's avatar to storage.
+
+    User keeps the old avatar until uploaded one is processed.
+
+    """
+    filter_backends = ()
+    upload_prefix = "uploads/avatars"
+
+    @extend_schema(
+        request=core_serializers.DirectUploadSerializer,
+        responses={201: core_serializers.PresignedUploadSerializer},
+    )
+    @action(detail=False, methods=["post"])
+    def upload(self, request: Request, *args, **kwargs) -> Response:
+        """Start direct upload of avatar to storage."""
+        return self.start_direct_upload(request.user)
+
+    @extend_schema(
+        request=core_serializers.FinishUploadSerializer,
+        responses={202: None},
+    )
+    @action(detail=False, methods=["post"])
+    def finish(self, request: Request, *args, **kwargs) -> Response:
+        """Finish direct upload of avatar and queue its processing."""
+        user_id = request.user.pk
+        return self.finish_direct_upload(
+            request.user,
+            process=lambda key: tasks.process_avatar_upload.delay(
+                user_id,
+                key,
+            ),
+        )
+
+
+class FriendSuggestionsViewSet(BaseViewSet):
+    """ViewSet for people current user may know.
+
+    Suggested users are friends of user's friends, ranked by count of
+    mutual friends. They are found in friendship graph kept in memory, so
+    no recursive queries are made.
+
+    """
+    serializer_class = serializers.FriendSuggestionSerializer
+    filter_backends = ()
+
+    @extend_schema(
+        responses=serializers.FriendSuggestionSerializer(many=True),
+    )
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """Get friends of friends, who aren't friends of user yet."""
+        suggestions = graph.suggest_friends(
+            request.user.pk,
+            limit=settings.FRIEND_SUGGESTIONS_LIMIT,
+        )
+        for user, mutual_friends in suggestions:
+            user.mutual_friends = mutual_friends
+        serializer = self.get_serializer(
+            [user for user, _ in suggestions],
+            many=True,
+        )
+        return Response(serializer.data)
@@ -9,4 +9,5 @@ class UsersAppConfig(AppConfig):
 
     def ready(self):
         # pylint: disable=unused-import
+        from . import signals  # noqa
         from .api.auth import scheme  # noqa
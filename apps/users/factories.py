@@ -38,3 +38,12 @@ class AdminUserFactory(UserFactory):
 
     class Meta:
         model = models.User
+
+
+class FriendshipFactory(factory.django.DjangoModelFactory):
+    """Factory to generate test Friendship instance."""
+    user = factory.SubFactory(UserFactory)
+    friend = factory.SubFactory(UserFactory)
+
+    class Meta:
+        model = models.Friendship
@@ -0,0 +1,130 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+import numpy as np
+
+from libs.graph import INDEX_DTYPE, CSRGraph
+
+from . import models
+
+# Changes of friendships are numbered by counter and kept in cache, so
+# every process can apply changes made by others to its own graph
+CHANGES_COUNTER_KEY = "users:friendship_graph:changes"
+CHANGE_KEY = "users:friendship_graph:change:{number}"
+
+
+class FriendshipGraph:
+    """Graph of accepted friendships kept in memory of process.
+
+    Graph is loaded from database on first use. Then before every lookup
+    it applies changes recorded by `record_friendship_change` since last
+    lookup. If some of them are already evicted from cache, graph is
+    loaded again.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graph: CSRGraph | None = None
+        self._position = 0
+
+    def get(self) -> CSRGraph:
+        """Get graph with all recorded changes applied."""
+        with self._lock:
+            position = cache.get(CHANGES_COUNTER_KEY, 0)
+            if self._graph is None or position < self._position:
+                self._load(position)
+            elif position > self._position:
+                self._apply_changes(position)
+            return self._graph
+
+    def reset(self) -> None:
+        """Forget graph, so it's loaded again on next use."""
+        with self._lock:
+            self._graph = None
+
+    def _load(self, position: int) -> None:
+        # Changes recorded during load may be applied again, which is safe,
+        # because they are idempotent
+        self._graph = load_friendship_graph()
+        self._position = position
+
+    def _apply_changes(self, position: int) -> None:
+        keys = [
+            CHANGE_KEY.format(number=number)
+            for number in range(self._position + 1, position + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) < len(keys):
+            self._load(position)
+            return
+        for key in keys:
+            user_id, friend_id, is_connected = changes[key]
+            if is_connected:
+                self._graph.add_edge(user_id, friend_id)
+            else:
+                self._graph.remove_edge(user_id, friend_id)
+        self._position = position
+        threshold = settings.FRIENDSHIP_GRAPH_COMPACT_THRESHOLD
+        if self._graph.pending_changes >= threshold:
+            self._graph.compact()
+
+
+friendship_graph = FriendshipGraph()
+
+
+def load_friendship_graph() -> CSRGraph:
+    """Load accepted friendships from database."""
+    edges = models.Friendship.objects.filter(
+        is_accepted=True,
+    ).values_list("user_id", "friend_id")
+    edges = np.fromiter(
+        (
+            user_id
+            for pair in edges.iterator(
+                chunk_size=settings.FRIENDSHIP_GRAPH_LOAD_CHUNK_SIZE,
+            )
+            for user_id in pair
+        ),
+        dtype=INDEX_DTYPE,
+    ).reshape(-1, 2)
+    return CSRGraph.from_edges(edges[:, 0], edges[:, 1])
+
+
+def record_friendship_change(
+    user_id: int,
+    friend_id: int,
+    is_connected: bool,
+) -> None:
+    """Record change of friendship for graphs of all processes."""
+    cache.add(CHANGES_COUNTER_KEY, 0, timeout=None)
+    number = cache.incr(CHANGES_COUNTER_KEY)
+    cache.set(
+        CHANGE_KEY.format(number=number),
+        (user_id, friend_id, is_connected),
+        timeout=settings.FRIENDSHIP_GRAPH_CHANGES_TIMEOUT,
+    )
+
+
+def suggest_friends(
+    user_id: int,
+    limit: int,
+) -> list[tuple[models.User, int]]:
+    """Get people user may know.
+
+    Returns:
+        Users, who are friends of friends, with counts of mutual friends,
+        most connected first.
+
+    """
+    suggestions = friendship_graph.get().suggest(user_id, limit)
+    users = models.User.objects.in_bulk(
+        [suggested_id for suggested_id, _ in suggestions],
+    )
+    return [
+        (users[suggested_id], mutual_friends)
+        for suggested_id, mutual_friends in suggestions
+        if suggested_id in users
+    ]
@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+import numpy as np
+
+from libs.graph import CSRGraph
+
+
+class Command(BaseCommand):
+    """CLI to benchmark friend suggestions on generated graph."""
+    help = """Script to benchmark friend suggestions on power-law graph"""
+
+    def add_arguments(self, parser):
+        """Accepts arguments."""
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1_000_000,
+            help="Count of users in graph",
+        )
+        parser.add_argument(
+            "--friendships",
+            type=int,
+            default=10_000_000,
+            help="Count of friendships in graph",
+        )
+        parser.add_argument(
+            "--exponent",
+            type=float,
+            default=2.5,
+            help="Exponent of power-law distribution of friends count",
+        )
+        parser.add_argument(
+            "--lookups",
+            type=int,
+            default=1000,
+            help="Count of users to get suggestions for",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=50,
+            help="Count of suggestions per user",
+        )
+
+    def handle(self, *args, **options):
+        """Print time to build graph and latency of suggestions.
+
+        Graph is generated by Chung-Lu model, where chance of user to be
+        in friendship is proportional to weight, which has power-law
+        distribution.
+
+        """
+        rng = np.random.default_rng(0)
+        users = options["users"]
+        weights = np.arange(1, users + 1) ** (
+            -1 / (options["exponent"] - 1)
+        )
+        weights /= weights.sum()
+        sources, targets = rng.choice(
+            users,
+            size=(2, options["friendships"]),
+            p=weights,
+        )
+
+        started = time.perf_counter()
+        graph = CSRGraph.from_edges(sources, targets)
+        self.stdout.write(
+            f"Built graph of {graph.edges_count} friendships in "
+            f"{time.perf_counter() - started:.2f} s, arrays take "
+            f"{(graph.offsets.nbytes + graph.targets.nbytes) / 2**20:.1f} MiB",
+        )
+
+        timings = []
+        for user_id in rng.integers(users, size=options["lookups"]):
+            started = time.perf_counter()
+            graph.suggest(int(user_id), options["limit"])
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+        self.stdout.write(
+            f"Suggestions: median {statistics.median(timings):.0f} us, "
+            f"p99 {timings[int(len(timings) * 0.99)]:.0f} us",
+        )
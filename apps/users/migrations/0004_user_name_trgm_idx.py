@@ -0,0 +1,20 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:33
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_uid_user_uid_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name', 'last_name'], name='user_name_trgm_idx', opclasses=('gin_trgm_ops', 'gin_trgm_ops')),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.7 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_name_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='uid_idx',
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(condition=models.Q(('is_accepted', True)), fields=['friend', 'user'], name='friendship_reverse_idx'),
+        ),
+    ]
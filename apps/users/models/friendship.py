@@ -36,3 +36,12 @@ class Friendship(BaseModel):
                 fields=("user", "friend"),
             ),
         ]
+        indexes = [
+            # Unique constraint serves lookups by `user`, this index serves
+            # lookups of accepted friendships in reverse direction
+            models.Index(
+                fields=("friend", "user"),
+                name="friendship_reverse_idx",
+                condition=models.Q(is_accepted=True),
+            ),
+        ]
@@ -4,12 +4,11 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.contrib.auth.models import UserManager as DjangoUserManager
 from django.contrib.postgres.fields import CIEmailField
-from django.core.files.base import ContentFile
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
-import requests
 from allauth.account.signals import user_signed_up
 from imagekit import models as imagekitmodels
 from imagekit.processors import ResizeToFill, Transpose
@@ -120,7 +119,11 @@ class User(
         verbose_name_plural = _("Users")
 
         indexes = [
-            models.Index(fields=("uid",), name="uid_idx"),
+            GinIndex(
+                fields=("first_name", "last_name"),
+                name="user_name_trgm_idx",
+                opclasses=("gin_trgm_ops", "gin_trgm_ops"),
+            ),
         ]
 
     def __str__(self):
@@ -130,7 +133,15 @@ class User(
 
 @receiver(user_signed_up)
 def set_user_avatar(request, user, sociallogin=None, **kwargs):
-    """Set user avatar on registration."""
+    """Set user avatar on registration.
+
+    Avatar is downloaded by celery task after sign up is committed, so
+    slow image hosting doesn't block the request.
+
+    """
+    # Avoid circular import of tasks, which use models
+    from .. import tasks
+
     if not sociallogin:
         return
 
@@ -140,5 +151,6 @@ def set_user_avatar(request, user, sociallogin=None, **kwargs):
         if not url:
             return
 
-        user.avatar = ContentFile(requests.get(url).content, f"{user}.png")
-        user.save()
+        transaction.on_commit(
+            lambda: tasks.set_user_avatar_from_url.delay(user.pk, url),
+        )
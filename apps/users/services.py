@@ -1,8 +1,15 @@
+import io
+
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.files.base import ContentFile
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 
+from PIL import Image, ImageOps
+
+from libs import uploads
+from libs.http import ResponseTooLargeError, get_http_client
 from libs.notifications.email import DefaultEmailNotification
 
 from . import models
@@ -30,3 +37,84 @@ def reset_user_password(
         new_password_url=settings.FRONTEND_URL + settings.NEW_PASSWORD_URL,
         user=user,
     ).send()
+
+
+class AvatarError(Exception):
+    """Avatar can't be downloaded or isn't a valid image."""
+
+
+def download_avatar(url: str) -> bytes:
+    """Download image with timeouts and limit of size.
+
+    Raises:
+        HttpError: On network errors.
+        AvatarError: If image is too large or isn't found.
+
+    """
+    try:
+        response = get_http_client().get(
+            url,
+            timeout=settings.AVATAR_DOWNLOAD_TIMEOUT,
+            max_size=settings.AVATAR_MAX_FILE_SIZE,
+        )
+    except ResponseTooLargeError as error:
+        raise AvatarError(str(error)) from error
+    if response.is_error:
+        raise AvatarError(f"Avatar {url} returned {response.status_code}")
+    return response.content
+
+
+def downscale_avatar(content: bytes) -> ContentFile:
+    """Downscale and orient image before it's processed by avatar field.
+
+    Size of image is checked before decoding, JPEG images are decoded
+    directly at reduced scale.
+
+    Raises:
+        AvatarError: If content isn't a supported image or is too large.
+
+    """
+    try:
+        image = Image.open(io.BytesIO(content))
+        if image.width * image.height > settings.AVATAR_MAX_PIXELS:
+            raise AvatarError(f"Avatar has too many pixels: {image.size}")
+        max_side = settings.AVATAR_MAX_SIDE
+        image.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=90)
+    except (OSError, Image.DecompressionBombError) as error:
+        raise AvatarError(f"Invalid avatar: {error}") from error
+    return ContentFile(output.getvalue())
+
+
+def set_user_avatar(user: models.User, avatar: ContentFile) -> None:
+    """Set avatar of user and pre-render its thumbnail.
+
+    Thumbnail is rendered before user is saved, so user keeps the old
+    avatar until new one is fully processed.
+
+    """
+    user.avatar.save(f"{user.uid}.jpg", avatar, save=False)
+    user.avatar_thumbnail.generate()
+    user.save(update_fields=("avatar", "modified"))
+
+
+def set_user_avatar_from_url(user: models.User, url: str) -> None:
+    """Download avatar of user and pre-render its thumbnail."""
+    set_user_avatar(user, downscale_avatar(download_avatar(url)))
+
+
+def set_user_avatar_from_upload(user: models.User, key: str) -> None:
+    """Set avatar of user from file uploaded directly to storage.
+
+    Uploaded file is deleted afterwards, even if it's invalid.
+
+    """
+    try:
+        set_user_avatar(user, downscale_avatar(uploads.read_upload(key)))
+    finally:
+        uploads.delete_upload(key)
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import graph
+from .models import Friendship
+
+
+def _record_friendship_change_on_commit(
+    user_id: int,
+    friend_id: int,
+) -> None:
+    """Connect or disconnect users in friendship graph after commit.
+
+    Friendship rows are one-way, so users stay connected while accepted
+    row of either direction exists.
+
+    """
+
+    def record():
+        is_connected = Friendship.objects.filter(
+            Q(user_id=user_id, friend_id=friend_id)
+            | Q(user_id=friend_id, friend_id=user_id),
+            is_accepted=True,
+        ).exists()
+        graph.record_friendship_change(user_id, friend_id, is_connected)
+
+    transaction.on_commit(record)
+
+
+@receiver(post_save, sender=Friendship)
+def update_graph_on_friendship_save(sender, instance, **kwargs):
+    """Connect or disconnect users in friendship graph after commit."""
+    _record_friendship_change_on_commit(instance.user_id, instance.friend_id)
+
+
+@receiver(post_delete, sender=Friendship)
+def update_graph_on_friendship_delete(sender, instance, **kwargs):
+    """Disconnect users in friendship graph after commit."""
+    _record_friendship_change_on_commit(instance.user_id, instance.friend_id)
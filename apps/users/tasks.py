@@ -0,0 +1,40 @@
+import logging
+
+from celery import shared_task
+
+from libs import uploads
+from libs.http import HttpError
+
+from . import models, services
+
+logger = logging.getLogger("django")
+
+
+@shared_task(
+    autoretry_for=(HttpError,),
+    retry_backoff=True,
+    max_retries=3,
+    soft_time_limit=60,
+)
+def set_user_avatar_from_url(user_id: int, url: str) -> None:
+    """Download avatar of user signed up with social account."""
+    user = models.User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    try:
+        services.set_user_avatar_from_url(user, url)
+    except services.AvatarError as error:
+        logger.warning("Avatar of user %s isn't set: %s", user_id, error)
+
+
+@shared_task(soft_time_limit=60)
+def process_avatar_upload(user_id: int, key: str) -> None:
+    """Set avatar of user from file uploaded directly to storage."""
+    user = models.User.objects.filter(pk=user_id).first()
+    if user is None:
+        uploads.delete_upload(key)
+        return
+    try:
+        services.set_user_avatar_from_upload(user, key)
+    except services.AvatarError as error:
+        logger.warning("Avatar of user %s isn't set: %s", user_id, error)
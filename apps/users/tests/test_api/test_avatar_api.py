@@ -0,0 +1,46 @@
+import io
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+import pytest
+import requests
+from PIL import Image
+
+from ...factories import UserFactory
+
+
+@pytest.mark.usefixtures("s3_storage")
+def test_avatar_direct_upload(
+    api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check user uploads avatar, which is downscaled by task."""
+    user = UserFactory(avatar=None)
+    api_client.force_authenticate(user)
+    avatar = io.BytesIO()
+    Image.new("RGB", (1024, 768), "magenta").save(avatar, format="JPEG")
+
+    response = api_client.post(
+        reverse("v1:avatar-upload"),
+        data={"filename": "avatar.jpg", "content_type": "image/jpeg"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    requests.post(
+        response.data["url"],
+        data=response.data["fields"],
+        files={"file": ("avatar.jpg", avatar.getvalue())},
+    ).raise_for_status()
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            reverse("v1:avatar-finish"),
+            data={"token": response.data["token"]},
+        )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    user.refresh_from_db()
+    assert user.avatar.name.endswith(f"{user.uid}.jpg")
+    assert max(user.avatar.width, user.avatar.height) == 512
+    assert user.avatar_thumbnail.storage.exists(user.avatar_thumbnail.name)
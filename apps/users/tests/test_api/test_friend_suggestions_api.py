@@ -0,0 +1,66 @@
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+import pytest
+
+from ... import graph
+from ...factories import FriendshipFactory, UserFactory
+
+
+@pytest.fixture(autouse=True)
+def reset_graph():
+    """Load friendship graph of current test from database."""
+    graph.friendship_graph.reset()
+
+
+def get_suggestions(api_client: APIClient) -> list[tuple[int, int]]:
+    """Get ids of suggested users with counts of mutual friends."""
+    response = api_client.get(reverse("v1:friend-suggestion-list"))
+    return [(user["id"], user["mutual_friends"]) for user in response.data]
+
+
+def test_friends_of_friends_suggested(
+    api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check friends of friends are ranked and follow friendship changes."""
+    user, friend, other_friend, known, stranger = UserFactory.create_batch(5)
+    FriendshipFactory(user=user, friend=friend)
+    FriendshipFactory(user=other_friend, friend=user)
+    FriendshipFactory(user=friend, friend=known)
+    FriendshipFactory(user=known, friend=other_friend)
+    FriendshipFactory(user=other_friend, friend=friend)
+    FriendshipFactory(user=friend, friend=stranger, is_accepted=False)
+    api_client.force_authenticate(user)
+
+    assert get_suggestions(api_client) == [(known.pk, 2)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        FriendshipFactory(user=stranger, friend=other_friend)
+        known.friendship_acceptor.get(user=friend).delete()
+    assert get_suggestions(api_client) == [
+        (known.pk, 1),
+        (stranger.pk, 1),
+    ]
+
+
+def test_friends_in_both_directions_kept_connected(
+    api_client: APIClient,
+    django_capture_on_commit_callbacks,
+):
+    """Check removal of one of mutual friendships keeps users connected."""
+    user, friend, known = UserFactory.create_batch(3)
+    FriendshipFactory(user=user, friend=friend)
+    FriendshipFactory(user=friend, friend=known)
+    api_client.force_authenticate(user)
+    assert get_suggestions(api_client) == [(known.pk, 1)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reverse_friendship = FriendshipFactory(user=friend, friend=user)
+        reverse_friendship.delete()
+    assert get_suggestions(api_client) == [(known.pk, 1)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.friendship_initiator.get(friend=friend).delete()
+    assert get_suggestions(api_client) == []
@@ -0,0 +1,22 @@
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+import pytest
+
+from ...factories import AdminUserFactory, UserFactory
+
+
+@pytest.mark.parametrize(
+    argnames="query",
+    argvalues=["lex", "Alexandre"],
+)
+def test_users_search(api_client: APIClient, query: str):
+    """Check users are found by part of name and by misspelled name."""
+    admin = AdminUserFactory(first_name="Admin", last_name="Admin")
+    api_client.force_authenticate(admin)
+    user = UserFactory(first_name="Alexander", last_name="Smith")
+    UserFactory(first_name="Bob", last_name="Jones")
+
+    response = api_client.get(reverse("v1:user-list"), {"search": query})
+    assert [item["id"] for item in response.data["results"]] == [user.pk]
@@ -3,7 +3,7 @@ from django.core.exceptions import ValidationError
 import pytest
 
 from .. import models
-from ..factories import UserFactory
+from ..factories import FriendshipFactory, UserFactory
 
 
 @pytest.fixture(scope="module")
@@ -21,3 +21,18 @@ def test_unique_email_validation(user):
     with pytest.raises(ValidationError) as exc:
         new_user.full_clean()
     assert "email" in exc.value.error_dict
+
+
+@pytest.mark.usefixtures("no_seqscan")
+@pytest.mark.parametrize(argnames="lookup", argvalues=["user", "friend"])
+def test_friendship_lookups_use_index(lookup: str):
+    """Check accepted friendships are found by index in both directions."""
+    friendship = FriendshipFactory()
+    FriendshipFactory.create_batch(5, friend=friendship.friend)
+    FriendshipFactory.create_batch(5, user=friendship.user, is_accepted=False)
+
+    plan = models.Friendship.objects.filter(
+        is_accepted=True,
+        **{lookup: getattr(friendship, lookup)},
+    ).values_list("user", "friend").explain()
+    assert "Seq Scan" not in plan
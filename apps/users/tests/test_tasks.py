@@ -0,0 +1,63 @@
+import types
+
+import pytest
+
+from libs.kinopoisk import StubKinopoiskServer
+
+from ..factories import UserFactory
+from ..models.user import set_user_avatar
+
+
+@pytest.fixture
+def avatar_url(settings, tmp_path):
+    """Serve avatar from local server and store media in temp directory."""
+    settings.MEDIA_ROOT = tmp_path
+    with StubKinopoiskServer() as server:
+        yield f"{server.base_url}posters/1.png"
+
+
+def sign_up(user, avatar_url: str) -> None:
+    """Send sign up signal of user with google account."""
+    set_user_avatar(
+        request=None,
+        user=user,
+        sociallogin=types.SimpleNamespace(
+            account=types.SimpleNamespace(
+                provider="google",
+                extra_data={"picture": avatar_url},
+            ),
+        ),
+    )
+
+
+def test_avatar_set_after_sign_up(
+    avatar_url: str,
+    django_capture_on_commit_callbacks,
+):
+    """Check avatar is downloaded and thumbnail is generated by task."""
+    user = UserFactory(avatar=None)
+    with django_capture_on_commit_callbacks() as callbacks:
+        sign_up(user, avatar_url)
+    # Nothing is downloaded during sign up
+    user.refresh_from_db()
+    assert not user.avatar
+
+    for callback in callbacks:
+        callback()
+    user.refresh_from_db()
+    assert user.avatar.name.endswith(".jpg")
+    assert user.avatar_thumbnail.storage.exists(user.avatar_thumbnail.name)
+
+
+def test_too_large_avatar_skipped(
+    avatar_url: str,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    """Check avatar larger than limit isn't set."""
+    settings.AVATAR_MAX_FILE_SIZE = 10
+    user = UserFactory(avatar=None)
+    with django_capture_on_commit_callbacks(execute=True):
+        sign_up(user, avatar_url)
+    user.refresh_from_db()
+    assert not user.avatar
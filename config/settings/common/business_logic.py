@@ -1,2 +1,97 @@
 # This file holds settings specific to the project
+from .paths import BASE_DIR
+
 KINOPOISK_BASE_URL = "https://www.kinopoisk.ru/film/"
+
+# How long rendered watchlists are kept in cache (in seconds). Cached
+# watchlist is invalidated on any change, so timeout only limits memory usage
+WATCHLIST_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Max count of changes in one request to batch watchlist endpoint
+WATCHLIST_BATCH_MAX_SIZE = 1000
+
+# Count of rows fetched from database at once during streaming export
+EXPORT_CHUNK_SIZE = 2000
+
+# Unofficial Kinopoisk API used to fetch metadata of movies
+KINOPOISK_API_URL = "https://kinopoiskapiunofficial.tech/api/"
+KINOPOISK_API_KEY = ""
+# Max requests per second of all celery workers together (bucket is kept
+# in Redis) and max concurrent requests of one process
+KINOPOISK_RATE_LIMIT = 20
+KINOPOISK_CONCURRENCY = 10
+# Responses are cached on disk and revalidated after max age (in seconds)
+KINOPOISK_CACHE_DIR = BASE_DIR / ".cache" / "kinopoisk"
+KINOPOISK_CACHE_MAX_AGE = 60 * 60 * 24
+# Count of movies fetched by one celery task
+KINOPOISK_FETCH_BATCH_SIZE = 100
+
+# Avatars of social accounts are downloaded by celery task. Timeouts are
+# (connect, read) in seconds, larger files are rejected and images are
+# downscaled to max side in pixels before they are processed
+AVATAR_DOWNLOAD_TIMEOUT = (3.05, 10)
+AVATAR_MAX_FILE_SIZE = 5 * 1024 * 1024
+AVATAR_MAX_PIXELS = 25_000_000
+AVATAR_MAX_SIDE = 512
+
+# Posters and avatars are uploaded by clients directly to storage with
+# presigned forms. Max size in bytes, lifetime of forms and tokens in
+# seconds and allowed content types of uploads
+DIRECT_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+DIRECT_UPLOAD_EXPIRES_IN = 15 * 60
+DIRECT_UPLOAD_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+# Files of content addressed storage without references are deleted when
+# they weren't used for this time (in seconds), so files saved for rows of
+# uncommitted transactions survive
+STORED_FILES_COLLECT_MIN_AGE = 60 * 60 * 24
+STORED_FILES_COLLECT_BATCH_SIZE = 500
+
+# Graph of friendships is kept in memory of every process. Changes of
+# friendships are shared through cache for this time (in seconds), process
+# which missed them loads graph again. Changes are merged into arrays of
+# graph after threshold count of them
+FRIENDSHIP_GRAPH_CHANGES_TIMEOUT = 60 * 60
+FRIENDSHIP_GRAPH_COMPACT_THRESHOLD = 1000
+FRIENDSHIP_GRAPH_LOAD_CHUNK_SIZE = 10000
+# Max count of friend suggestions returned by api
+FRIEND_SUGGESTIONS_LIMIT = 50
+
+# Recommendations are built nightly from watchlists and likes. Like of
+# movie in friend's watchlist weighs less than adding movie. Interactions
+# of one user are limited, so build time stays linear in their count
+RECOMMENDATIONS_LIKE_WEIGHT = 0.5
+RECOMMENDATIONS_MAX_USER_INTERACTIONS = 500
+RECOMMENDATIONS_NEIGHBOURS_COUNT = 50
+RECOMMENDATIONS_COUNT = 50
+# Count of rows loaded from or written to database at once and count of
+# rows of similarity matrix computed at once
+RECOMMENDATIONS_CHUNK_SIZE = 5000
+RECOMMENDATIONS_BLOCK_SIZE = 1000
+
+# Similar movies are found by TF-IDF vectors of titles and descriptions,
+# where words of title weigh more. Words found in more than max document
+# frequency of movies are skipped, only max terms heaviest words of movie
+# are kept, and similarities below min score are dropped
+SIMILAR_MOVIES_TITLE_WEIGHT = 2
+SIMILAR_MOVIES_MAX_DOCUMENT_FREQUENCY = 0.5
+SIMILAR_MOVIES_MAX_TERMS = 50
+SIMILAR_MOVIES_MIN_SCORE = 0.05
+SIMILAR_MOVIES_COUNT = 20
+# Count of similar movies shown on page of movie
+SIMILAR_MOVIES_SHOWN = 6
+
+# Sets of movies of users used to match tastes are cached for this time (in
+# seconds). They are reset on changes of user's watchlist and likes
+TASTE_CACHE_TIMEOUT = 60 * 60
+
+# Events of friends are pushed to feeds of users on write. Feed keeps only
+# max size of newest events, friends are written by batches of this size.
+# Events of users with more friends are read from their own feeds on
+# request instead of fan-out
+FEED_MAX_SIZE = 500
+FEED_FANOUT_BATCH_SIZE = 1000
+FEED_FANOUT_MAX_FRIENDS = 5000
+# Default and max count of events on page of feed
+FEED_PAGE_SIZE = 25
+FEED_MAX_PAGE_SIZE = 100
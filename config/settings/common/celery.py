@@ -1,3 +1,5 @@
+from celery.schedules import crontab
+
 CELERY_TASK_SERIALIZER = "pickle"
 CELERY_ACCEPT_CONTENT = ["pickle", "json"]
 
@@ -11,3 +13,15 @@ CELERY_TASK_EAGER_PROPAGATES = True
 # specify connection options for task producer, so it won’t retry forever if
 # the broker isn’t available at the first task execution
 CELERY_BROKER_TRANSPORT_OPTIONS = {"max_retries": 3, "socket_timeout": 5}
+
+# Periodic tasks, `django_celery_beat` scheduler stores them in database
+CELERY_BEAT_SCHEDULE = {
+    "build-recommendations": {
+        "task": "apps.movies.tasks.build_recommendations",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "build-similar-movies": {
+        "task": "apps.movies.tasks.build_similar_movies",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
@@ -8,5 +8,12 @@ DATABASES = dict(
         ENGINE="django.db.backends.postgresql",
         ATOMIC_REQUESTS=True,
         CONN_MAX_AGE=600,
+        OPTIONS=dict(
+            # Lower trigram word similarity threshold (default is 0.6) used by
+            # `trigram_word_similar` lookups, so misspelled search queries
+            # still match. Set per connection to avoid extra `SET` queries
+            # https://www.postgresql.org/docs/current/pgtrgm.html#PGTRGM-GUC
+            options="-c pg_trgm.word_similarity_threshold=0.5",
+        ),
     ),
 )
@@ -24,7 +24,7 @@ REST_FRAMEWORK = dict(
         "libs.open_api.filters.OrderingFilterBackend",
         "libs.open_api.filters.SearchFilterBackend",
     ),
-    DEFAULT_PAGINATION_CLASS="rest_framework.pagination.LimitOffsetPagination",
+    DEFAULT_PAGINATION_CLASS="libs.api.pagination.CursorPagination",
     PAGE_SIZE=25,
     EXCEPTION_HANDLER="libs.api.exceptions.exception_handler",
     TEST_REQUEST_DEFAULT_FORMAT="json",
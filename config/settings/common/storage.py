@@ -1,5 +1,15 @@
 # Django Storages
-DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+DEFAULT_FILE_STORAGE = "apps.core.storages.MediaStorage"
 
 AWS_S3_SECURE_URLS = False
 AWS_QUERYSTRING_AUTH = False
+
+# Urls of media files and names of image spec files are resolved once and
+# kept in memory of process, this is max count of kept entries
+MEDIA_URL_CACHE_SIZE = 10000
+IMAGEKIT_SPEC_CACHEFILE_NAMER = "libs.image_specs.cached_source_name_as_path"
+
+# Names of these files are derived from content (posters and their
+# thumbnails), so they are never changed and can be cached forever
+MEDIA_IMMUTABLE_PREFIXES = ("posters/", "CACHE/images/posters/")
+MEDIA_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
@@ -13,6 +13,8 @@ ENVIRONMENT = env.str("ENVIRONMENT")
 
 FRONTEND_URL = env.str("FRONTEND_URL", default="")
 
+KINOPOISK_API_KEY = env.str("KINOPOISK_API_KEY", default="")
+
 # ------------------------------------------------------------------------------
 # DATABASES - PostgreSQL
 # ------------------------------------------------------------------------------
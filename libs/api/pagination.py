@@ -0,0 +1,62 @@
+from collections import OrderedDict
+
+from rest_framework import pagination
+from rest_framework.response import Response
+
+from ..pagination import estimate_count
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Cursor pagination with estimated count of results.
+
+    Pages are fetched by position of the last seen object instead of offset,
+    so deep pages cost the same as the first one. Instead of exact `count`,
+    which requires scan of all matched rows, `estimated_count` is returned.
+
+    If view has ordering filter and client requested ordering, it's used
+    for cursor, otherwise `ordering` of pagination is used.
+
+    """
+    ordering = ("-created", "-id")
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Remember estimated count of results."""
+        self.estimated_count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        """Get ordering from ordering filter or fall back to default one."""
+        for filter_backend in getattr(view, "filter_backends", ()):
+            if not hasattr(filter_backend, "get_ordering"):
+                continue
+            ordering = filter_backend().get_ordering(request, queryset, view)
+            if ordering:
+                return tuple(ordering)
+        return self.ordering
+
+    def get_paginated_response(self, data):
+        """Add estimated count to response."""
+        return Response(
+            OrderedDict(
+                [
+                    ("estimated_count", self.estimated_count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ],
+            ),
+        )
+
+    def get_paginated_response_schema(self, schema):
+        """Add estimated count to response schema."""
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = OrderedDict(
+            estimated_count={
+                "type": "integer",
+                "example": 123,
+            },
+            **response_schema["properties"],
+        )
+        return response_schema
@@ -0,0 +1,91 @@
+import csv
+import json
+import typing
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.text import compress_sequence
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+CONTENT_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv",
+}
+
+_encoder = DjangoJSONEncoder()
+
+
+class _Echo:
+    """File-like object, which returns written value instead of storing it.
+
+    Allows to get lines from `csv.writer` one by one.
+
+    """
+
+    def write(self, value: str) -> str:
+        """Return written value."""
+        return value
+
+
+def _csv_value(value: typing.Any) -> typing.Any:
+    """Convert value to the same text as in json."""
+    if isinstance(value, bool):
+        return json.dumps(value)
+    if value is None or isinstance(value, str | int | float):
+        return value
+    return _encoder.default(value)
+
+
+def iter_ndjson(rows: typing.Iterable[dict]) -> typing.Iterator[str]:
+    """Convert rows to lines of newline delimited json."""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield "\n"
+
+
+def iter_csv(
+    rows: typing.Iterable[dict],
+    fields: typing.Sequence[str],
+    header: bool = True,
+) -> typing.Iterator[str]:
+    """Convert rows to lines of csv, with header unless it's disabled."""
+    writer = csv.DictWriter(_Echo(), fieldnames=fields)
+    if header:
+        yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow({
+            field: _csv_value(value) for field, value in row.items()
+        })
+
+
+def iter_export(
+    rows: typing.Iterable[dict],
+    fields: typing.Sequence[str],
+    file_format: str = FORMAT_NDJSON,
+    gzip: bool = False,
+    header: bool = True,
+) -> typing.Iterator[bytes]:
+    """Convert rows to chunks of export file.
+
+    Rows are converted one by one, so memory usage doesn't depend on count
+    of rows, if they are taken from a lazy iterator
+    (like `QuerySet.iterator()`).
+
+    Args:
+        rows: Dicts with values of `fields`.
+        fields: Names of exported fields.
+        file_format: One of `FORMATS`.
+        gzip: Whether to compress output with gzip on the fly.
+        header: Whether to start csv with header. Disable it when export
+            is resumed and appended to existing file.
+
+    """
+    if file_format == FORMAT_CSV:
+        lines = iter_csv(rows, fields, header=header)
+    else:
+        lines = iter_ndjson(rows)
+    chunks = (line.encode() for line in lines)
+    if gzip:
+        return compress_sequence(chunks)
+    return chunks
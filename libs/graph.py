@@ -0,0 +1,216 @@
+import numpy as np
+
+INDEX_DTYPE = np.int32
+
+
+def _empty() -> np.ndarray:
+    return np.empty(0, dtype=INDEX_DTYPE)
+
+
+class CSRGraph:
+    """Undirected graph stored as compressed sparse rows.
+
+    Nodes are non negative ints (like ids of rows), sorted neighbours of
+    node `n` are `targets[offsets[n]:offsets[n + 1]]`. Arrays are compact
+    and lookups don't allocate Python objects per edge.
+
+    Arrays aren't changed after build. Edges added or removed later are kept
+    in overlay sets, which are merged into arrays by `compact()`.
+
+    """
+
+    def __init__(self, offsets: np.ndarray, targets: np.ndarray):
+        self.offsets = offsets
+        self.targets = targets
+        self._added: dict[int, set[int]] = {}
+        self._removed: dict[int, set[int]] = {}
+        self.pending_changes = 0
+
+    @classmethod
+    def from_edges(cls, sources, targets) -> "CSRGraph":
+        """Build graph from pairs of connected nodes.
+
+        Every edge connects nodes in both directions, duplicated edges and
+        loops are skipped.
+
+        """
+        sources = np.asarray(sources, dtype=INDEX_DTYPE)
+        targets = np.asarray(targets, dtype=INDEX_DTYPE)
+        heads = np.concatenate((sources, targets))
+        tails = np.concatenate((targets, sources))
+        return cls._build(heads, tails)
+
+    @classmethod
+    def _build(cls, heads: np.ndarray, tails: np.ndarray) -> "CSRGraph":
+        """Build graph from directed edges."""
+        not_loop = heads != tails
+        heads, tails = heads[not_loop], tails[not_loop]
+        order = np.lexsort((tails, heads))
+        heads, tails = heads[order], tails[order]
+        unique = np.ones(len(heads), dtype=bool)
+        unique[1:] = (heads[1:] != heads[:-1]) | (tails[1:] != tails[:-1])
+        heads, tails = heads[unique], tails[unique]
+        size = int(heads[-1]) + 1 if len(heads) else 0
+        offsets = np.zeros(size + 1, dtype=INDEX_DTYPE)
+        np.cumsum(np.bincount(heads, minlength=size), out=offsets[1:])
+        return cls(offsets, tails.astype(INDEX_DTYPE, copy=False))
+
+    @property
+    def edges_count(self) -> int:
+        """Get count of undirected edges in arrays."""
+        return len(self.targets) // 2
+
+    def _base_neighbours(self, node: int) -> np.ndarray:
+        """Get neighbours of node stored in arrays."""
+        if node + 1 >= len(self.offsets):
+            return _empty()
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def _has_base_edge(self, node: int, other: int) -> bool:
+        neighbours = self._base_neighbours(node)
+        position = np.searchsorted(neighbours, other)
+        return (
+            position < len(neighbours) and neighbours[position] == other
+        )
+
+    def neighbours(self, node: int) -> np.ndarray:
+        """Get sorted neighbours of node."""
+        neighbours = self._base_neighbours(node)
+        added = self._added.get(node)
+        removed = self._removed.get(node)
+        if not added and not removed:
+            return neighbours
+        merged = set(neighbours.tolist())
+        merged |= added or set()
+        merged -= removed or set()
+        return np.array(sorted(merged), dtype=INDEX_DTYPE)
+
+    def degrees(self, nodes: np.ndarray) -> np.ndarray:
+        """Get counts of neighbours of nodes."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        degrees = np.zeros(len(nodes), dtype=np.int64)
+        in_arrays = nodes + 1 < len(self.offsets)
+        stored = nodes[in_arrays]
+        degrees[in_arrays] = self.offsets[stored + 1] - self.offsets[stored]
+        if self._added or self._removed:
+            for index, node in enumerate(nodes.tolist()):
+                degrees[index] += len(self._added.get(node, ()))
+                degrees[index] -= len(self._removed.get(node, ()))
+        return degrees
+
+    def add_edge(self, node: int, other: int) -> None:
+        """Connect nodes."""
+        if node == other:
+            return
+        for head, tail in ((node, other), (other, node)):
+            self._removed.get(head, set()).discard(tail)
+            if not self._has_base_edge(head, tail):
+                self._added.setdefault(head, set()).add(tail)
+        self.pending_changes += 1
+
+    def remove_edge(self, node: int, other: int) -> None:
+        """Disconnect nodes."""
+        for head, tail in ((node, other), (other, node)):
+            self._added.get(head, set()).discard(tail)
+            if self._has_base_edge(head, tail):
+                self._removed.setdefault(head, set()).add(tail)
+        self.pending_changes += 1
+
+    def compact(self) -> None:
+        """Merge added and removed edges into arrays."""
+        if not self.pending_changes:
+            return
+        heads = np.repeat(
+            np.arange(len(self.offsets) - 1, dtype=INDEX_DTYPE),
+            np.diff(self.offsets),
+        )
+        tails = self.targets
+        removed = [
+            (head, tail)
+            for head, tails_set in self._removed.items()
+            for tail in tails_set
+        ]
+        if removed:
+            removed_heads, removed_tails = np.array(
+                removed,
+                dtype=np.int64,
+            ).T
+            codes = heads.astype(np.int64) << 32 | tails
+            removed_codes = removed_heads << 32 | removed_tails
+            kept = ~np.isin(codes, removed_codes)
+            heads, tails = heads[kept], tails[kept]
+        added = [
+            (head, tail)
+            for head, tails_set in self._added.items()
+            for tail in tails_set
+        ]
+        if added:
+            added_heads, added_tails = np.array(
+                added,
+                dtype=INDEX_DTYPE,
+            ).T
+            heads = np.concatenate((heads, added_heads))
+            tails = np.concatenate((tails, added_tails))
+        graph = self._build(heads, tails)
+        self.offsets, self.targets = graph.offsets, graph.targets
+        self._added, self._removed = {}, {}
+        self.pending_changes = 0
+
+    def _gather_neighbours(self, nodes: np.ndarray) -> np.ndarray:
+        """Get concatenated neighbours of nodes.
+
+        Neighbours of nodes without overlay changes are sliced from arrays
+        with one vectorized gather.
+
+        """
+        changed = [
+            node for node in nodes.tolist()
+            if node in self._added or node in self._removed
+        ]
+        if changed:
+            nodes = nodes[~np.isin(nodes, changed)]
+        nodes = nodes[nodes + 1 < len(self.offsets)]
+        starts = self.offsets[nodes]
+        lengths = self.offsets[nodes + 1] - starts
+        total = int(lengths.sum())
+        # Index of every gathered item: start of its node plus its position
+        # inside the node's slice
+        shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        gathered = self.targets[shifts + np.arange(total)]
+        if not changed:
+            return gathered
+        return np.concatenate(
+            [gathered] + [self.neighbours(node) for node in changed],
+        )
+
+    def suggest(self, node: int, limit: int) -> list[tuple[int, int]]:
+        """Get nodes two hops away, ranked by count of common neighbours.
+
+        Returns:
+            Pairs of node and count of common neighbours, with most
+            connected nodes first and ties broken by node.
+
+        """
+        neighbours = self.neighbours(node)
+        if not len(neighbours) or limit <= 0:
+            return []
+        candidates, counts = np.unique(
+            self._gather_neighbours(neighbours),
+            return_counts=True,
+        )
+        kept = (candidates != node) & ~np.isin(
+            candidates,
+            neighbours,
+            assume_unique=True,
+        )
+        candidates, counts = candidates[kept], counts[kept]
+        if len(candidates) > limit:
+            # Keep all candidates tied with the last one, so ties are broken
+            # by node below
+            threshold = np.partition(counts, -limit)[-limit]
+            top = counts >= threshold
+            candidates, counts = candidates[top], counts[top]
+        order = np.lexsort((candidates, -counts))[:limit]
+        return list(
+            zip(candidates[order].tolist(), counts[order].tolist()),
+        )
@@ -0,0 +1,17 @@
+from .breaker import (
+    CircuitBreaker,
+    get_circuit_breaker,
+    reset_circuit_breakers,
+)
+from .cache import CachedResponse, DiskCache
+from .client import (
+    DEFAULT_TIMEOUT,
+    AsyncHttpClient,
+    HttpClient,
+    RequestStats,
+    get_http_client,
+)
+from .errors import CircuitOpenError, HttpError, ResponseTooLargeError
+from .metrics import HostMetrics, get_host_metrics, reset_host_metrics
+from .rate_limiter import RateLimiter, RedisRateLimiter
+from .stub import StubServer
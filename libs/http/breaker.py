@@ -0,0 +1,80 @@
+import threading
+import time
+
+from .errors import CircuitOpenError
+
+
+class CircuitBreaker:
+    """Circuit breaker of requests to one host.
+
+    After `failure_threshold` consecutive failures circuit opens and
+    requests are rejected without network calls for `reset_timeout`
+    seconds. Then one trial request is let through: its success closes
+    circuit, its failure opens circuit again.
+
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests are rejected now."""
+        return (
+            self._opened_at is not None
+            and time.monotonic() - self._opened_at < self.reset_timeout
+        )
+
+    def before_request(self, host: str) -> None:
+        """Check request is allowed.
+
+        Raises:
+            CircuitOpenError: If circuit is open.
+
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self.is_open:
+                raise CircuitOpenError(f"Circuit of {host} is open")
+            # Trial request, other requests wait for its result
+            self._opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        """Close circuit after successful request."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count failure and open circuit after too many of them."""
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str, **kwargs) -> CircuitBreaker:
+    """Get process-wide circuit breaker of host.
+
+    Keyword arguments are used only when breaker is created.
+
+    """
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(**kwargs)
+        return _breakers[host]
+
+
+def reset_circuit_breakers() -> None:
+    """Forget state of all circuit breakers."""
+    with _breakers_lock:
+        _breakers.clear()
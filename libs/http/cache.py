@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import time
+import typing
+
+
+class CachedResponse(typing.NamedTuple):
+    """Response stored in `DiskCache`."""
+    content: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = 0.0
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Return whether response can be used without revalidation."""
+        return time.time() - self.fetched_at < max_age
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Get headers for conditional revalidation of response."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """Cache of HTTP responses in files.
+
+    Each response is stored in its own file named by hash of url, so cache
+    survives restarts and is shared by processes of one host. Files are
+    replaced atomically, so concurrent readers never see partial data.
+
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_age: float):
+        self.directory = pathlib.Path(directory)
+        self.max_age = max_age
+
+    def _get_path(self, url: str) -> pathlib.Path:
+        """Get path of file with cached response."""
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Get cached response of url."""
+        try:
+            data = json.loads(self._get_path(url).read_text())
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(
+            content=base64.b64decode(data["content"]),
+            etag=data["etag"],
+            last_modified=data["last_modified"],
+            fetched_at=data["fetched_at"],
+        )
+
+    def set(self, url: str, response: CachedResponse) -> None:
+        """Store response of url."""
+        path = self._get_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({
+            **response._asdict(),
+            "content": base64.b64encode(response.content).decode(),
+        })
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=path.parent,
+            delete=False,
+        ) as file:
+            file.write(data)
+        os.replace(file.name, path)
+
+    def touch(self, url: str, response: CachedResponse) -> CachedResponse:
+        """Mark response as fetched now after successful revalidation."""
+        response = response._replace(fetched_at=time.time())
+        self.set(url, response)
+        return response
@@ -0,0 +1,493 @@
+import asyncio
+import dataclasses
+import functools
+import random
+import time
+
+import httpx
+
+from .breaker import get_circuit_breaker
+from .cache import CachedResponse, DiskCache
+from .errors import HttpError, ResponseTooLargeError
+from .metrics import record_request
+from .rate_limiter import RateLimiter, RedisRateLimiter
+
+# Default (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = httpx.Timeout(10, connect=3.05)
+# Responses worth retrying: rate limit and temporary server errors
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+Timeout = float | tuple[float, float] | httpx.Timeout
+
+
+@dataclasses.dataclass
+class RequestStats:
+    """Counters of client's work."""
+    requests: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    revalidated: int = 0
+
+
+class BaseHttpClient:
+    """Common logic of sync and asyncio clients.
+
+    Every request has timeouts. Connection errors, 429 and 5xx responses
+    are retried with exponential backoff and full jitter, `Retry-After`
+    header is respected. Failures are counted by process-wide circuit
+    breaker of host, latency is recorded to host metrics.
+
+    `get` uses optional `DiskCache`: fresh responses are returned without
+    requests, stale ones are revalidated by `ETag`/`Last-Modified`.
+
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        headers: dict[str, str] | None = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        max_connections: int = 10,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        cache: DiskCache | None = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+    ):
+        self.base_url = httpx.URL(base_url)
+        self.headers = headers or {}
+        self.timeout = _get_timeout(timeout)
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = cache
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.stats = RequestStats()
+
+    def _get_client_options(self) -> dict:
+        """Get options of httpx client."""
+        return dict(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    def _get_url(self, url: str) -> httpx.URL:
+        """Get absolute url."""
+        if not str(self.base_url):
+            return httpx.URL(url)
+        return self.base_url.join(url)
+
+    def _get_cached(self, url: httpx.URL) -> CachedResponse | None:
+        """Get cached response of url."""
+        return self.cache.get(str(url)) if self.cache else None
+
+    def _get_fresh_response(
+        self,
+        url: httpx.URL,
+        cached: CachedResponse | None,
+    ) -> httpx.Response | None:
+        """Get response from cache if it doesn't need revalidation."""
+        if not cached or not cached.is_fresh(self.cache.max_age):
+            return None
+        self.stats.cache_hits += 1
+        return _build_response(url, cached)
+
+    def _handle_cached_response(
+        self,
+        url: httpx.URL,
+        cached: CachedResponse | None,
+        response: httpx.Response,
+    ) -> httpx.Response:
+        """Store response in cache or use cache on `304 Not Modified`."""
+        if not self.cache:
+            return response
+        if response.status_code == 304 and cached:
+            self.stats.revalidated += 1
+            return _build_response(url, self.cache.touch(str(url), cached))
+        if response.status_code == 200:
+            self.cache.set(
+                str(url),
+                CachedResponse(
+                    content=response.content,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    fetched_at=time.time(),
+                ),
+            )
+        return response
+
+    def _get_headers(
+        self,
+        headers: dict[str, str] | None,
+        cached: CachedResponse | None,
+    ) -> dict[str, str]:
+        """Get headers of request with validators of cached response."""
+        return {**(headers or {}), **(cached.validators if cached else {})}
+
+    def _before_attempt(self, url: httpx.URL) -> float:
+        """Check circuit breaker and get start time of attempt."""
+        self._get_breaker(url).before_request(url.host)
+        self.stats.requests += 1
+        return time.monotonic()
+
+    def _after_attempt(
+        self,
+        url: httpx.URL,
+        started: float,
+        attempt: int,
+        response: httpx.Response | None = None,
+        error: Exception | None = None,
+    ) -> float | None:
+        """Record result of attempt.
+
+        Returns:
+            Delay before retry or `None` if response must be returned.
+
+        Raises:
+            HttpError: If request failed and retries are exhausted.
+
+        """
+        failed = error is not None or response.status_code in RETRY_STATUSES
+        record_request(
+            _get_host(url),
+            time.monotonic() - started,
+            is_error=failed,
+        )
+        breaker = self._get_breaker(url)
+        if not failed:
+            breaker.record_success()
+            return None
+        breaker.record_failure()
+
+        if attempt == self.max_retries:
+            if error is not None:
+                raise HttpError(f"{url}: {error!r}") from error
+            return None
+        self.stats.retries += 1
+        retry_after = _get_retry_after(response) if response else None
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, self.backoff * 2 ** attempt)  # noqa: S311
+
+    def _get_breaker(self, url: httpx.URL):
+        """Get circuit breaker of host of url."""
+        return get_circuit_breaker(
+            _get_host(url),
+            failure_threshold=self.failure_threshold,
+            reset_timeout=self.reset_timeout,
+        )
+
+
+class HttpClient(BaseHttpClient):
+    """Sync client with pool of keep-alive connections.
+
+    Use `get_http_client` for process-wide client without base url.
+
+    Usage:
+        response = get_http_client().get(url, max_size=1024 * 1024)
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = httpx.Client(**self._get_client_options())
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close connections."""
+        self._client.close()
+
+    def get(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: Timeout | None = None,
+        max_size: int | None = None,
+    ) -> httpx.Response:
+        """Make GET request using cache."""
+        full_url = self._get_url(url)
+        cached = self._get_cached(full_url)
+        response = self._get_fresh_response(full_url, cached)
+        if response is not None:
+            return response
+        response = self.request(
+            "GET",
+            full_url,
+            headers=self._get_headers(headers, cached),
+            timeout=timeout,
+            max_size=max_size,
+        )
+        return self._handle_cached_response(full_url, cached, response)
+
+    def request(
+        self,
+        method: str,
+        url: str | httpx.URL,
+        headers: dict[str, str] | None = None,
+        timeout: Timeout | None = None,
+        max_size: int | None = None,
+    ) -> httpx.Response:
+        """Make request retrying temporary failures.
+
+        Args:
+            method: HTTP method.
+            url: Absolute url or url relative to base url.
+            headers: Additional headers.
+            timeout: Timeout instead of client's one.
+            max_size: Max size of response body in bytes.
+
+        Raises:
+            HttpError: If request failed or circuit of host is open.
+            ResponseTooLargeError: If body exceeds `max_size`.
+
+        """
+        url = self._get_url(str(url))
+        for attempt in range(self.max_retries + 1):
+            started = self._before_attempt(url)
+            try:
+                response = self._send(method, url, headers, timeout, max_size)
+            except httpx.TransportError as error:
+                delay = self._after_attempt(url, started, attempt, error=error)
+            else:
+                delay = self._after_attempt(
+                    url,
+                    started,
+                    attempt,
+                    response=response,
+                )
+                if delay is None:
+                    return response
+            time.sleep(delay)
+        raise AssertionError("Unreachable")  # pragma: no cover
+
+    def _send(
+        self,
+        method: str,
+        url: httpx.URL,
+        headers: dict[str, str] | None,
+        timeout: Timeout | None,
+        max_size: int | None,
+    ) -> httpx.Response:
+        """Send request and read body."""
+        with self._client.stream(
+            method,
+            url,
+            headers=headers,
+            timeout=_get_timeout(timeout) if timeout else self.timeout,
+        ) as response:
+            # Chunks are appended in place, so body isn't copied per chunk
+            content = bytearray()
+            _check_size(response, len(content), max_size)
+            for chunk in response.iter_bytes():
+                content += chunk
+                _check_size(response, len(content), max_size)
+        return _copy_response(response, bytes(content))
+
+
+class AsyncHttpClient(BaseHttpClient):
+    """Asyncio client with pool of keep-alive connections.
+
+    Pool is bound to event loop, so client is used as async context
+    manager. Optional `rate_limiter` is shared by all requests of client.
+
+    Usage:
+        async with AsyncHttpClient(base_url) as client:
+            response = await client.get("films/1")
+
+    """
+
+    def __init__(
+        self,
+        *args,
+        rate_limiter: RateLimiter | RedisRateLimiter | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        self._client = httpx.AsyncClient(**self._get_client_options())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.aclose()
+
+    async def get(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: Timeout | None = None,
+        max_size: int | None = None,
+    ) -> httpx.Response:
+        """Make GET request using cache."""
+        full_url = self._get_url(url)
+        cached = self._get_cached(full_url)
+        response = self._get_fresh_response(full_url, cached)
+        if response is not None:
+            return response
+        response = await self.request(
+            "GET",
+            full_url,
+            headers=self._get_headers(headers, cached),
+            timeout=timeout,
+            max_size=max_size,
+        )
+        return self._handle_cached_response(full_url, cached, response)
+
+    async def request(
+        self,
+        method: str,
+        url: str | httpx.URL,
+        headers: dict[str, str] | None = None,
+        timeout: Timeout | None = None,
+        max_size: int | None = None,
+    ) -> httpx.Response:
+        """Make request retrying temporary failures.
+
+        Works the same way as `HttpClient.request`.
+
+        """
+        url = self._get_url(str(url))
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            started = self._before_attempt(url)
+            try:
+                response = await self._send(
+                    method,
+                    url,
+                    headers,
+                    timeout,
+                    max_size,
+                )
+            except httpx.TransportError as error:
+                delay = self._after_attempt(url, started, attempt, error=error)
+            else:
+                delay = self._after_attempt(
+                    url,
+                    started,
+                    attempt,
+                    response=response,
+                )
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+        raise AssertionError("Unreachable")  # pragma: no cover
+
+    async def _send(
+        self,
+        method: str,
+        url: httpx.URL,
+        headers: dict[str, str] | None,
+        timeout: Timeout | None,
+        max_size: int | None,
+    ) -> httpx.Response:
+        """Send request and read body."""
+        async with self._client.stream(
+            method,
+            url,
+            headers=headers,
+            timeout=_get_timeout(timeout) if timeout else self.timeout,
+        ) as response:
+            # Chunks are appended in place, so body isn't copied per chunk
+            content = bytearray()
+            _check_size(response, len(content), max_size)
+            async for chunk in response.aiter_bytes():
+                content += chunk
+                _check_size(response, len(content), max_size)
+        return _copy_response(response, bytes(content))
+
+
+@functools.cache
+def get_http_client() -> HttpClient:
+    """Get process-wide sync client with default settings."""
+    return HttpClient()
+
+
+def _get_timeout(timeout: Timeout) -> httpx.Timeout:
+    """Convert `(connect, read)` tuple or seconds to httpx timeout."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def _get_host(url: httpx.URL) -> str:
+    """Get host with port of url."""
+    return url.netloc.decode()
+
+
+def _get_retry_after(response: httpx.Response) -> float | None:
+    """Get delay requested by server in seconds."""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _check_size(
+    response: httpx.Response,
+    size: int,
+    max_size: int | None,
+) -> None:
+    """Check size of response body.
+
+    Raises:
+        ResponseTooLargeError: If `Content-Length` or read body exceeds
+            `max_size`.
+
+    """
+    if max_size is None:
+        return
+    length = int(response.headers.get("Content-Length") or 0)
+    if max(length, size) > max_size:
+        raise ResponseTooLargeError(
+            f"{response.url}: response is larger than {max_size} bytes",
+        )
+
+
+def _copy_response(
+    response: httpx.Response,
+    content: bytes,
+) -> httpx.Response:
+    """Get streamed response with read content.
+
+    Content is already decoded, so encoding headers are dropped.
+
+    """
+    headers = response.headers.copy()
+    for header in ("Content-Encoding", "Content-Length"):
+        headers.pop(header, None)
+    return httpx.Response(
+        status_code=response.status_code,
+        headers=headers,
+        content=content,
+        request=response.request,
+    )
+
+
+def _build_response(url: httpx.URL, cached: CachedResponse) -> httpx.Response:
+    """Build response from cache."""
+    headers = {}
+    if cached.etag:
+        headers["ETag"] = cached.etag
+    if cached.last_modified:
+        headers["Last-Modified"] = cached.last_modified
+    return httpx.Response(
+        status_code=200,
+        headers=headers,
+        content=cached.content,
+        request=httpx.Request("GET", url),
+    )
@@ -0,0 +1,10 @@
+class HttpError(Exception):
+    """Request failed after all retries."""
+
+
+class CircuitOpenError(HttpError):
+    """Requests to host are rejected by open circuit breaker."""
+
+
+class ResponseTooLargeError(HttpError):
+    """Response body exceeds allowed size."""
@@ -0,0 +1,46 @@
+import collections
+import dataclasses
+import threading
+
+
+@dataclasses.dataclass
+class HostMetrics:
+    """Latency metrics of requests to one host in current process."""
+    requests: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def avg_time(self) -> float:
+        """Get average time of request in seconds."""
+        return self.total_time / self.requests if self.requests else 0.0
+
+
+_metrics: dict[str, HostMetrics] = collections.defaultdict(HostMetrics)
+_metrics_lock = threading.Lock()
+
+
+def record_request(host: str, elapsed: float, is_error: bool) -> None:
+    """Add request to metrics of host."""
+    with _metrics_lock:
+        metrics = _metrics[host]
+        metrics.requests += 1
+        metrics.errors += is_error
+        metrics.total_time += elapsed
+        metrics.max_time = max(metrics.max_time, elapsed)
+
+
+def get_host_metrics() -> dict[str, HostMetrics]:
+    """Get copy of metrics of all hosts."""
+    with _metrics_lock:
+        return {
+            host: dataclasses.replace(metrics)
+            for host, metrics in _metrics.items()
+        }
+
+
+def reset_host_metrics() -> None:
+    """Clear metrics of all hosts."""
+    with _metrics_lock:
+        _metrics.clear()
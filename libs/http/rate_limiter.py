@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Token bucket limiting rate of requests of asyncio tasks.
+
+    Bucket holds up to `burst` tokens and is refilled with `rate` tokens per
+    second, every request takes one token and waits if bucket is empty.
+    Instance is shared by all requests of client, so the limit is global
+    for all concurrent fetches of process. Use `RedisRateLimiter` to limit
+    requests of several processes.
+
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until request is allowed."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated_at) * self.rate,
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Token bucket in a hash of `tokens` and `updated_at`. Time is taken from
+# Redis server, so clocks of clients don't matter. Returns seconds to wait
+# before retry, or 0 if token is taken
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimiter:
+    """Token bucket shared by all processes through Redis.
+
+    Works like `RateLimiter`, but the bucket is kept in Redis under `key`
+    and updated by atomic Lua script, so the limit is global for all
+    processes (like celery workers) using the same key.
+
+    """
+
+    def __init__(self, redis, key: str, rate: float, burst: int = 1):
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self._take_token = redis.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self) -> None:
+        """Wait until request is allowed."""
+        while True:
+            # Redis client is blocking, so it's called in thread
+            wait = float(
+                await asyncio.to_thread(
+                    self._take_token,
+                    keys=[self.key],
+                    args=[self.rate, self.burst],
+                ),
+            )
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
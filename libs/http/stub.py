@@ -0,0 +1,82 @@
+import collections
+import hashlib
+import http.server
+import threading
+
+
+class StubServer:
+    """Local HTTP server standing in for external services in tests.
+
+    Subclasses implement `get_response`. Successful responses get `ETag`
+    and requests with matching `If-None-Match` get `304 Not Modified`, so
+    clients' caches can be tested as well.
+
+    Usage:
+        with StubServer() as server:
+            response = get_http_client().get(f"{server.base_url}path")
+
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        # Count of requests by path
+        self.requests: collections.Counter = collections.Counter()
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer(
+            (host, port),
+            self._get_handler_class(),
+        )
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True,
+        )
+
+    @property
+    def base_url(self) -> str:
+        """Get url of server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        """Serve requests in current thread until interrupted."""
+        self._server.serve_forever()
+
+    def get_response(self, path: str) -> tuple[int, bytes, dict[str, str]]:
+        """Get status, body and headers of response for GET request."""
+        return 404, b"", {}
+
+    def _get_handler_class(self) -> type[http.server.BaseHTTPRequestHandler]:
+        """Get class of request handler bound to server."""
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # noqa: N802
+                with stub._lock:
+                    stub.requests[self.path] += 1
+                status, body, headers = stub.get_response(self.path)
+                if status == 200:
+                    etag = f'"{hashlib.md5(body).hexdigest()}"'  # noqa: S303
+                    headers = {"ETag": etag, **headers}
+                    if self.headers["If-None-Match"] == etag:
+                        status, body = 304, b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                """Don't spam stderr with access log."""
+
+        return Handler
@@ -0,0 +1,46 @@
+from django.conf import settings
+
+from imagekit.cachefiles import namers
+
+
+class Pregenerated:
+    """Cache file strategy for image specs generated in background.
+
+    Unlike default `JustInTime` strategy it never generates files or checks
+    their existence while urls are rendered, so pages with many images make
+    no storage requests. Files must be generated explicitly (by a task
+    after upload or by `generateimages` command), until then their urls
+    point to missing files.
+
+    """
+
+    def should_verify_existence(self, file) -> bool:
+        """Assume that files always exist."""
+        return False
+
+
+_cachefile_names: dict[tuple[type, str], str] = {}
+
+
+def cached_source_name_as_path(generator) -> str:
+    """Get name of cache file of spec, memoized by spec and source.
+
+    Default namer hashes pickled processors and options of spec on every
+    access to image spec field, which adds up on pages with many images.
+    Specs of `ImageSpecField` are fixed per class, so name depends only on
+    class and name of source.
+
+    """
+    key = (type(generator), generator.source.name)
+    name = _cachefile_names.get(key)
+    if name is None:
+        if len(_cachefile_names) >= settings.MEDIA_URL_CACHE_SIZE:
+            _cachefile_names.clear()
+        name = namers.source_name_as_path(generator)
+        _cachefile_names[key] = name
+    return name
+
+
+def clear_cachefile_names():
+    """Forget memoized names of cache files."""
+    _cachefile_names.clear()
@@ -0,0 +1,2 @@
+from .client import KinopoiskClient, KinopoiskError, KinopoiskMovie
+from .stub import StubKinopoiskServer
@@ -0,0 +1,179 @@
+import asyncio
+import datetime
+import json
+import logging
+import typing
+
+from libs.http import (
+    AsyncHttpClient,
+    DiskCache,
+    HttpError,
+    RateLimiter,
+    RedisRateLimiter,
+    RequestStats,
+)
+
+logger = logging.getLogger("django")
+
+
+class KinopoiskError(Exception):
+    """Error of request to Kinopoisk API."""
+
+
+class KinopoiskMovie(typing.NamedTuple):
+    """Metadata of movie fetched from Kinopoisk."""
+    kinopoisk_id: int
+    title: str | None
+    description: str | None
+    duration: datetime.timedelta | None
+    poster_url: str | None
+    poster: bytes | None = None
+
+
+class KinopoiskClient:
+    """Asyncio client of unofficial Kinopoisk API.
+
+    Requests are made by `AsyncHttpClient` with one rate limiter, so
+    they share pool of connections, retries, circuit breaker and cache of
+    responses. Rate limiter of process is used unless `rate_limiter` is
+    passed, pass `RedisRateLimiter` to share limit between processes.
+
+    Posters are hosted by CDN, so they are downloaded by separate client
+    without API key, rate limit and cache.
+
+    Usage:
+        async with KinopoiskClient(base_url, api_key) as client:
+            movies = await client.fetch_movies([301, 326])
+
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str = "",
+        rate_limit: float = 20,
+        concurrency: int = 10,
+        timeout: float = 10,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        cache: DiskCache | None = None,
+        rate_limiter: RateLimiter | RedisRateLimiter | None = None,
+    ):
+        self.concurrency = concurrency
+        self.http = AsyncHttpClient(
+            base_url=base_url,
+            headers={"X-API-KEY": api_key},
+            timeout=timeout,
+            max_connections=concurrency,
+            max_retries=max_retries,
+            backoff=backoff,
+            cache=cache,
+            rate_limiter=rate_limiter or RateLimiter(
+                rate=rate_limit,
+                burst=concurrency,
+            ),
+        )
+        self.posters = AsyncHttpClient(
+            timeout=timeout,
+            max_connections=concurrency,
+            max_retries=max_retries,
+            backoff=backoff,
+        )
+
+    @property
+    def stats(self) -> RequestStats:
+        """Get counters of requests to API."""
+        return self.http.stats
+
+    async def __aenter__(self) -> "KinopoiskClient":
+        await self.http.__aenter__()
+        await self.posters.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.posters.__aexit__(*exc_info)
+        await self.http.__aexit__(*exc_info)
+
+    async def fetch_movies(
+        self,
+        kinopoisk_ids: typing.Iterable[int],
+        poster_ids: typing.Container[int] | None = None,
+    ) -> list[KinopoiskMovie]:
+        """Fetch movies concurrently.
+
+        Missing movies and movies failed after all retries are logged and
+        skipped.
+
+        Args:
+            kinopoisk_ids: Ids of fetched movies.
+            poster_ids: Ids of movies, whose posters are downloaded, all
+                by default.
+
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(kinopoisk_id: int) -> KinopoiskMovie | None:
+            async with semaphore:
+                return await self.fetch_movie(
+                    kinopoisk_id,
+                    with_poster=(
+                        poster_ids is None or kinopoisk_id in poster_ids
+                    ),
+                )
+
+        results = await asyncio.gather(
+            *(fetch(kinopoisk_id) for kinopoisk_id in kinopoisk_ids),
+            return_exceptions=True,
+        )
+        movies = []
+        for result in results:
+            if isinstance(result, KinopoiskError | HttpError):
+                logger.warning("Kinopoisk fetch failed: %s", result)
+            elif isinstance(result, BaseException):
+                raise result
+            elif result is not None:
+                movies.append(result)
+        return movies
+
+    async def fetch_movie(
+        self,
+        kinopoisk_id: int,
+        with_poster: bool = True,
+    ) -> KinopoiskMovie | None:
+        """Fetch movie by id, return `None` if it doesn't exist."""
+        content = await self.get(f"v2.2/films/{kinopoisk_id}")
+        if content is None:
+            return None
+        data = json.loads(content)
+        length = data.get("filmLength")
+        movie = KinopoiskMovie(
+            kinopoisk_id=kinopoisk_id,
+            title=data.get("nameRu") or data.get("nameOriginal"),
+            description=data.get("description"),
+            duration=(
+                datetime.timedelta(minutes=length) if length else None
+            ),
+            poster_url=data.get("posterUrl"),
+        )
+        if with_poster and movie.poster_url:
+            movie = movie._replace(
+                poster=await self.get(movie.poster_url, client=self.posters),
+            )
+        return movie
+
+    async def get(
+        self,
+        url: str,
+        client: AsyncHttpClient | None = None,
+    ) -> bytes | None:
+        """Get content of url, return `None` on 404.
+
+        Url is requested by API client unless other `client` is passed.
+
+        """
+        response = await (client or self.http).get(url)
+        if response.status_code == 404:
+            return None
+        if response.is_error:
+            raise KinopoiskError(f"{response.url}: {response.status_code}")
+        return response.content
@@ -0,0 +1,70 @@
+import base64
+import json
+import re
+
+from libs.http import StubServer
+
+# Smallest valid PNG image (1x1 transparent pixel)
+POSTER = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA"
+    "60e6kgAAAABJRU5ErkJggg==",
+)
+FILM_PATH = re.compile(r"^/api/v2\.2/films/(?P<id>\d+)$")
+POSTER_PATH = re.compile(r"^/posters/(?P<id>\d+)\.png$")
+
+
+class StubKinopoiskServer(StubServer):
+    """Local stub of Kinopoisk API for tests and benchmarks.
+
+    Serves deterministic movies for any id, so fetcher can be exercised
+    without network and API key. Ids from `missing_ids` return 404, ids
+    from `flaky_ids` fail with 503 on first request to test retries.
+
+    Usage:
+        with StubKinopoiskServer() as server:
+            client = KinopoiskClient(server.url)
+
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        missing_ids: frozenset[int] = frozenset(),
+        flaky_ids: frozenset[int] = frozenset(),
+    ):
+        super().__init__(host=host, port=port)
+        self.missing_ids = missing_ids
+        self.flaky_ids = set(flaky_ids)
+
+    @property
+    def url(self) -> str:
+        """Get base url of API."""
+        return f"{self.base_url}api/"
+
+    def get_movie(self, kinopoisk_id: int) -> dict:
+        """Get data of movie returned by stub."""
+        return {
+            "kinopoiskId": kinopoisk_id,
+            "nameRu": f"Фильм {kinopoisk_id}",
+            "nameOriginal": f"Movie {kinopoisk_id}",
+            "description": f"Description of movie {kinopoisk_id}",
+            "filmLength": 60 + kinopoisk_id % 120,
+            "posterUrl": f"{self.base_url}posters/{kinopoisk_id}.png",
+        }
+
+    def get_response(self, path: str) -> tuple[int, bytes, dict[str, str]]:
+        """Get status, body and headers of response for path."""
+        if match := FILM_PATH.match(path):
+            kinopoisk_id = int(match["id"])
+            with self._lock:
+                if kinopoisk_id in self.flaky_ids:
+                    self.flaky_ids.discard(kinopoisk_id)
+                    return 503, b"", {"Retry-After": "0"}
+            if kinopoisk_id in self.missing_ids:
+                return 404, b"", {}
+            body = json.dumps(self.get_movie(kinopoisk_id)).encode()
+            return 200, body, {"Content-Type": "application/json"}
+        if POSTER_PATH.match(path):
+            return 200, POSTER, {"Content-Type": "image/png"}
+        return 404, b"", {}
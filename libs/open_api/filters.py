@@ -25,7 +25,16 @@ class OrderingFilterBackend(filters.OrderingFilter):
 
 
 class SearchFilterBackend(filters.SearchFilter):
-    """Custom SearchFilter for better support of openapi."""
+    """Custom SearchFilter for better support of openapi.
+
+    Besides default lookup prefixes supports `%` for typo tolerant trigram
+    word similarity search (field should be covered by `gin_trgm_ops` index).
+
+    """
+    lookup_prefixes = {
+        **filters.SearchFilter.lookup_prefixes,
+        "%": "trigram_word_similar",
+    }
 
     def get_schema_operation_parameters(self, view):
         """Extend description."""
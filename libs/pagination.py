@@ -0,0 +1,336 @@
+import base64
+import datetime
+import json
+import typing
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections, models
+from django.utils.duration import duration_iso_string
+from django.utils.functional import cached_property
+
+# Counts above this value are not calculated exactly, they are shown as
+# "more than ..." instead
+ESTIMATED_COUNT_CAP = 1000
+
+
+def estimate_count(
+    queryset: models.QuerySet,
+    cap: int = ESTIMATED_COUNT_CAP,
+) -> int:
+    """Return count of queryset without scanning all matched rows.
+
+    For unfiltered querysets row count is taken from planner statistics
+    (`pg_class.reltuples`), so it costs the same for any table size. For
+    filtered querysets rows are counted up to `cap` and the result
+    never exceeds `cap + 1`.
+
+    """
+    if not queryset.query.where:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # `reltuples` is -1 for tables, which were never analyzed
+        if row and row[0] >= 0:
+            return row[0]
+    return queryset.order_by()[:cap + 1].count()
+
+
+def _encode_value(value: typing.Any) -> typing.Any:
+    """Convert value of ordering field to json compatible one."""
+    if isinstance(value, datetime.datetime | datetime.date):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return duration_iso_string(value)
+    return value
+
+
+class Cursor(typing.NamedTuple):
+    """Position of page in ordered queryset.
+
+    Contains values of ordering fields of boundary object of page and
+    direction in which next objects are taken.
+
+    """
+    values: tuple
+    reverse: bool = False
+
+    def encode(self) -> str:
+        """Encode cursor into url safe string."""
+        data = json.dumps(
+            [[_encode_value(value) for value in self.values], self.reverse],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @classmethod
+    def decode(cls, encoded: str) -> "Cursor":
+        """Decode cursor from string."""
+        try:
+            values, reverse = json.loads(base64.urlsafe_b64decode(encoded))
+            return cls(values=tuple(values), reverse=bool(reverse))
+        except (TypeError, ValueError) as error:
+            raise InvalidPage("Invalid cursor") from error
+
+
+class KeysetPage:
+    """Page of objects taken by `KeysetPaginator`.
+
+    Unlike Django's `Page` has no number, but links to neighbour pages
+    with cursors.
+
+    """
+
+    def __init__(
+        self,
+        object_list: list,
+        paginator: "KeysetPaginator",
+        has_next: bool,
+        has_previous: bool,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self) -> bool:
+        """Return whether there are objects after this page."""
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        """Return whether there are objects before this page."""
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        """Return whether there are objects out of this page."""
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> str | None:
+        """Return cursor of the next page."""
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.get_cursor(self.object_list[-1]).encode()
+
+    @property
+    def previous_cursor(self) -> str | None:
+        """Return cursor of the previous page."""
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.get_cursor(
+            self.object_list[0],
+            reverse=True,
+        ).encode()
+
+
+class OrderingField(typing.NamedTuple):
+    """Field of keyset ordering.
+
+    `nulls_last` is `None` when placement of nulls isn't specified, then
+    PostgreSQL puts them last in ascending order and first in descending.
+
+    """
+    name: str
+    descending: bool
+    nulls_last: bool | None = None
+
+    @classmethod
+    def parse(cls, ordering: str | models.OrderBy) -> "OrderingField":
+        """Parse item of `order_by()`: `"-name"` or `F("name").desc()`."""
+        if isinstance(ordering, str):
+            return cls(ordering.lstrip("-"), ordering.startswith("-"))
+        if isinstance(ordering, models.OrderBy) and isinstance(
+            ordering.expression,
+            models.F,
+        ):
+            nulls_last = None
+            if ordering.nulls_last or ordering.nulls_first:
+                nulls_last = bool(ordering.nulls_last)
+            return cls(
+                ordering.expression.name,
+                ordering.descending,
+                nulls_last,
+            )
+        raise ValueError(f"Unsupported keyset ordering: {ordering}")
+
+    def are_nulls_last(self, reverse: bool) -> bool:
+        """Check whether nulls go after values in direction of pages."""
+        if self.nulls_last is None:
+            return self.descending == reverse
+        return self.nulls_last != reverse
+
+
+class KeysetPaginator:
+    """Paginator that uses keyset (seek) pagination instead of offsets.
+
+    Pages are addressed by cursors containing values of ordering fields of
+    page's boundary object, so each page is fetched with an index-friendly
+    `WHERE (fields) < (values) ... LIMIT` query, and doesn't get slower with
+    page depth. Total count is not calculated, use `estimated_count`.
+
+    Ordering is taken from queryset, it must be unique (end with primary
+    key). Fields may refer to annotations and related objects
+    (`movie__title`) and may contain nulls, placed with
+    `F(...).desc(nulls_last=True)` or by default.
+
+    """
+
+    def __init__(self, object_list: models.QuerySet, per_page: int):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(
+            OrderingField.parse(field)
+            for field in object_list.query.order_by
+        )
+        if not self.ordering:
+            raise ValueError("Keyset pagination requires ordered queryset")
+
+    @cached_property
+    def estimated_count(self) -> int:
+        """Return approximate count of objects, see `estimate_count`."""
+        return estimate_count(self.object_list)
+
+    @property
+    def count_is_capped(self) -> bool:
+        """Return whether count of objects exceeds counting cap."""
+        return (
+            bool(self.object_list.query.where)
+            and self.estimated_count > ESTIMATED_COUNT_CAP
+        )
+
+    def get_cursor(self, obj: models.Model, reverse: bool = False) -> Cursor:
+        """Return cursor pointing at object."""
+        values = []
+        for field in self.ordering:
+            value = obj
+            for attr in field.name.split("__"):
+                value = getattr(value, attr)
+            values.append(value)
+        return Cursor(values=tuple(values), reverse=reverse)
+
+    def page(self, cursor: str | None = None) -> KeysetPage:
+        """Return page of objects following (or preceding) cursor."""
+        queryset = self.object_list
+        decoded = self._validate(Cursor.decode(cursor)) if cursor else None
+        if decoded:
+            queryset = queryset.filter(self._get_seek_filter(decoded))
+        if decoded and decoded.reverse:
+            queryset = queryset.reverse()
+
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+
+        if decoded and decoded.reverse:
+            objects.reverse()
+            return KeysetPage(
+                objects,
+                paginator=self,
+                has_next=True,
+                has_previous=has_more,
+            )
+        return KeysetPage(
+            objects,
+            paginator=self,
+            has_next=has_more,
+            has_previous=decoded is not None,
+        )
+
+    def _get_ordering_field(self, name: str) -> models.Field:
+        """Get model field or annotation's output field of ordering."""
+        query = self.object_list.query
+        if name in query.annotations:
+            return query.annotations[name].output_field
+        model = self.object_list.model
+        *relations, name = name.split("__")
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        if name == "pk":
+            return model._meta.pk
+        return model._meta.get_field(name)
+
+    def _validate(self, cursor: Cursor) -> Cursor:
+        """Convert values of cursor to python values of ordering fields.
+
+        Tampered cursors or cursors of other ordering get `InvalidPage`
+        here instead of database errors on filtering.
+
+        """
+        if len(cursor.values) != len(self.ordering):
+            raise InvalidPage("Invalid cursor")
+        values = []
+        for ordering_field, value in zip(self.ordering, cursor.values):
+            try:
+                field = self._get_ordering_field(ordering_field.name)
+                value = field.to_python(value)
+                field.run_validators(value)
+            except (
+                FieldDoesNotExist,
+                TypeError,
+                ValueError,
+                ValidationError,
+            ) as error:
+                raise InvalidPage("Invalid cursor") from error
+            values.append(value)
+        return cursor._replace(values=tuple(values))
+
+    def _get_seek_filter(self, cursor: Cursor) -> models.Q:
+        """Get filter for objects located after cursor in its direction.
+
+        For ordering `(-a, b)` and values `(x, y)` it's
+        `a < x OR (a = x AND b > y)`. Nulls are equal to each other and go
+        before or after all values according to ordering.
+
+        """
+        seek_filter = models.Q()
+        for position, field in enumerate(self.ordering):
+            condition = self._get_after_filter(
+                field,
+                cursor.values[position],
+                cursor.reverse,
+            )
+            for previous_field, value in zip(
+                self.ordering[:position],
+                cursor.values[:position],
+            ):
+                condition &= self._get_equal_filter(previous_field, value)
+            seek_filter |= condition
+        return seek_filter
+
+    @staticmethod
+    def _get_equal_filter(field: OrderingField, value) -> models.Q:
+        if value is None:
+            return models.Q(**{f"{field.name}__isnull": True})
+        return models.Q(**{field.name: value})
+
+    @staticmethod
+    def _get_after_filter(
+        field: OrderingField,
+        value,
+        reverse: bool,
+    ) -> models.Q:
+        """Get filter for values of field located after value."""
+        nulls_last = field.are_nulls_last(reverse)
+        if value is None:
+            if nulls_last:
+                # Nothing goes after nulls, so filter matches no rows
+                return models.Q(pk__in=[])
+            return models.Q(**{f"{field.name}__isnull": False})
+        lookup = "lt" if field.descending != reverse else "gt"
+        condition = models.Q(**{f"{field.name}__{lookup}": value})
+        if nulls_last:
+            condition |= models.Q(**{f"{field.name}__isnull": True})
+        return condition
@@ -0,0 +1,115 @@
+import posixpath
+import typing
+import uuid
+
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+
+SIGNING_SALT = "libs.uploads"
+
+
+class DirectUploadError(Exception):
+    """Direct upload can't be started or finished."""
+
+
+class PresignedUpload(typing.NamedTuple):
+    """Form for direct upload of file to storage.
+
+    Client sends `multipart/form-data` POST request to `url` with all
+    `fields` and the file as the last `file` field.
+
+    """
+    key: str
+    url: str
+    fields: dict[str, str]
+
+
+def create_presigned_upload(
+    prefix: str,
+    filename: str,
+    content_type: str,
+    max_size: int,
+    expires_in: int,
+) -> PresignedUpload:
+    """Create presigned form for direct upload of file to S3 storage.
+
+    File is uploaded to unique key under `prefix`, storage enforces its
+    content type and size.
+
+    Raises:
+        DirectUploadError: If default storage isn't S3 storage.
+
+    """
+    if not hasattr(default_storage, "bucket"):
+        raise DirectUploadError("Storage doesn't support direct uploads")
+    key = posixpath.join(
+        prefix,
+        uuid.uuid4().hex,
+        get_valid_filename(posixpath.basename(filename)) or "file",
+    )
+    s3_client = default_storage.bucket.meta.client
+    presigned_post = s3_client.generate_presigned_post(
+        Bucket=default_storage.bucket_name,
+        Key=posixpath.join(default_storage.location, key),
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_size],
+        ],
+        ExpiresIn=expires_in,
+    )
+    return PresignedUpload(
+        key=key,
+        url=presigned_post["url"],
+        fields=presigned_post["fields"],
+    )
+
+
+def sign_upload(key: str, **scope) -> str:
+    """Get token proving that upload to key was started by server.
+
+    Args:
+        key: Key of uploaded file.
+        scope: Values, which must match on finish of upload (like id of
+            user and object).
+
+    """
+    return signing.dumps(dict(scope, key=key), salt=SIGNING_SALT)
+
+
+def load_upload(token: str, max_age: int, **scope) -> str:
+    """Get key of uploaded file from token.
+
+    Raises:
+        DirectUploadError: If token is invalid, expired or has other scope.
+
+    """
+    try:
+        data = signing.loads(token, salt=SIGNING_SALT, max_age=max_age)
+    except signing.BadSignature as error:
+        raise DirectUploadError(
+            "Upload token is invalid or expired",
+        ) from error
+    key = data.pop("key")
+    if data != scope:
+        raise DirectUploadError("Upload token is issued for other object")
+    return key
+
+
+def get_upload_size(key: str) -> int | None:
+    """Get size of uploaded file, `None` if it isn't uploaded."""
+    if not default_storage.exists(key):
+        return None
+    return default_storage.size(key)
+
+
+def read_upload(key: str) -> bytes:
+    """Read uploaded file."""
+    with default_storage.open(key) as file:
+        return file.read()
+
+
+def delete_upload(key: str) -> None:
+    """Delete uploaded file after it was processed."""
+    default_storage.delete(key)